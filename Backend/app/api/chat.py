@@ -1,15 +1,26 @@
-import asyncio
+import json
+from typing import AsyncIterator
+
 from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-from app.services.query_classifier import classify_query
-from app.services.retrieval import retrieve_context
+from app.services.answer_cache import answer_key, get_answer, is_standalone, store_answer
+from app.services.retrieval import retrieve_chunks_async, select_sources
 from app.services.memory_singleton import memory_store
-from app.services.bedrock_llm import generate_answer
-from app.services.safety_guard import check_request
+from app.services.bedrock_llm import generate_answer_async, generate_answer_stream_async
+from app.services.message_scan import scan_message
+from app.services.safety_guard import safety_verdict
+from app.services.url_filter import filter_url_stream
 
 router = APIRouter()
 
+NO_CONTEXT_INSTRUCTIONS = "Answer with only your existing knowledge, as no relevant SIUE webpage information was found. Do not provide any information that you could not be reasonably expected to know. If you do not know, say so and suggest where to check (the official SIUE site) or ask a clarifying question."
+UNAVAILABLE_REPLY = (
+    "AI is temporarily unavailable while the model configuration is being finalized. "
+    "Please try again shortly."
+)
+
 
 class ChatRequest(BaseModel):
     session_id: str
@@ -25,7 +36,8 @@ class ChatResponse(BaseModel):
 async def chat_endpoint(request: ChatRequest):
     session_id = getattr(request, "session_id", None) or "dev-session"
 
-    allowed, blocked_reply = check_request(request.message)
+    scan = scan_message(request.message)
+    allowed, blocked_reply = safety_verdict(scan)
     if not allowed:
         memory_store.add(session_id, "user", request.message)
         memory_store.add(session_id, "assistant", blocked_reply)
@@ -33,40 +45,126 @@ async def chat_endpoint(request: ChatRequest):
 
     memory_store.add(session_id, "user", request.message)
 
-    category = classify_query(request.message)
-    context, fetched_urls = await asyncio.to_thread(retrieve_context, category, request.message)
+    category = scan.category
     history = memory_store.get(session_id)
 
-    if not context:
-        reply = await asyncio.to_thread(
-            generate_answer,
+    # Standalone questions over unchanged pages reuse the earlier reply
+    sources = select_sources(category, request.message)
+    cache_key = answer_key(request.message, category, sources) if is_standalone(history) else None
+    cached_reply = get_answer(cache_key)
+    if cached_reply is not None:
+        print("[ANSWER CACHE HIT]", category)
+        memory_store.add(session_id, "assistant", cached_reply)
+        return ChatResponse(reply=cached_reply, category=category)
+
+    chunks, fetched_urls = await retrieve_chunks_async(category, request.message)
+
+    if not chunks:
+        reply = await generate_answer_async(
             question=request.message,
-            context="Answer with only your existing knowledge, as no relevant SIUE webpage information was found. Do not provide any information that you could not be reasonably expected to know. If you do not know, say so and suggest where to check (the official SIUE site) or ask a clarifying question.",
+            context=NO_CONTEXT_INSTRUCTIONS,
             category=category,
             history=history,
             allowed_urls=[],
         )
     else:
         try:
-            reply = await asyncio.to_thread(
-                generate_answer,
+            reply = await generate_answer_async(
                 question=request.message,
-                context=context,
+                context="\n\n".join(chunks),
                 category=category,
                 history=history,
                 allowed_urls=fetched_urls,
+                chunks=chunks,
             )
+            # Only answers built from every source are safe to reuse
+            if fetched_urls == sources:
+                store_answer(cache_key, reply)
         except Exception as e:
             print("[BEDROCK ERROR]", e)
-            reply = (
-                "AI is temporarily unavailable while the model configuration is being finalized. "
-                "Please try again shortly."
-            )
+            reply = UNAVAILABLE_REPLY
 
     memory_store.add(session_id, "assistant", reply)
     return ChatResponse(reply=reply, category=category)
 
 
-# Kept for reference — streaming endpoint, not currently used
-# @router.post("/chat/stream")
-# async def chat_stream_endpoint(request: ChatRequest): ...
+def _sse(payload: dict | str) -> str:
+    data = payload if isinstance(payload, str) else json.dumps(payload)
+    return f"data: {data}\n\n"
+
+
+async def _sse_reply(reply: str, category: str) -> AsyncIterator[str]:
+    """A complete reply (blocked or cached) in the same event format as a streamed one."""
+    yield _sse({"token": reply})
+    yield _sse({"category": category})
+    yield _sse("[DONE]")
+
+
+@router.post("/chat/stream")
+async def chat_stream_endpoint(request: ChatRequest):
+    """
+    Same pipeline as /chat, but the synthesis step is sent as server-sent
+    events while it is generated: `{"token": ...}` per piece of text, then
+    `{"category": ...}` and `[DONE]`. The full reply is saved to memory once
+    the stream ends.
+    """
+    session_id = getattr(request, "session_id", None) or "dev-session"
+
+    scan = scan_message(request.message)
+    allowed, blocked_reply = safety_verdict(scan)
+    if not allowed:
+        memory_store.add(session_id, "user", request.message)
+        memory_store.add(session_id, "assistant", blocked_reply)
+        return StreamingResponse(_sse_reply(blocked_reply, "blocked"), media_type="text/event-stream")
+
+    memory_store.add(session_id, "user", request.message)
+
+    category = scan.category
+    history = memory_store.get(session_id)
+
+    sources = select_sources(category, request.message)
+    cache_key = answer_key(request.message, category, sources) if is_standalone(history) else None
+    cached_reply = get_answer(cache_key)
+    if cached_reply is not None:
+        print("[ANSWER CACHE HIT]", category)
+        memory_store.add(session_id, "assistant", cached_reply)
+        return StreamingResponse(_sse_reply(cached_reply, category), media_type="text/event-stream")
+
+    chunks, fetched_urls = await retrieve_chunks_async(category, request.message)
+
+    async def _events() -> AsyncIterator[str]:
+        allowed_urls = fetched_urls if chunks else []
+        tokens = filter_url_stream(
+            generate_answer_stream_async(
+                question=request.message,
+                context="\n\n".join(chunks) if chunks else NO_CONTEXT_INSTRUCTIONS,
+                category=category,
+                history=history,
+                allowed_urls=allowed_urls,
+                chunks=chunks or None,
+            ),
+            allowed_urls,
+        )
+
+        parts = []
+        failed = False
+        try:
+            async for token in tokens:
+                parts.append(token)
+                yield _sse({"token": token})
+        except Exception as e:
+            print("[BEDROCK STREAM ERROR]", e)
+            failed = True
+            if not parts:
+                parts.append(UNAVAILABLE_REPLY)
+                yield _sse({"token": UNAVAILABLE_REPLY})
+
+        reply = "".join(parts)
+        memory_store.add(session_id, "assistant", reply)
+        if chunks and not failed and fetched_urls == sources:
+            store_answer(cache_key, reply)
+
+        yield _sse({"category": category})
+        yield _sse("[DONE]")
+
+    return StreamingResponse(_events(), media_type="text/event-stream")
@@ -1,13 +1,13 @@
 from fastapi import APIRouter, HTTPException
-from app.services.web_fetcher import fetch_page_text
+from app.services.web_fetcher import fetch_page_text_async
 
 router = APIRouter()
 
 
 @router.get("/fetch")
-def fetch_url(url: str):
+async def fetch_url(url: str):
     try:
-        text = fetch_page_text(url)
+        text = await fetch_page_text_async(url)
         return {
             "url": url,
             "text_preview": text[:1000]  # limit output size
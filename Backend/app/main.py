@@ -1,9 +1,38 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
 from app.api.chat import router as chat_router
 from app.api.fetch import router as fetch_router
+from app.services.bedrock_llm import bedrock_async
+from app.services.browser_pool import browser_pool
+from app.services.cache_warmer import WARMER_ENABLED, run_warmer
+from app.services.chunk_index import flush_index, load_index
+from app.services.memory_singleton import memory_store
+from app.services.registry import current_registry
+from app.services.web_fetcher import close_async_client
 from fastapi.middleware.cors import CORSMiddleware
 
-app = FastAPI(title="EddieBot Backend")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    current_registry()  # fail fast on an invalid registry.json
+    load_index()
+    warmer = asyncio.create_task(run_warmer()) if WARMER_ENABLED else None
+    yield
+    if warmer is not None:
+        warmer.cancel()
+        with suppress(asyncio.CancelledError):
+            await warmer
+    # Shared keep-alive clients used by the async chat pipeline
+    await close_async_client()
+    await bedrock_async.aclose()
+    await asyncio.to_thread(flush_index)
+    await asyncio.to_thread(browser_pool.close)  # waits up to 30s for Playwright to shut down
+    memory_store.close()
+
+
+app = FastAPI(title="EddieBot Backend", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
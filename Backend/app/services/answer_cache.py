@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import hashlib
+import re
+from dataclasses import dataclass
+
+from app.services.lru_cache import LRUCache
+from app.services.semantic_cache import SemanticCache
+from app.services.web_fetcher import page_fingerprint
+
+# Replies to standalone questions, keyed on the question, its category and
+# the exact content of the pages it was answered from. A refreshed page
+# changes the key, so old answers are never served for new content.
+ANSWER_CACHE_ENABLED = True
+ANSWER_CACHE_MAX_ENTRIES = 512
+ANSWER_CACHE_TTL_SECONDS = 60 * 60
+
+# Paraphrases ("library hours?" / "what are the library hours") fall back to
+# the most similar cached question in the same category, same source content,
+# same numbers, negations and question words. The threshold is high on
+# purpose: near-miss questions ("room 2001" / "room 2010") score close to 0.9.
+SEMANTIC_CACHE_ENABLED = True
+SEMANTIC_CACHE_THRESHOLD = 0.92
+SEMANTIC_CACHE_MAX_PER_CATEGORY = 256
+
+_answers = LRUCache(max_entries=ANSWER_CACHE_MAX_ENTRIES, ttl_seconds=ANSWER_CACHE_TTL_SECONDS)
+_similar = SemanticCache(
+    threshold=SEMANTIC_CACHE_THRESHOLD,
+    max_entries=SEMANTIC_CACHE_MAX_PER_CATEGORY,
+    ttl_seconds=ANSWER_CACHE_TTL_SECONDS,
+)
+
+_NON_WORD_RE = re.compile(r"[^a-z0-9]+")
+
+
+@dataclass(frozen=True)
+class AnswerKey:
+    category: str
+    question: str  # normalized
+    sources: str  # sources_fingerprint of the selected pages
+
+
+def normalize_question(message: str) -> str:
+    """Lowercase words only: "What are the Library hours?" -> "what are the library hours"."""
+    return _NON_WORD_RE.sub(" ", message.lower()).strip()
+
+
+def is_standalone(history: list[dict]) -> bool:
+    """True if the only turn in the history is the current question."""
+    return len(history) <= 1
+
+
+def sources_fingerprint(urls: list[str]) -> str | None:
+    """Combined hash of the pages' cached content, or None if any isn't cached."""
+    digest = hashlib.sha256()
+    for url in urls:
+        fingerprint = page_fingerprint(url)
+        if fingerprint is None:
+            return None
+        digest.update(f"{url}\n{fingerprint}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def answer_key(message: str, category: str, urls: list[str]) -> AnswerKey | None:
+    """Cache key for this question, or None if it can't be cached right now."""
+    if not ANSWER_CACHE_ENABLED or not urls:
+        return None
+
+    fingerprint = sources_fingerprint(urls)
+    if fingerprint is None:
+        return None
+
+    return AnswerKey(category=category, question=normalize_question(message), sources=fingerprint)
+
+
+def get_answer(key: AnswerKey | None) -> str | None:
+    """Exact match first, then the nearest paraphrase above the threshold."""
+    if key is None:
+        return None
+
+    reply = _answers.get(key)
+    if reply is None and SEMANTIC_CACHE_ENABLED:
+        reply = _similar.get(key.category, key.question, key.sources)
+    return reply
+
+
+def store_answer(key: AnswerKey | None, reply: str) -> None:
+    if key is None:
+        return
+    _answers.set(key, reply)
+    if SEMANTIC_CACHE_ENABLED:
+        _similar.add(key.category, key.question, key.sources, reply)
+
+
+def clear() -> None:
+    _answers.clear()
+    _similar.clear()
+
+
+def stats() -> dict:
+    return {"exact": _answers.stats(), "semantic": _similar.stats()}
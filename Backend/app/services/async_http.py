@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Callable
+
+import httpx
+
+
+class SharedAsyncClient:
+    """
+    Lazily-created httpx.AsyncClient shared by every request on an event loop.
+    Keeps connections alive across chats instead of opening one per call.
+    A new client is made if the running loop changes (e.g. test clients that
+    start a fresh loop per request), since httpx pools are bound to a loop.
+    """
+    def __init__(self, factory: Callable[[], httpx.AsyncClient]):
+        self._factory = factory
+        self._client: httpx.AsyncClient | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def get(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop or self._client.is_closed:
+            self._client = self._factory()
+            self._loop = loop
+        return self._client
+
+    async def aclose(self) -> None:
+        client, self._client, self._loop = self._client, None, None
+        if client is not None and not client.is_closed:
+            await client.aclose()
+
+
+class SharedSemaphore:
+    """
+    A process-wide asyncio.Semaphore, so a concurrency cap holds across every
+    in-flight chat rather than within one call. Like SharedAsyncClient, it is
+    re-created if the running loop changes, since semaphores bind to a loop.
+    """
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._semaphore: asyncio.Semaphore | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def get(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.limit)
+            self._loop = loop
+        return self._semaphore
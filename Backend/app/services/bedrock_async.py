@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+from collections.abc import AsyncIterator
+from urllib.parse import quote
+
+import boto3
+import httpx
+from botocore.auth import SigV4Auth
+from botocore.awsrequest import AWSRequest
+from botocore.eventstream import EventStreamBuffer
+from botocore.exceptions import ClientError, NoCredentialsError
+
+from app.services.async_http import SharedAsyncClient
+
+BEDROCK_MAX_CONNECTIONS = 100
+
+# Same policy as boto3's legacy retry mode: up to 5 attempts with jittered
+# exponential backoff on throttling, 5xx and connection errors.
+BEDROCK_MAX_ATTEMPTS = 5
+BEDROCK_RETRY_BASE_SECONDS = 0.5
+BEDROCK_RETRY_MAX_SECONDS = 8.0
+RETRYABLE_ERROR_CODES = frozenset({
+    "ThrottlingException",
+    "TooManyRequestsException",
+    "ServiceUnavailableException",
+    "InternalServerException",
+    "ModelNotReadyException",
+})
+
+
+class AsyncBedrockClient:
+    """
+    Minimal asyncio client for the Bedrock Runtime Converse and ConverseStream
+    APIs.
+
+    Requests are signed with SigV4 using the normal boto3 credential chain and
+    sent over one shared httpx.AsyncClient, so in-flight chats wait on sockets
+    instead of each holding a worker thread. Request and response bodies use the
+    same shapes as boto3's bedrock-runtime `converse` and `converse_stream`
+    (the stream is decoded with botocore's event-stream parser). Throttling,
+    5xx and transport errors are retried like boto3 does, up to `max_attempts`
+    calls; a stream is only retried before its first event.
+    """
+    def __init__(
+        self,
+        region_name: str,
+        session: boto3.Session | None = None,
+        timeout: float = 60.0,
+        max_connections: int = BEDROCK_MAX_CONNECTIONS,
+        transport: httpx.AsyncBaseTransport | None = None,
+        max_attempts: int = BEDROCK_MAX_ATTEMPTS,
+        retry_base_delay: float = BEDROCK_RETRY_BASE_SECONDS,
+    ):
+        self.region_name = region_name
+        self.max_attempts = max_attempts
+        self.retry_base_delay = retry_base_delay
+        self.endpoint_url = f"https://bedrock-runtime.{region_name}.amazonaws.com"
+        self._session = session or boto3.Session(region_name=region_name)
+        self._http = SharedAsyncClient(
+            lambda: httpx.AsyncClient(
+                timeout=timeout,
+                limits=httpx.Limits(max_connections=max_connections),
+                transport=transport,
+            )
+        )
+
+    def _signed_headers(self, url: str, body: bytes, accept: str = "application/json") -> dict[str, str]:
+        credentials = self._session.get_credentials()
+        if credentials is None:
+            raise NoCredentialsError()
+
+        request = AWSRequest(
+            method="POST",
+            url=url,
+            data=body,
+            headers={"Content-Type": "application/json", "Accept": accept},
+        )
+        SigV4Auth(credentials.get_frozen_credentials(), "bedrock", self.region_name).add_auth(request)
+        return dict(request.headers.items())
+
+    def _retry_delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given (1-based) failed attempt."""
+        return random.uniform(0, min(BEDROCK_RETRY_MAX_SECONDS, self.retry_base_delay * 2 ** (attempt - 1)))
+
+    async def converse(self, **kwargs) -> dict:
+        model_id = kwargs.pop("modelId")
+        url = f"{self.endpoint_url}/model/{quote(model_id, safe='')}/converse"
+        resp = await self._post(url, json.dumps(kwargs).encode("utf-8"), "Converse")
+        return resp.json()
+
+    async def converse_stream(self, **kwargs) -> AsyncIterator[dict]:
+        """
+        Yields the events of a ConverseStream reply as boto3 does, e.g.
+        {"contentBlockDelta": {...}} or {"metadata": {...}}. Closing the
+        generator early closes the connection.
+        """
+        model_id = kwargs.pop("modelId")
+        url = f"{self.endpoint_url}/model/{quote(model_id, safe='')}/converse-stream"
+        resp = await self._post(
+            url, json.dumps(kwargs).encode("utf-8"), "ConverseStream",
+            accept="application/vnd.amazon.eventstream", stream=True,
+        )
+        try:
+            events = EventStreamBuffer()
+            async for data in resp.aiter_bytes():
+                events.add_data(data)
+                for message in events:
+                    yield self._stream_event(message)
+        finally:
+            await resp.aclose()
+
+    async def _post(
+        self, url: str, body: bytes, operation: str, accept: str = "application/json", stream: bool = False
+    ) -> httpx.Response:
+        """POSTs the signed request, retrying throttling, 5xx and transport errors."""
+        client = self._http.get()
+        attempt = 1
+        while True:
+            try:
+                request = client.build_request(
+                    "POST", url, content=body, headers=self._signed_headers(url, body, accept)
+                )
+                resp = await client.send(request, stream=stream)
+            except httpx.TransportError as e:
+                if attempt >= self.max_attempts:
+                    raise
+                print(f"[BEDROCK RETRY] attempt {attempt}: {e!r}")
+            else:
+                if resp.status_code < 400:
+                    return resp
+                await resp.aread()
+                await resp.aclose()
+                error = self._client_error(resp, operation)
+                code = error.response["Error"]["Code"]
+                if attempt >= self.max_attempts or not (
+                    resp.status_code == 429 or resp.status_code >= 500 or code in RETRYABLE_ERROR_CODES
+                ):
+                    raise error
+                print(f"[BEDROCK RETRY] attempt {attempt}: {code}")
+
+            await asyncio.sleep(self._retry_delay(attempt))
+            attempt += 1
+
+    @staticmethod
+    def _stream_event(message) -> dict:
+        """One decoded event-stream message as a boto3-style event, or the ClientError it carries."""
+        headers = message.headers
+        message_type = headers.get(":message-type")
+        if message_type == "event":
+            return {headers[":event-type"]: json.loads(message.payload or b"{}")}
+
+        if message_type == "exception":
+            code = headers.get(":exception-type", "UnknownError")
+            payload = json.loads(message.payload or b"{}")
+            text = payload.get("message") or payload.get("Message") or ""
+        else:
+            code = headers.get(":error-code", "UnknownError")
+            text = headers.get(":error-message", "")
+        raise ClientError({"Error": {"Code": code, "Message": text}}, "ConverseStream")
+
+    @staticmethod
+    def _client_error(resp: httpx.Response, operation: str = "Converse") -> ClientError:
+        try:
+            payload = resp.json()
+        except ValueError:
+            payload = {}
+
+        error_type = resp.headers.get("x-amzn-ErrorType", str(resp.status_code))
+        return ClientError(
+            {
+                "Error": {
+                    "Code": error_type.split(":")[0],
+                    "Message": payload.get("message") or payload.get("Message") or resp.text,
+                },
+                "ResponseMetadata": {"HTTPStatusCode": resp.status_code},
+            },
+            operation,
+        )
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
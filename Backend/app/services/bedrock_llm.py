@@ -1,30 +1,55 @@
-import re
-import boto3
+import asyncio
+import threading
+from collections.abc import AsyncIterator
+from contextlib import aclosing
+
 from botocore.exceptions import ClientError
 
+from app.services.answer_cache import is_standalone
+from app.services.async_http import SharedSemaphore
+from app.services.bedrock_async import BEDROCK_MAX_CONNECTIONS, AsyncBedrockClient
+from app.services.extraction_cache import extraction_key, get_extraction, store_extraction
+from app.services import prompts
+from app.services.registry import current_registry
+from app.services.text_utils import chunk_text
+from app.services.url_filter import strip_unauthorized_urls
+
 # Use your own Bedrock model ID or inference-profile ARN from the console—this ARN embeds a specific AWS account ID and will not work for other accounts.
 MODEL_ID = "arn:aws:bedrock:us-west-2:323441263732:inference-profile/us.amazon.nova-pro-v1:0" #amazon.nova-pro-v1:0" 
 
-bedrock = boto3.client("bedrock-runtime", region_name="us-west-2")
-
-SYSTEM_POLICY = """
-You are EddieBot, an official SIUE assistant.
+bedrock_async = AsyncBedrockClient(region_name="us-west-2")
+
+# Per-chunk extraction calls run concurrently, bounded across all chats, so a
+# turn costs roughly one extraction round trip plus the synthesis call. The
+# cap is sized to bedrock_async's connection pool, leaving a quarter of it
+# for synthesis calls; the timeout includes time spent waiting for a slot.
+MAX_EXTRACTION_CHUNKS = 5  # cost/time safety cap
+EXTRACTION_MAX_WORKERS = BEDROCK_MAX_CONNECTIONS * 3 // 4
+EXTRACTION_TIMEOUT_SECONDS = 20
+
+_extraction_limit = SharedSemaphore(EXTRACTION_MAX_WORKERS)  # async extractions across all chats
+
+# Prompt caching for the system block, on models whose Converse API accepts
+# cache points. Bedrock only caches a prefix above a model-specific minimum
+# length; a shorter one is billed as normal input, not rejected.
+PROMPT_CACHE_ENABLED = True
+PROMPT_CACHE_MODEL_FAMILIES = (
+    "amazon.nova-",
+    "anthropic.claude-3-5-haiku",
+    "anthropic.claude-3-7-sonnet",
+    "anthropic.claude-sonnet-4",
+    "anthropic.claude-opus-4",
+)
+
+_USAGE_FIELDS = [
+    ("inputTokens", "input_tokens"),
+    ("outputTokens", "output_tokens"),
+    ("cacheReadInputTokens", "cache_read_tokens"),
+    ("cacheWriteInputTokens", "cache_write_tokens"),
+]
+_usage_totals = {"calls": 0, **{key: 0 for _, key in _USAGE_FIELDS}}
+_usage_lock = threading.Lock()
 
-Rules:
-- Be professional, helpful, and student-friendly.
-- Do not be insulting or negative about SIUE or any individuals.
-- Avoid controversial topics (politics, hate, explicit content). Redirect back to campus resources.
-- Use the provided SIUE webpage information when available.
-- If you do not know, say so and suggest where to check (official SIUE site) or ask a clarifying question.
-- Do not invent facts, dates, or policies.
-
-URL RULES (strictly enforced):
-- NEVER write a URL unless it appears word-for-word in the ALLOWED LINKS list you are given.
-- Do not construct, guess, shorten, reformat, or paraphrase any URL.
-- Do not append paths to a base URL you were given (e.g. do not turn siue.edu into siue.edu/library).
-- If no ALLOWED LINKS are provided, do not include any URLs at all.
-- Including an invented or modified URL is a critical error.
-"""
 
 def format_history(history: list[dict], max_chars: int = 2500) -> str:
     lines = []
@@ -35,292 +60,228 @@ def format_history(history: list[dict], max_chars: int = 2500) -> str:
     return text[-max_chars:]
 
 
-def _strip_unauthorized_urls(text: str, allowed_urls: list[str]) -> str:
+def supports_prompt_cache(model_id: str) -> bool:
+    return PROMPT_CACHE_ENABLED and any(family in model_id for family in PROMPT_CACHE_MODEL_FAMILIES)
+
+
+def _converse_request(prompt: str, max_tokens: int) -> dict:
     """
-    Post-generation safety net: removes any http/https URL from the response
-    that is not in the allowed_urls list.
+    Converse arguments for one call. The policy goes in the system block,
+    identical on every call, followed by a cache point where the model
+    supports one, so Bedrock reuses it instead of billing it as new input.
     """
-    url_pattern = re.compile(r'https?://\S+')
-    allowed_set = set(allowed_urls)
+    system = [{"text": prompts.SYSTEM_PROMPT}]
+    if supports_prompt_cache(MODEL_ID):
+        system.append({"cachePoint": {"type": "default"}})
+
+    return {
+        "modelId": MODEL_ID,
+        "system": system,
+        "messages": [
+            {
+                "role": "user",
+                "content": [{"text": prompt}],
+            }
+        ],
+        "inferenceConfig": {
+            "maxTokens": max_tokens,
+            "temperature": 0.2,
+            "topP": 0.9,
+        },
+    }
 
-    def _replace(match: re.Match) -> str:
-        url = match.group(0).rstrip('.,)>"\'')
-        return url if url in allowed_set else ''
 
-    return re.sub(url_pattern, _replace, text)
+def _log_usage(usage: dict | None) -> None:
+    """Logs token usage from a Converse response, including prompt cache reads and writes."""
+    if not usage:
+        return
+    with _usage_lock:
+        _usage_totals["calls"] += 1
+        for field, key in _USAGE_FIELDS:
+            _usage_totals[key] += usage.get(field, 0)
+    print(
+        "[BEDROCK USAGE]",
+        f"in={usage.get('inputTokens', 0)}",
+        f"out={usage.get('outputTokens', 0)}",
+        f"cache_read={usage.get('cacheReadInputTokens', 0)}",
+        f"cache_write={usage.get('cacheWriteInputTokens', 0)}",
+    )
 
 
-def chunk_text(text: str, chunk_size: int = 1200, overlap: int = 100) -> list[str]:
-    words = text.split()
-    chunks = []
-    start = 0
-    while start < len(words):
-        end = start + chunk_size
-        chunks.append(" ".join(words[start:end]))
-        start = max(0, end - overlap)
-    return chunks
+def usage_stats() -> dict:
+    """Token totals over every Converse call since start-up."""
+    with _usage_lock:
+        return dict(_usage_totals)
 
 
-def _converse(prompt: str, max_tokens: int) -> str:
+async def _converse_async(prompt: str, max_tokens: int) -> str:
     """
-    Unified call for Nova via Bedrock Converse API.
+    Unified call for Nova via the Bedrock Converse API, on the shared async client.
     """
     try:
-        resp = bedrock.converse(
-            modelId=MODEL_ID,
-            messages=[
-                {
-                    "role": "user",
-                    "content": [{"text": prompt}],
-                }
-            ],
-            inferenceConfig={
-                "maxTokens": max_tokens,
-                "temperature": 0.2,
-                "topP": 0.9,
-            },
-        )
-
-        # Bedrock Converse returns an output message with content blocks.
+        resp = await bedrock_async.converse(**_converse_request(prompt, max_tokens))
+        _log_usage(resp.get("usage"))
         return resp["output"]["message"]["content"][0]["text"].strip()
 
     except ClientError as e:
-        # Log the real error for debugging (prints in Uvicorn console)
         print("[BEDROCK ERROR]", e)
         raise
 
 
-def answer_from_chunk(question: str, chunk: str, history_block: str, allowed_urls: list[str] | None = None) -> str:
-    allowed_block = ""
-    if allowed_urls:
-        allowed_block = "ALLOWED LINKS (only these may appear in the final answer — do NOT include them here):\n" + "\n".join(allowed_urls)
-
-    prompt = f"""
-
-{SYSTEM_POLICY}
+def _build_extraction_prompt(question: str, chunk: str, history_block: str, allowed_urls: list[str] | None = None) -> str:
+    return prompts.extraction_prompt(question, chunk, history_block, allowed_urls).text
 
-CONVERSATION CONTEXT (most recent):
-{history_block}
 
-{allowed_block}
+async def answer_from_chunk_async(question: str, chunk: str, history_block: str, allowed_urls: list[str] | None = None) -> str:
+    prompt = _build_extraction_prompt(question, chunk, history_block, allowed_urls)
+    return await _converse_async(prompt, max_tokens=450)
 
-TASK:
-- Consider the conversation context above to understand what the student is really asking.
-- Extract ONLY what helps answer the student question given that context.
-- If the question asks about specific resources, services, hours, locations, or items, extract and LIST them concretely with names and relevant details (e.g., hours, room numbers, contact info).
-- For general or conversational questions, summarize in 2–5 sentences.
-- Do NOT copy page text or UI/navigation labels.
-- Do NOT write any URLs in your response. URLs will be added separately.
 
-If the information is not present, respond with EXACTLY:
-NOT_FOUND
+def _extraction_keys(
+    question: str, chunks: list[str], category: str | None, allowed_urls: list[str] | None
+) -> list[tuple | None]:
+    if category is None:
+        return [None] * len(chunks)
+    return [extraction_key(question, chunk, category, allowed_urls) for chunk in chunks]
 
-UNIVERSITY INFORMATION:
-{chunk}
 
-STUDENT QUESTION:
-{question}
-"""
-    return _converse(prompt, max_tokens=450)
+def _useful_answers(answers: list[str | None]) -> list[str]:
+    return [ans for ans in answers if ans is not None and ans.strip().upper() != "NOT_FOUND"]
 
 
-def _build_style_hint(category: str) -> str:
-    hints = {
-        "advising": """
-    STYLE:
-    - Provide step-by-step guidance the student can follow.
-    - Include relevant links, offices, or contact info if present.
-    - If scheduling is mentioned, explain the process clearly.
-    """,
-        "engineering_news": """
-    STYLE:
-    - Summarize the most recent updates.
-    - If dates are present, include them.
-    - Give 2–5 key highlights, not a huge list.
-    """,
-        "events": """
-    STYLE:
-    - Mention upcoming events and relevant dates/times if present.
-    - Keep it brief and offer to narrow by date range or interest.
-    """,
-        "clubs": """
-    STYLE:
-    - Explain how to find/join organizations.
-    - Avoid long lists unless the student explicitly asks for a list.
-    - If giving examples, keep it to 3–6.
-    """,
-        "tutoring": """
-    STYLE:
-    - Mention the specific service or resource that fits the student's need.
-    - Include hours or contact info if present in the source material.
-    - Be encouraging and supportive in tone.
-    """,
-        "counseling": """
-    STYLE:
-    - Be warm, empathetic, and non-judgmental.
-    - Clearly state how to access services (phone, walk-in, appointment).
-    - Remind the student that seeking help is a sign of strength.
-    """,
-        "financial_aid": """
-    STYLE:
-    - Break down options or steps clearly.
-    - Include deadlines or important dates if present in the source material.
-    - Direct the student to the Financial Aid office for personalized guidance.
-    """,
-        "career": """
-    STYLE:
-    - Highlight actionable next steps (e.g., visit Handshake, attend a career fair).
-    - Mention specific resources like the Career Development Center.
-    - Keep it practical and motivating.
-    """,
-        "registration": """
-    STYLE:
-    - Give clear, sequential steps the student can follow.
-    - Reference systems by name (CougarNet, Banner) if relevant.
-    - Mention add/drop deadlines if present in the source material.
-    """,
-        "graduation": """
-    STYLE:
-    - Outline the steps to apply for graduation clearly.
-    - Include relevant deadlines if present in the source material.
-    - Remind the student to confirm requirements with their academic advisor.
-    """,
-        "engineering_dept": """
-    STYLE:
-    - Be specific about which department or program the information applies to.
-    - Include faculty contacts or office locations if present in the source material.
-    - Keep technical details accurate and clear.
-    """,
-        "library": """
-    STYLE:
-    - When listing resources or services, use a bullet list with concise descriptions of each item.
-    - Always include hours or location details if present in the source material.
-    - End with a direct link to the most relevant library page.
-    """,
-    }
-    return hints.get(category, "")
-
-
-#def generate_answer(question: str, context: str) -> str:
-#def generate_answer(question: str, context: str, category: str, history: list[dict]) -> str:
-def generate_answer(question: str, context: str, category: str, history: list[dict], allowed_urls: list[str]) -> str:
-    chunks = chunk_text(context)
-
-    history_block = format_history(history)
-    allowed_links_block = ""
-    if allowed_urls:
-        allowed_links_block = "ALLOWED LINKS (you may only use these exact URLs):\n" + "\n".join(allowed_urls[:8])
+async def extract_partial_answers_async(
+    question: str,
+    chunks: list[str],
+    history_block: str,
+    allowed_urls: list[str] | None = None,
+    timeout: float | None = None,
+    category: str | None = None,
+) -> list[str]:
+    """
+    Runs answer_from_chunk_async for every chunk concurrently and returns the
+    useful answers in chunk order. At most EXTRACTION_MAX_WORKERS calls are in
+    flight across all chats. Calls that fail, answer NOT_FOUND, or are not
+    done within the timeout (queueing for a slot included) are dropped so
+    synthesis is never blocked.
+
+    With a category, results (NOT_FOUND included) are memoised per chunk,
+    normalized question and category. Only pass it for standalone turns:
+    the prompt also carries the conversation history.
+    """
+    if timeout is None:
+        timeout = EXTRACTION_TIMEOUT_SECONDS
 
-    style_hint = _build_style_hint(category)
+    keys = _extraction_keys(question, chunks, category, allowed_urls)
+    answers = [get_extraction(key) if key is not None else None for key in keys]
+    pending = [i for i, ans in enumerate(answers) if ans is None]
 
-    partial_answers: list[str] = []
-    for chunk in chunks[:5]:  # cost/time safety cap
-        ans = answer_from_chunk(question, chunk, history_block)
+    async def _extract(chunk: str) -> str:
+        async with _extraction_limit.get():
+            return await answer_from_chunk_async(question, chunk, history_block, allowed_urls)
 
-        # IMPORTANT: your old check looked for "not found" which misses "NOT_FOUND"
-        if ans.strip().upper() != "NOT_FOUND":
-            partial_answers.append(ans)
+    results = await asyncio.gather(
+        *(asyncio.wait_for(_extract(chunks[i]), timeout) for i in pending), return_exceptions=True
+    )
 
-    # if not partial_answers:
-    #     return "I couldn't find specific information on SIUE pages to answer that question."
+    for i, ans in zip(pending, results):
+        if isinstance(ans, asyncio.TimeoutError):
+            print(f"[EXTRACTION TIMEOUT] chunk {i} exceeded {timeout}s")
+            continue
+        if isinstance(ans, BaseException):
+            print(f"[EXTRACTION ERROR] chunk {i}", ans)
+            continue
 
-    synthesis_prompt = f"""
+        answers[i] = ans
+        if keys[i] is not None:
+            store_extraction(keys[i], ans)
 
-{SYSTEM_POLICY} 
+    return _useful_answers(answers)
 
-Respond in a natural, conversational tone for students.
 
-{style_hint}
+def _build_style_hint(category: str) -> str:
+    return current_registry().style_hints.get(category, "")
 
-CONVERSATION CONTEXT (most recent):
-{history_block}
 
-{allowed_links_block}
-LINK RULES:
-- Only include links from ALLOWED LINKS above.
-- Never invent, guess, rewrite, or “pretty print” URLs.
-- If no ALLOWED LINKS are relevant, do not include any links.
+def _build_synthesis_prompt(
+    category: str,
+    history_block: str,
+    allowed_urls: list[str],
+    partial_answers: list[str],
+    streaming: bool = False,
+) -> str:
+    return prompts.synthesis_prompt(_build_style_hint(category), history_block, allowed_urls, partial_answers, streaming).text
 
-Combine the partial answers into ONE clear answer.
-- Remove duplicates
-- If the student asked about specific resources, services, hours, or items, present them as a formatted bullet list with relevant details.
-- For general or conversational questions, use plain prose (2–4 sentences).
-- Do NOT invent new information
-- Answer the student directly. Do not quote webpage text
-- Always end with a relevant URL from ALLOWED LINKS if one is available.
 
-PARTIAL ANSWERS:
-{chr(10).join(partial_answers)}
-"""
-    return _converse(synthesis_prompt, max_tokens=500)
+def _extraction_chunks(context: str, chunks: list[str] | None) -> list[str]:
+    if chunks is None:
+        chunks = chunk_text(context)
+    return chunks[:MAX_EXTRACTION_CHUNKS]
 
 
-def generate_answer_stream(question: str, context: str, category: str, history: list[dict], allowed_urls: list[str]):
+async def generate_answer_async(
+    question: str,
+    context: str,
+    category: str,
+    history: list[dict],
+    allowed_urls: list[str],
+    chunks: list[str] | None = None,
+) -> str:
     """
-    Same as generate_answer but streams the synthesis step token-by-token.
-    Chunk extraction runs normally first, then the synthesis is streamed.
-    Yields str tokens.
+    Answers the question for the /chat endpoint. `chunks`, when given, are
+    the retrieval-ranked chunks to extract from; otherwise the context is
+    split here and the first chunks are used.
     """
-    chunks = chunk_text(context)
+    chunks = _extraction_chunks(context, chunks)
     history_block = format_history(history)
 
-    allowed_links_block = ""
-    if allowed_urls:
-        allowed_links_block = "ALLOWED LINKS (you may only use these exact URLs):\n" + "\n".join(allowed_urls)
+    partial_answers = await extract_partial_answers_async(
+        question, chunks, history_block, category=category if is_standalone(history) else None
+    )
 
-    style_hint = _build_style_hint(category)
+    synthesis_prompt = _build_synthesis_prompt(category, history_block, allowed_urls, partial_answers)
+    return strip_unauthorized_urls(await _converse_async(synthesis_prompt, max_tokens=500), allowed_urls)
 
-    partial_answers: list[str] = []
-    for chunk in chunks[:5]:
-        ans = answer_from_chunk(question, chunk, history_block, allowed_urls)
-        if ans.strip().upper() != "NOT_FOUND":
-            partial_answers.append(ans)
 
-    synthesis_prompt = f"""
-
-{SYSTEM_POLICY} 
-
-Respond in a natural, conversational tone for students.
-
-{style_hint}
-
-CONVERSATION CONTEXT (most recent):
-{history_block}
-
-{allowed_links_block}
-LINK RULES (critical):
-- You may ONLY use URLs from the ALLOWED LINKS list above, copied exactly character-for-character.
-- Do NOT construct, modify, shorten, or infer any URL.
-- Do NOT use any URL that appears in the partial answers — those are not verified.
-- If no ALLOWED LINKS are provided, do not include any URLs.
-
-LINK USAGE (important):
-- Include links generously throughout the answer wherever they are relevant — do not save them all for the end.
-- If a bullet point describes a service or resource, append its most relevant ALLOWED LINK inline on that bullet.
-- Always close the answer with the single most relevant ALLOWED LINK as a "Learn more" or "For more info" line.
-- Using multiple links from ALLOWED LINKS in one answer is encouraged when each adds value.
-
-Combine the partial answers into ONE clear answer.
-- Remove duplicates
-- If the student asked about specific resources, services, hours, or items, present them as a formatted bullet list with relevant details.
-- For general or conversational questions, use plain prose (2–4 sentences).
-- Do NOT invent new information
-- Answer the student directly. Do not quote webpage text
-
-PARTIAL ANSWERS:
-{chr(10).join(partial_answers)}
-"""
+async def _converse_stream_async(prompt: str, max_tokens: int) -> AsyncIterator[str]:
+    """
+    Streams a Converse reply token by token straight off bedrock_async's
+    connection. If the client goes away, closing this generator closes the
+    Bedrock stream with it.
+    """
     try:
-        resp = bedrock.converse_stream(
-            modelId=MODEL_ID,
-            messages=[{"role": "user", "content": [{"text": synthesis_prompt}]}],
-            inferenceConfig={"maxTokens": 400, "temperature": 0.2, "topP": 0.9},
-        )
-        for event in resp["stream"]:
-            if "contentBlockDelta" in event:
-                token = event["contentBlockDelta"]["delta"].get("text", "")
-                if token:
-                    yield token
+        async with aclosing(bedrock_async.converse_stream(**_converse_request(prompt, max_tokens))) as events:
+            async for event in events:
+                if "contentBlockDelta" in event:
+                    token = event["contentBlockDelta"]["delta"].get("text", "")
+                    if token:
+                        yield token
+                elif "metadata" in event:
+                    _log_usage(event["metadata"].get("usage"))
     except ClientError as e:
         print("[BEDROCK STREAM ERROR]", e)
         raise
+
+
+async def generate_answer_stream_async(
+    question: str,
+    context: str,
+    category: str,
+    history: list[dict],
+    allowed_urls: list[str],
+    chunks: list[str] | None = None,
+) -> AsyncIterator[str]:
+    """
+    Same as generate_answer_async but streams the synthesis step token by
+    token, for /chat/stream. Chunk extraction runs concurrently first, then the synthesis is
+    streamed. Yields str tokens.
+    """
+    chunks = _extraction_chunks(context, chunks)
+    history_block = format_history(history)
+
+    partial_answers = await extract_partial_answers_async(
+        question, chunks, history_block, allowed_urls, category=category if is_standalone(history) else None
+    )
+
+    synthesis_prompt = _build_synthesis_prompt(category, history_block, allowed_urls, partial_answers, streaming=True)
+    async for token in _converse_stream_async(synthesis_prompt, max_tokens=400):
+        yield token
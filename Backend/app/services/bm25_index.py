@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+
+from app.services.file_utils import write_json_atomic
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from how i in is it me my of on or "
+    "the to what when where which who why will with you your".split()
+)
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    In-process BM25 index over page chunks, updated one page at a time.
+
+    Each document is a (url, position) chunk reference; the chunk text itself
+    stays with the page's chunk file. Replacing a page drops its old postings,
+    so the index can be kept up to date as pages enter the cache. save() and
+    load() use a flat JSON layout (postings as [doc, tf, doc, tf, ...]).
+    """
+    def __init__(self, k1: float = BM25_K1, b: float = BM25_B):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._postings: dict[str, dict[int, int]] = {}
+        self._docs: dict[int, tuple[str, int, int]] = {}  # doc id -> (url, position, length)
+        self._pages: dict[str, tuple[str, list[int]]] = {}  # url -> (content hash, doc ids)
+        self._next_id = 0
+        self._total_length = 0
+
+    def page_hash(self, url: str) -> str | None:
+        with self._lock:
+            page = self._pages.get(url)
+            return page[0] if page else None
+
+    def add_page(self, url: str, content_hash: str, chunks: list[str]) -> None:
+        """Indexes the page's chunks, replacing whatever was indexed for it before."""
+        with self._lock:
+            self._remove_page(url)
+
+            doc_ids = []
+            for position, chunk in enumerate(chunks):
+                terms = Counter(tokenize(chunk))
+                length = sum(terms.values())
+                doc_id = self._next_id
+                self._next_id += 1
+
+                self._docs[doc_id] = (url, position, length)
+                self._total_length += length
+                for term, tf in terms.items():
+                    self._postings.setdefault(term, {})[doc_id] = tf
+                doc_ids.append(doc_id)
+
+            self._pages[url] = (content_hash, doc_ids)
+
+    def remove_page(self, url: str) -> None:
+        with self._lock:
+            self._remove_page(url)
+
+    def search(self, query: str, urls: list[str] | None = None, k: int = 2) -> list[tuple[str, int, float]]:
+        """
+        Top-k (url, position, score) chunk matches for the query, optionally
+        limited to chunks from `urls`. Chunks with no query terms never match.
+        """
+        with self._lock:
+            if not self._docs:
+                return []
+
+            allowed = None
+            if urls is not None:
+                allowed = {doc_id for url in urls if url in self._pages for doc_id in self._pages[url][1]}
+
+            n = len(self._docs)
+            avg_length = self._total_length / n or 1.0
+            scores: dict[int, float] = {}
+
+            for term, qtf in Counter(tokenize(query)).items():
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    if allowed is not None and doc_id not in allowed:
+                        continue
+                    length = self._docs[doc_id][2]
+                    norm = tf * (self.k1 + 1) / (tf + self.k1 * (1 - self.b + self.b * length / avg_length))
+                    scores[doc_id] = scores.get(doc_id, 0.0) + qtf * idf * norm
+
+            # Ties keep insertion order, so earlier pages and chunks win
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+            return [(self._docs[doc_id][0], self._docs[doc_id][1], score) for doc_id, score in ranked]
+
+    def save(self, path: str) -> None:
+        with self._lock:
+            data = {
+                "next_id": self._next_id,
+                "pages": {url: [content_hash, ids] for url, (content_hash, ids) in self._pages.items()},
+                "docs": [[doc_id, url, position, length] for doc_id, (url, position, length) in self._docs.items()],
+                "postings": {
+                    term: [value for doc_id, tf in postings.items() for value in (doc_id, tf)]
+                    for term, postings in self._postings.items()
+                },
+            }
+        write_json_atomic(path, data, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path: str) -> BM25Index:
+        """Loads a saved index, or returns an empty one if there is none yet."""
+        index = cls()
+        if not os.path.exists(path):
+            return index
+
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        index._next_id = data["next_id"]
+        index._pages = {url: (content_hash, ids) for url, (content_hash, ids) in data["pages"].items()}
+        for doc_id, url, position, length in data["docs"]:
+            index._docs[doc_id] = (url, position, length)
+            index._total_length += length
+        for term, flat in data["postings"].items():
+            index._postings[term] = dict(zip(flat[::2], flat[1::2]))
+        return index
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"pages": len(self._pages), "chunks": len(self._docs), "terms": len(self._postings)}
+
+    def _remove_page(self, url: str) -> None:
+        page = self._pages.pop(url, None)
+        if page is None:
+            return
+
+        doomed = set(page[1])
+        for doc_id in doomed:
+            self._total_length -= self._docs.pop(doc_id)[2]
+        for term in list(self._postings):
+            postings = self._postings[term]
+            for doc_id in doomed.intersection(postings):
+                del postings[doc_id]
+            if not postings:
+                del self._postings[term]
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Awaitable, Callable
+
+from playwright.async_api import Browser, BrowserContext, Page, async_playwright
+
+BROWSER_MAX_PAGES = 4  # concurrent renders
+BROWSER_RECYCLE_AFTER = 100  # renders before the browser is replaced
+
+RenderHandler = Callable[[Page, str], Awaitable[str]]
+
+
+class BrowserPool:
+    """
+    Long-lived headless Chromium shared by every dynamic page render.
+
+    Playwright runs on its own event loop in a daemon thread, so renders never
+    block the caller's loop (fetch_dynamic_page_async), and the pool outlives
+    any one of them. Pages are reused across renders, at most `max_pages` render
+    at once, and the browser is replaced after `recycle_after` renders or when
+    it disconnects. A render is "cold" if it had to launch a browser first.
+    """
+    def __init__(self, max_pages: int = BROWSER_MAX_PAGES, recycle_after: int = BROWSER_RECYCLE_AFTER, headless: bool = True):
+        self.max_pages = max_pages
+        self.recycle_after = recycle_after
+        self.headless = headless
+
+        self._start_lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+
+        # Only touched from the pool's own loop
+        self._slots: asyncio.Semaphore | None = None
+        self._launch_lock: asyncio.Lock | None = None
+        self._playwright = None
+        self._browser: Browser | None = None
+        self._context: BrowserContext | None = None
+        self._generation = 0
+        self._renders_on_browser = 0
+        self._idle_pages: list[Page] = []
+        self._active: dict[int, int] = {}
+        self._retired: dict[int, Browser] = {}
+
+        self._stats = {"warm_renders": 0, "cold_renders": 0, "recycles": 0, "crashes": 0}
+
+    # ---- public API ----
+
+    async def render_async(self, url: str, handler: RenderHandler) -> str:
+        """Runs handler(page, url) on a pooled page and returns its result."""
+        future = asyncio.run_coroutine_threadsafe(self._render(url, handler), self._ensure_loop())
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> dict:
+        return {
+            **self._stats,
+            "active_pages": sum(self._active.values()),
+            "idle_pages": len(self._idle_pages),
+            "browser_generation": self._generation,
+        }
+
+    def close(self) -> None:
+        with self._start_lock:
+            loop, thread = self._loop, self._thread
+            if loop is None or thread is None or not thread.is_alive():
+                return
+            try:
+                asyncio.run_coroutine_threadsafe(self._shutdown(), loop).result(timeout=30)
+            finally:
+                loop.call_soon_threadsafe(loop.stop)
+                thread.join(timeout=5)
+                self._loop = None
+                self._thread = None
+
+    # ---- internals (run on the pool loop) ----
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._loop = asyncio.new_event_loop()
+                self._slots = asyncio.Semaphore(self.max_pages)
+                self._launch_lock = asyncio.Lock()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="browser-pool", daemon=True)
+                self._thread.start()
+            return self._loop
+
+    async def _render(self, url: str, handler: RenderHandler) -> str:
+        async with self._slots:
+            page, generation = await self._acquire_page()
+            reusable = False
+            try:
+                result = await handler(page, url)
+                reusable = True
+                return result
+            finally:
+                await self._release_page(page, generation, reusable)
+
+    async def _acquire_page(self) -> tuple[Page, int]:
+        async with self._launch_lock:
+            cold = False
+            if self._browser is None or not self._browser.is_connected():
+                if self._browser is not None:
+                    self._stats["crashes"] += 1
+                    print("[BROWSER POOL] browser disconnected, relaunching")
+                    await self._retire_browser()
+                await self._launch()
+                cold = True
+            elif self._renders_on_browser >= self.recycle_after:
+                self._stats["recycles"] += 1
+                await self._retire_browser()
+                await self._launch()
+                cold = True
+
+            self._renders_on_browser += 1
+            self._stats["cold_renders" if cold else "warm_renders"] += 1
+
+            generation = self._generation
+            self._active[generation] = self._active.get(generation, 0) + 1
+            page = self._idle_pages.pop() if self._idle_pages else None
+            context = self._context
+
+        if page is None:
+            try:
+                page = await context.new_page()
+            except BaseException:
+                await self._end_render(generation)
+                raise
+        return page, generation
+
+    async def _release_page(self, page: Page, generation: int, reusable: bool) -> None:
+        current = generation == self._generation and self._browser is not None and self._browser.is_connected()
+        if reusable and current and len(self._idle_pages) < self.max_pages:
+            try:
+                await page.goto("about:blank")
+                self._idle_pages.append(page)
+            except Exception:
+                await self._close_quietly(page)
+        else:
+            await self._close_quietly(page)
+
+        await self._end_render(generation)
+
+    async def _end_render(self, generation: int) -> None:
+        self._active[generation] = self._active.get(generation, 1) - 1
+
+        # Close a retired browser once its last in-flight render is done
+        if generation in self._retired and self._active[generation] == 0:
+            await self._close_quietly(self._retired.pop(generation))
+            self._active.pop(generation, None)
+
+    async def _launch(self) -> None:
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(headless=self.headless)
+        self._context = await self._browser.new_context()
+        self._generation += 1
+        self._renders_on_browser = 0
+
+    async def _retire_browser(self) -> None:
+        """Stops handing out the current browser; it closes once idle."""
+        generation = self._generation
+        browser = self._browser
+        self._idle_pages = []
+        self._browser = None
+        self._context = None
+        if self._active.get(generation, 0) > 0:
+            self._retired[generation] = browser
+        else:
+            self._active.pop(generation, None)
+            await self._close_quietly(browser)
+
+    async def _shutdown(self) -> None:
+        for page in self._idle_pages:
+            await self._close_quietly(page)
+        self._idle_pages = []
+        for browser in [self._browser, *self._retired.values()]:
+            if browser is not None:
+                await self._close_quietly(browser)
+        self._browser = None
+        self._context = None
+        self._retired = {}
+        self._active = {}
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    @staticmethod
+    async def _close_quietly(target) -> None:
+        try:
+            await target.close()
+        except Exception:
+            pass
+
+
+browser_pool = BrowserPool()
@@ -0,0 +1,143 @@
+"""
+Keeps the page cache (and its chunk index) warm so students never pay for a
+cold fetch.
+
+Runs as a background task from the app lifespan (in one Uvicorn worker at a
+time, see run_warmer), and as a CLI to pre-build the cache for a new
+deployment:
+
+    python -m app.services.cache_warmer [--force] [--concurrency N]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, every worker warms
+    fcntl = None
+
+from app.services.browser_pool import browser_pool
+from app.services.chunk_index import flush_index, page_chunks
+from app.services.registry import current_registry
+from app.services.web_fetcher import cache_age, cache_ttl_for, close_async_client, refresh_page_text_async
+
+WARMER_ENABLED = True
+WARM_INTERVAL_SECONDS = 60 * 10  # keep below the shortest per-source TTL
+WARM_CONCURRENCY = 3
+WARM_JITTER_SECONDS = 2.0  # random delay before each fetch, spreads load on siue.edu
+WARM_LOCK_FILE = "cache/warmer.lock"  # held by the one worker that runs the warmer
+
+
+def known_source_urls() -> list[str]:
+    """Every URL select_sources can return, in a stable order, without duplicates."""
+    return current_registry().all_source_urls()
+
+
+def needs_warming(url: str, interval: float = WARM_INTERVAL_SECONDS) -> bool:
+    """True if the page is missing or would expire before the next warm pass."""
+    age = cache_age(url)
+    return age is None or age + interval >= cache_ttl_for(url)
+
+
+async def warm_cache(
+    urls: list[str] | None = None,
+    force: bool = False,
+    concurrency: int = WARM_CONCURRENCY,
+    jitter: float = WARM_JITTER_SECONDS,
+) -> dict:
+    if urls is None:
+        urls = known_source_urls()
+
+    due = [url for url in urls if force or needs_warming(url)]
+    summary = {"checked": len(urls), "refreshed": 0, "failed": 0, "skipped": len(urls) - len(due)}
+    limit = asyncio.Semaphore(concurrency)
+
+    async def _warm(url: str) -> None:
+        async with limit:
+            if jitter:
+                await asyncio.sleep(random.uniform(0, jitter))
+            try:
+                text = await refresh_page_text_async(url)
+                # Chunk the new version now so the next turn only has to rank it
+                page_chunks(url, text)
+                summary["refreshed"] += 1
+            except Exception as e:
+                summary["failed"] += 1
+                print("[WARM ERROR]", url, e)
+
+    await asyncio.gather(*(_warm(url) for url in due))
+    print(f"[CACHE WARM] {summary}")
+    return summary
+
+
+def try_warmer_lock(path: str = WARM_LOCK_FILE):
+    """
+    Takes the warmer lock without blocking. Returns the open lock file (keep
+    it open to hold the lock) or None if another process holds it. The OS
+    drops the lock when the holder exits, even if it crashes.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    lock = open(path, "a")
+    if fcntl is None:
+        return lock
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock.close()
+        return None
+    return lock
+
+
+async def run_warmer(interval: float = WARM_INTERVAL_SECONDS, lock_path: str = WARM_LOCK_FILE) -> None:
+    """
+    Warms once at startup, then every `interval` seconds (plus jitter).
+
+    With `--workers N` every worker starts this task, but only the one holding
+    `lock_path` warms; the others retry the lock each interval and take over
+    if that worker exits.
+    """
+    lock = None
+    try:
+        while True:
+            if lock is None:
+                lock = try_warmer_lock(lock_path)
+            if lock is not None:
+                try:
+                    await warm_cache()
+                except Exception as e:
+                    print("[WARM ERROR]", e)
+            await asyncio.sleep(interval + random.uniform(0, interval * 0.1))
+    finally:
+        if lock is not None:
+            lock.close()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Pre-fetch every known SIUE source into the page cache.")
+    parser.add_argument("--force", action="store_true", help="refresh every page, even fresh ones")
+    parser.add_argument("--concurrency", type=int, default=WARM_CONCURRENCY)
+    parser.add_argument("--jitter", type=float, default=0.0, help="max random delay before each fetch (seconds)")
+    args = parser.parse_args(argv)
+
+    async def _run() -> dict:
+        try:
+            return await warm_cache(force=args.force, concurrency=args.concurrency, jitter=args.jitter)
+        finally:
+            await close_async_client()
+
+    try:
+        summary = asyncio.run(_run())
+    finally:
+        flush_index()
+        browser_pool.close()
+
+    if summary["failed"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from app.services.bm25_index import BM25Index
+from app.services.file_utils import write_json_atomic
+from app.services.text_utils import chunk_text
+
+# Pages are split once per content version and the chunks are kept on disk,
+# so a turn only ranks precomputed chunks instead of re-splitting every page.
+# Ranking uses one BM25 index over every indexed page (bm25.json).
+# Indexing happens on the request path, so only the in-memory structures are
+# updated there; chunk files and bm25.json are written in the background.
+INDEX_DIR = "cache/index"
+BM25_INDEX_FILE = "bm25.json"
+BM25_SAVE_DELAY_SECONDS = 5.0  # changes within this window share one bm25.json write
+CHUNK_WORDS = 300
+CHUNK_OVERLAP = 50
+TOP_K_CHUNKS = 2
+
+
+@dataclass
+class PageChunks:
+    url: str
+    content_hash: str
+    chunks: list[str]
+
+
+_pages: dict[str, PageChunks] = {}
+_pages_lock = threading.Lock()
+
+_bm25: BM25Index | None = None
+_bm25_lock = threading.Lock()
+
+# One writer thread, so writes to the same file land in order
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chunk-index-writer")
+_save_timer: threading.Timer | None = None
+_save_lock = threading.Lock()
+
+
+def load_index() -> BM25Index:
+    """The BM25 index, loaded from disk on first use (called at startup)."""
+    global _bm25
+    with _bm25_lock:
+        if _bm25 is None:
+            _bm25 = BM25Index.load(os.path.join(INDEX_DIR, BM25_INDEX_FILE))
+            print(f"[CHUNK INDEX] loaded {_bm25.stats()}")
+        return _bm25
+
+
+def _register(page: PageChunks) -> None:
+    """Adds the page to the BM25 index unless this version is already in it."""
+    index = load_index()
+    if index.page_hash(page.url) == page.content_hash:
+        return
+    index.add_page(page.url, page.content_hash, page.chunks)
+    _schedule_save(index, os.path.join(INDEX_DIR, BM25_INDEX_FILE))
+
+
+def _schedule_save(index: BM25Index, path: str) -> None:
+    """Saves the index BM25_SAVE_DELAY_SECONDS from now, unless a save is already due."""
+    global _save_timer
+    with _save_lock:
+        if _save_timer is not None:
+            return
+        _save_timer = threading.Timer(BM25_SAVE_DELAY_SECONDS, _save_index, args=(index, path))
+        _save_timer.daemon = True
+        _save_timer.start()
+
+
+def _save_index(index: BM25Index, path: str) -> None:
+    global _save_timer
+    with _save_lock:
+        _save_timer = None  # changes from here on schedule another save
+    try:
+        index.save(path)
+    except OSError as e:
+        print("[CHUNK INDEX ERROR] could not save", path, e)
+
+
+def flush_index() -> None:
+    """Writes pending chunk files and the BM25 index now (at shutdown, and by the CLI)."""
+    global _save_timer
+    _writer.submit(lambda: None).result()
+    with _save_lock:
+        timer, _save_timer = _save_timer, None
+    if timer is not None:
+        timer.cancel()
+        _save_index(*timer.args)
+
+
+def _content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _index_path_for_url(url: str) -> str:
+    hashed = hashlib.sha256(url.encode()).hexdigest()
+    return os.path.join(INDEX_DIR, f"{hashed}.chunks.json")
+
+
+def _write_chunk_file(path: str, page: PageChunks) -> None:
+    try:
+        write_json_atomic(path, {"url": page.url, "content_hash": page.content_hash, "chunks": page.chunks})
+    except OSError as e:
+        print("[CHUNK INDEX ERROR] could not write", path, e)
+
+
+def index_page(url: str, text: str) -> PageChunks:
+    """
+    Chunks the page and adds it to memory and the BM25 index; its chunk file
+    and the index are written to disk in the background.
+    """
+    chunks = chunk_text(text, chunk_size=CHUNK_WORDS, overlap=CHUNK_OVERLAP)
+    page = PageChunks(url=url, content_hash=_content_hash(text), chunks=chunks)
+    _writer.submit(_write_chunk_file, _index_path_for_url(url), page)
+
+    with _pages_lock:
+        _pages[url] = page
+    _register(page)
+    return page
+
+
+def page_chunks(url: str, text: str) -> PageChunks:
+    """
+    Returns the precomputed chunks for this exact page text: from memory, then
+    from disk, and only builds them if the page content has changed.
+    """
+    content_hash = _content_hash(text)
+
+    with _pages_lock:
+        page = _pages.get(url)
+    if page is not None and page.content_hash == content_hash:
+        return page
+
+    path = _index_path_for_url(url)
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            stored = json.load(f)
+        if stored["content_hash"] == content_hash:
+            page = PageChunks(url=url, content_hash=content_hash, chunks=stored["chunks"])
+            with _pages_lock:
+                _pages[url] = page
+            _register(page)
+            return page
+
+    return index_page(url, text)
+
+
+def rank_chunks(question: str, pages: list[PageChunks], k: int = TOP_K_CHUNKS) -> list[str]:
+    """
+    Top-k chunks across the given pages by BM25 score against the question.
+    Falls back to each page's first chunk when nothing in the question matches.
+    """
+    if not pages:
+        return []
+
+    by_url = {page.url: page for page in pages}
+    hits = load_index().search(question, urls=list(by_url), k=k)
+
+    ranked = []
+    for url, position, _ in hits:
+        chunks = by_url[url].chunks
+        if position < len(chunks):
+            ranked.append(chunks[position])
+    if ranked:
+        return ranked
+
+    return [page.chunks[0] for page in pages if page.chunks][:k]
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import hashlib
+
+from app.services.answer_cache import normalize_question
+from app.services.lru_cache import LRUCache
+
+# Per-chunk extraction results for standalone questions, NOT_FOUND included,
+# so repeat questions skip extraction and known-irrelevant chunks are never
+# sent to Bedrock again. Chunk text is part of the key, so a changed page
+# simply misses.
+EXTRACTION_CACHE_ENABLED = True
+EXTRACTION_CACHE_MAX_ENTRIES = 4096
+EXTRACTION_CACHE_TTL_SECONDS = 60 * 60 * 6
+
+_extractions = LRUCache(max_entries=EXTRACTION_CACHE_MAX_ENTRIES, ttl_seconds=EXTRACTION_CACHE_TTL_SECONDS)
+
+
+def extraction_key(question: str, chunk: str, category: str, allowed_urls: list[str] | None = None) -> tuple:
+    chunk_hash = hashlib.sha256(chunk.encode("utf-8")).hexdigest()
+    return (chunk_hash, normalize_question(question), category, tuple(allowed_urls or ()))
+
+
+def get_extraction(key: tuple) -> str | None:
+    if not EXTRACTION_CACHE_ENABLED:
+        return None
+    return _extractions.get(key)
+
+
+def store_extraction(key: tuple, answer: str) -> None:
+    if not EXTRACTION_CACHE_ENABLED:
+        return
+    _extractions.set(key, answer)
+
+
+def clear() -> None:
+    _extractions.clear()
+
+
+def stats() -> dict:
+    return _extractions.stats()
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from typing import Any
+
+
+def write_json_atomic(path: str, data: Any, **dump_kwargs) -> None:
+    """
+    Writes `data` as UTF-8 JSON via a temp file and os.replace, so concurrent
+    writers and readers (other threads or workers) never see a partial file.
+    Extra keyword arguments go to json.dump.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, **dump_kwargs)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
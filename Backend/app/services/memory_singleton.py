@@ -1,6 +1,23 @@
-from app.services.session_memory import SessionMemoryStore
+from app.services.session_memory import SessionBackend, SessionMemoryStore
+from app.services.session_sqlite import SQLiteSessionStore
 
-memory_store = SessionMemoryStore(
-    max_messages=12,
-    ttl_seconds=60 * 60
-)
+# "memory" keeps history inside this process (single worker, lost on restart);
+# "sqlite" shares it between all uvicorn workers on the host via SESSION_DB_PATH.
+SESSION_BACKEND = "memory"
+SESSION_DB_PATH = "cache/sessions.db"
+
+
+def create_memory_store(backend: str = SESSION_BACKEND) -> SessionBackend:
+    if backend == "sqlite":
+        return SQLiteSessionStore(SESSION_DB_PATH, max_messages=12, ttl_seconds=60 * 60)
+    if backend == "memory":
+        return SessionMemoryStore(
+            max_messages=12,
+            ttl_seconds=60 * 60,
+            max_session_bytes=10_000,
+            max_total_bytes=64 * 1024 * 1024,
+        )
+    raise ValueError(f"Unknown session backend: {backend}")
+
+
+memory_store = create_memory_store()
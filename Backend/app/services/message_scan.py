@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+
+from app.services.registry import GENERAL_CATEGORY, Registry, current_registry
+
+# Safety keywords match anywhere in the lowercased message, as plain substrings.
+CRISIS_KEYWORDS = ["suicide", "self harm", "kill myself", "hurt myself"]
+
+BLOCKED_KEYWORDS = [
+    # politics / elections / lobbying
+    "vote", "election", "democrat", "republican", "trump", "biden", "politics",
+    # hate/harassment
+    "hate", "racist", "slur",
+    # violence / threats (specific phrases only to avoid false positives)
+    "i want to kill", "going to kill", "bomb threat", "school shooting",
+    # weapons in a threatening context
+    "bomb", "weapon",
+    # explicit sexual content
+    "porn",
+]
+
+# Category keywords come from the registry and match at the start of a word,
+# so "events" and "tutors" still hit "event" and "tutor". Its whole-word
+# keywords must also end a word: "si" is not "siue", "caps" is not "capstone".
+
+DEFAULT_CATEGORY = GENERAL_CATEGORY
+
+_CRISIS = "crisis"
+_BLOCKED = "blocked"
+_WORD_CHAR_RE = re.compile(r"\w")
+
+
+@dataclass(frozen=True, slots=True)
+class ScanResult:
+    crisis: bool
+    blocked: bool
+    # Every category with a keyword in the message, highest priority first
+    categories: tuple[str, ...]
+
+    @property
+    def allowed(self) -> bool:
+        return not (self.crisis or self.blocked)
+
+    @property
+    def category(self) -> str:
+        return self.categories[0] if self.categories else DEFAULT_CATEGORY
+
+
+@dataclass(frozen=True, slots=True)
+class _Keyword:
+    text: str
+    group: str  # _CRISIS, _BLOCKED or a category name
+    word_start: bool
+    word_end: bool
+
+
+def _trie_pattern(words: list[str]) -> str:
+    """
+    A regex matching any of `words`, longest first, laid out as a trie so the
+    engine rejects a position after one character instead of trying every
+    keyword in turn.
+    """
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+@dataclass(frozen=True, slots=True)
+class _Scanner:
+    registry: Registry
+    pattern: re.Pattern
+    starts_with: dict[str, list[_Keyword]]
+    category_rank: dict[str, int]
+
+
+def _compile_scanner(registry: Registry) -> _Scanner:
+    """
+    One trie regex over every safety and category keyword, plus, for each
+    keyword, the keywords it begins with (itself included). The regex only
+    reports the longest keyword at a position; the shorter ones that start
+    there too come from that table.
+    """
+    keywords = [_Keyword(k, _CRISIS, False, False) for k in CRISIS_KEYWORDS]
+    keywords += [_Keyword(k, _BLOCKED, False, False) for k in BLOCKED_KEYWORDS]
+    keywords += [
+        _Keyword(k, category.name, True, k in registry.whole_word_keywords)
+        for category in registry.categories
+        for k in category.keywords
+    ]
+
+    texts = sorted({k.text for k in keywords})
+    starts_with = {
+        text: [k for k in keywords if text.startswith(k.text)]
+        for text in texts
+    }
+    return _Scanner(
+        registry=registry,
+        pattern=re.compile(_trie_pattern(texts)),
+        starts_with=starts_with,
+        category_rank={category.name: rank for rank, category in enumerate(registry.categories)},
+    )
+
+
+_scanner: _Scanner | None = None
+
+
+def _current_scanner() -> _Scanner:
+    """The scanner for the registry in service, recompiled when the registry reloads."""
+    global _scanner
+    registry = current_registry()
+    scanner = _scanner
+    if scanner is None or scanner.registry is not registry:
+        scanner = _scanner = _compile_scanner(registry)
+    return scanner
+
+
+def _is_word_char(text: str, pos: int) -> bool:
+    return 0 <= pos < len(text) and _WORD_CHAR_RE.match(text, pos) is not None
+
+
+def scan_message(message: str) -> ScanResult:
+    """
+    Safety verdict and category candidates for a message in one pass over its
+    lowercased text: the scanner visits each position where some keyword
+    starts, and every keyword found there is checked against its own
+    word-boundary rule.
+    """
+    scanner = _current_scanner()
+    text = message.lower()
+    crisis = blocked = False
+    categories: set[str] = set()
+
+    search = scanner.pattern.search
+    pos = 0
+    while (match := search(text, pos)) is not None:
+        start = match.start()
+        at_word_start = not _is_word_char(text, start - 1)
+        for keyword in scanner.starts_with[match.group()]:
+            if keyword.group == _CRISIS:
+                crisis = True
+            elif keyword.group == _BLOCKED:
+                blocked = True
+            elif at_word_start and not (keyword.word_end and _is_word_char(text, start + len(keyword.text))):
+                categories.add(keyword.group)
+        pos = start + 1
+
+    return ScanResult(
+        crisis=crisis,
+        blocked=blocked,
+        categories=tuple(sorted(categories, key=scanner.category_rank.__getitem__)),
+    )
@@ -0,0 +1,209 @@
+"""
+Prompt text for the Bedrock extraction and synthesis calls.
+
+Everything that does not depend on the request is rendered once, at import.
+The policy is not part of the prompt text: it goes out as the Converse
+system block, byte-for-byte identical on every call, so Bedrock can cache
+it. A prompt is built as a list of named sections and joined once; stats()
+reports the average bytes and estimated tokens each section costs per call.
+"""
+from __future__ import annotations
+
+import threading
+from collections.abc import Iterable
+
+PROMPT_STATS_ENABLED = True
+BYTES_PER_TOKEN = 4  # rough average for English text; no tokenizer is shipped for the model
+MAX_PROMPT_LINKS = 8
+
+SYSTEM_POLICY = """
+You are EddieBot, an official SIUE assistant.
+
+Rules:
+- Be professional, helpful, and student-friendly.
+- Do not be insulting or negative about SIUE or any individuals.
+- Avoid controversial topics (politics, hate, explicit content). Redirect back to campus resources.
+- Use the provided SIUE webpage information when available.
+- If you do not know, say so and suggest where to check (official SIUE site) or ask a clarifying question.
+- Do not invent facts, dates, or policies.
+
+URL RULES (strictly enforced):
+- NEVER write a URL unless it appears word-for-word in the ALLOWED LINKS list you are given.
+- Do not construct, guess, shorten, reformat, or paraphrase any URL.
+- Do not append paths to a base URL you were given (e.g. do not turn siue.edu into siue.edu/library).
+- If no ALLOWED LINKS are provided, do not include any URLs at all.
+- Including an invented or modified URL is a critical error.
+"""
+
+# Sent as the system block of every call; see bedrock_llm._converse_request
+SYSTEM_PROMPT = SYSTEM_POLICY.strip()
+
+_EXTRACTION_LINKS_HEADER = "ALLOWED LINKS (only these may appear in the final answer — do NOT include them here):\n"
+
+_EXTRACTION_TASK = """
+
+TASK:
+- Consider the conversation context above to understand what the student is really asking.
+- Extract ONLY what helps answer the student question given that context.
+- If the question asks about specific resources, services, hours, locations, or items, extract and LIST them concretely with names and relevant details (e.g., hours, room numbers, contact info).
+- For general or conversational questions, summarize in 2–5 sentences.
+- Do NOT copy page text or UI/navigation labels.
+- Do NOT write any URLs in your response. URLs will be added separately.
+
+If the information is not present, respond with EXACTLY:
+NOT_FOUND
+
+"""
+
+_TONE = "Respond in a natural, conversational tone for students.\n\n"
+
+_SYNTHESIS_LINKS_HEADER = "ALLOWED LINKS (you may only use these exact URLs):\n"
+
+_SYNTHESIS_LINK_RULES = """
+LINK RULES:
+- Only include links from ALLOWED LINKS above.
+- Never invent, guess, rewrite, or “pretty print” URLs.
+- If no ALLOWED LINKS are relevant, do not include any links.
+
+"""
+
+# The streamed reply cannot be rewritten afterwards, so it gets stricter
+# link rules and is told to place links inline as it goes.
+_STREAM_LINK_RULES = """
+LINK RULES (critical):
+- You may ONLY use URLs from the ALLOWED LINKS list above, copied exactly character-for-character.
+- Do NOT construct, modify, shorten, or infer any URL.
+- Do NOT use any URL that appears in the partial answers — those are not verified.
+- If no ALLOWED LINKS are provided, do not include any URLs.
+
+LINK USAGE (important):
+- Include links generously throughout the answer wherever they are relevant — do not save them all for the end.
+- If a bullet point describes a service or resource, append its most relevant ALLOWED LINK inline on that bullet.
+- Always close the answer with the single most relevant ALLOWED LINK as a "Learn more" or "For more info" line.
+- Using multiple links from ALLOWED LINKS in one answer is encouraged when each adds value.
+
+"""
+
+_COMBINE = """Combine the partial answers into ONE clear answer.
+- Remove duplicates
+- If the student asked about specific resources, services, hours, or items, present them as a formatted bullet list with relevant details.
+- For general or conversational questions, use plain prose (2–4 sentences).
+- Do NOT invent new information
+- Answer the student directly. Do not quote webpage text
+"""
+
+_SYNTHESIS_COMBINE = _COMBINE + "- Always end with a relevant URL from ALLOWED LINKS if one is available.\n\n"
+_STREAM_COMBINE = _COMBINE + "\n"
+
+
+def estimate_tokens(byte_count: int) -> int:
+    return -(-byte_count // BYTES_PER_TOKEN)
+
+
+class Prompt:
+    """
+    Named sections of one prompt, in order. `text` is the user message;
+    `system` goes out as the system block and is counted as its own section.
+    """
+    __slots__ = ("kind", "system", "_sections")
+
+    def __init__(self, kind: str, system: str = SYSTEM_PROMPT):
+        self.kind = kind
+        self.system = system
+        self._sections: list[tuple[str, str]] = []
+
+    def add(self, name: str, text: str) -> "Prompt":
+        self._sections.append((name, text))
+        return self
+
+    @property
+    def text(self) -> str:
+        return "".join(text for _, text in self._sections)
+
+    def sizes(self) -> dict[str, dict[str, int]]:
+        """Bytes and estimated tokens per section, plus a "total" entry."""
+        sizes: dict[str, dict[str, int]] = {}
+        total = 0
+        for name, text in [("system", self.system), *self._sections]:
+            size = len(text.encode("utf-8"))
+            total += size
+            entry = sizes.setdefault(name, {"bytes": 0, "tokens": 0})
+            entry["bytes"] += size
+            entry["tokens"] = estimate_tokens(entry["bytes"])
+        sizes["total"] = {"bytes": total, "tokens": estimate_tokens(total)}
+        return sizes
+
+
+# kind -> [calls, {section: bytes}]
+_totals: dict[str, list] = {}
+_totals_lock = threading.Lock()
+
+
+def _record(prompt: Prompt) -> Prompt:
+    if not PROMPT_STATS_ENABLED:
+        return prompt
+    sizes = prompt.sizes()
+    with _totals_lock:
+        entry = _totals.setdefault(prompt.kind, [0, {}])
+        entry[0] += 1
+        for name, size in sizes.items():
+            entry[1][name] = entry[1].get(name, 0) + size["bytes"]
+    return prompt
+
+
+def stats() -> dict:
+    """Average bytes and estimated tokens per section, per prompt kind, since start-up."""
+    with _totals_lock:
+        report = {}
+        for kind, (calls, byte_totals) in _totals.items():
+            report[kind] = {
+                "calls": calls,
+                "sections": {
+                    name: {"bytes": round(total / calls), "tokens": estimate_tokens(round(total / calls))}
+                    for name, total in byte_totals.items()
+                },
+            }
+        return report
+
+
+def reset_stats() -> None:
+    with _totals_lock:
+        _totals.clear()
+
+
+def _links_block(header: str, allowed_urls: list[str] | None) -> str:
+    if not allowed_urls:
+        return ""
+    return header + "\n".join(allowed_urls[:MAX_PROMPT_LINKS])
+
+
+def extraction_prompt(question: str, chunk: str, history_block: str, allowed_urls: list[str] | None = None) -> Prompt:
+    prompt = (
+        Prompt("extraction")
+        .add("history", f"CONVERSATION CONTEXT (most recent):\n{history_block}\n\n")
+        .add("links", _links_block(_EXTRACTION_LINKS_HEADER, allowed_urls))
+        .add("task", _EXTRACTION_TASK)
+        .add("chunk", f"UNIVERSITY INFORMATION:\n{chunk}\n\n")
+        .add("question", f"STUDENT QUESTION:\n{question}\n")
+    )
+    return _record(prompt)
+
+
+def synthesis_prompt(
+    style_hint: str,
+    history_block: str,
+    allowed_urls: list[str],
+    partial_answers: Iterable[str],
+    streaming: bool = False,
+) -> Prompt:
+    prompt = (
+        Prompt("synthesis_stream" if streaming else "synthesis")
+        .add("tone", _TONE)
+        .add("style", style_hint + "\n")
+        .add("history", f"\nCONVERSATION CONTEXT (most recent):\n{history_block}\n\n")
+        .add("links", _links_block(_SYNTHESIS_LINKS_HEADER, allowed_urls))
+        .add("link_rules", _STREAM_LINK_RULES if streaming else _SYNTHESIS_LINK_RULES)
+        .add("task", _STREAM_COMBINE if streaming else _SYNTHESIS_COMBINE)
+        .add("partial_answers", "PARTIAL ANSWERS:\n" + "\n".join(partial_answers) + "\n")
+    )
+    return _record(prompt)
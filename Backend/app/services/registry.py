@@ -0,0 +1,180 @@
+"""
+Categories, their keywords, source pages and answer style, plus the page
+routing for "general" questions, all read from registry.json.
+
+The file is validated and compiled into immutable structures when first
+used (and at startup, from the app lifespan). Edits to it are picked up
+without a restart: current_registry() checks the file's mtime at most every
+REGISTRY_RELOAD_INTERVAL_SECONDS, and a file that fails validation is
+reported and ignored, so the last good registry stays in service.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Mapping
+
+REGISTRY_PATH = os.path.join(os.path.dirname(__file__), "registry.json")
+REGISTRY_RELOAD_INTERVAL_SECONDS = 5.0
+
+GENERAL_CATEGORY = "general"
+MAX_GENERAL_SOURCES = 3  # cap for speed/quality
+
+
+@dataclass(frozen=True, slots=True)
+class Category:
+    name: str
+    keywords: tuple[str, ...]
+    sources: tuple[str, ...]
+    style_hint: str
+
+
+@dataclass(frozen=True, slots=True)
+class Registry:
+    # Priority order: when a message hits keywords from several categories, the first one wins
+    categories: tuple[Category, ...]
+    whole_word_keywords: frozenset[str]
+    sources: Mapping[str, tuple[str, ...]]
+    style_hints: Mapping[str, str]
+    general_routes: tuple[tuple[tuple[str, ...], str], ...]
+    general_fallback: tuple[str, ...]
+    mtime: float = 0.0
+
+    def all_source_urls(self) -> list[str]:
+        """Every URL select_sources can return, in a stable order, without duplicates."""
+        urls: list[str] = []
+        for category_urls in self.sources.values():
+            urls.extend(category_urls)
+        urls.extend(url for _, url in self.general_routes)
+        urls.extend(self.general_fallback)
+        return list(dict.fromkeys(urls))
+
+
+def _render_style_hint(lines: list[str]) -> str:
+    if not lines:
+        return ""
+    return "\n    STYLE:\n" + "".join(f"    - {line}\n" for line in lines) + "    "
+
+
+def _string_list(value, where: str, allow_empty: bool = False) -> tuple[str, ...]:
+    if not isinstance(value, list) or not all(isinstance(item, str) and item.strip() for item in value):
+        raise ValueError(f"{where} must be a list of non-empty strings")
+    if not value and not allow_empty:
+        raise ValueError(f"{where} must not be empty")
+    return tuple(value)
+
+
+def _url_list(value, where: str) -> tuple[str, ...]:
+    urls = _string_list(value, where)
+    for url in urls:
+        if not url.startswith("https://"):
+            raise ValueError(f"{where}: {url!r} is not an https:// URL")
+    return urls
+
+
+def parse_registry(data: dict, mtime: float = 0.0) -> Registry:
+    """Validates registry.json content; raises ValueError naming the first problem found."""
+    if not isinstance(data, dict):
+        raise ValueError("registry must be a JSON object")
+
+    categories: list[Category] = []
+    seen_names = {GENERAL_CATEGORY}
+    for index, entry in enumerate(data.get("categories") or []):
+        where = f"categories[{index}]"
+        if not isinstance(entry, dict) or not isinstance(entry.get("name"), str):
+            raise ValueError(f"{where} must be an object with a name")
+        name = entry["name"]
+        if name in seen_names:
+            raise ValueError(f"{where}: category {name!r} is reserved or listed twice")
+        seen_names.add(name)
+        categories.append(Category(
+            name=name,
+            keywords=tuple(k.lower() for k in _string_list(entry.get("keywords"), f"{where}.keywords")),
+            sources=_url_list(entry.get("sources"), f"{where}.sources"),
+            style_hint=_render_style_hint(list(_string_list(entry.get("style", []), f"{where}.style", allow_empty=True))),
+        ))
+    if not categories:
+        raise ValueError("categories must not be empty")
+
+    whole_word = frozenset(
+        k.lower() for k in _string_list(data.get("whole_word_keywords", []), "whole_word_keywords", allow_empty=True)
+    )
+    all_keywords = {k for category in categories for k in category.keywords}
+    unknown = whole_word - all_keywords
+    if unknown:
+        raise ValueError(f"whole_word_keywords not used by any category: {sorted(unknown)}")
+
+    general = data.get("general")
+    if not isinstance(general, dict):
+        raise ValueError("general must be an object")
+    routes = []
+    for index, route in enumerate(general.get("routes") or []):
+        where = f"general.routes[{index}]"
+        if not isinstance(route, dict):
+            raise ValueError(f"{where} must be an object")
+        keywords = tuple(k.lower() for k in _string_list(route.get("keywords"), f"{where}.keywords"))
+        routes.append((keywords, _url_list([route.get("url")], f"{where}.url")[0]))
+
+    sources = {category.name: category.sources for category in categories}
+    sources[GENERAL_CATEGORY] = _url_list(general.get("sources"), "general.sources")
+
+    return Registry(
+        categories=tuple(categories),
+        whole_word_keywords=whole_word,
+        sources=MappingProxyType(sources),
+        style_hints=MappingProxyType({c.name: c.style_hint for c in categories if c.style_hint}),
+        general_routes=tuple(routes),
+        general_fallback=_url_list(general.get("fallback"), "general.fallback"),
+        mtime=mtime,
+    )
+
+
+def load_registry(path: str | None = None) -> Registry:
+    path = path or REGISTRY_PATH
+    mtime = os.stat(path).st_mtime
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return parse_registry(data, mtime=mtime)
+
+
+_registry: Registry | None = None
+_next_check = 0.0
+_reload_lock = threading.Lock()
+
+
+def current_registry() -> Registry:
+    """The registry in service, reloaded if registry.json has changed since."""
+    global _registry, _next_check
+
+    now = time.monotonic()
+    if _registry is not None and now < _next_check:
+        return _registry
+
+    with _reload_lock:
+        if _registry is not None and now < _next_check:
+            return _registry
+        _next_check = now + REGISTRY_RELOAD_INTERVAL_SECONDS
+
+        if _registry is None:
+            _registry = load_registry()
+            return _registry
+
+        try:
+            if os.stat(REGISTRY_PATH).st_mtime != _registry.mtime:
+                _registry = load_registry()
+                print("[REGISTRY RELOADED]", len(_registry.categories), "categories")
+        except (OSError, ValueError) as e:
+            print("[REGISTRY ERROR] keeping the previous registry:", e)
+        return _registry
+
+
+def reset_registry() -> None:
+    """Forgets the loaded registry; the next current_registry() reads the file again."""
+    global _registry, _next_check
+    with _reload_lock:
+        _registry = None
+        _next_check = 0.0
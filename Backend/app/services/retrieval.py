@@ -1,43 +1,97 @@
-from app.services.sources import UNIVERSITY_SOURCES
-from app.services.web_fetcher import fetch_page_text
+import asyncio
+import time
+
+from app.services.async_http import SharedSemaphore
+from app.services.chunk_index import TOP_K_CHUNKS, page_chunks, rank_chunks
+from app.services.registry import GENERAL_CATEGORY, MAX_GENERAL_SOURCES, current_registry
+from app.services.web_fetcher import fetch_page_text_async
+
+# Sources are fetched concurrently; whatever is ready by the deadline is used.
+# Late fetches keep running as tasks so they still land in the page cache.
+RETRIEVAL_MAX_WORKERS = 8
+RETRIEVAL_DEADLINE_SECONDS = 15
+
+_fetch_limit = SharedSemaphore(RETRIEVAL_MAX_WORKERS)  # async fetches across all chats
+
+# Strong references to fetch tasks that outlived their request's deadline.
+_late_fetches: set[asyncio.Task] = set()
+
 
 def select_sources(category: str, message: str) -> list[str]:
-    urls = UNIVERSITY_SOURCES.get(category, [])
+    registry = current_registry()
+    urls = list(registry.sources.get(category, ()))
 
-    if category != "general":
+    if category != GENERAL_CATEGORY:
         return urls
 
     m = message.lower()
 
-    keyword_map = [
-        (["housing", "dorm", "residence"], "https://www.siue.edu/housing/"),
-        (["dining", "meal plan", "food"], "https://www.siue.edu/dining/"),
-        (["admission", "apply"], "https://www.siue.edu/admissions/"),
-        (["major", "program", "degree", "academics"], "https://www.siue.edu/academics/"),
-        (["engineering"], "https://www.siue.edu/engineering/"),
-        (["recreation", "gym", "fitness"], "https://www.siue.edu/campus-recreation/"),
-    ]
-
+    # Pages picked for "general" questions by keyword, plus the fallback pages
     picked = []
-    for keys, url in keyword_map:
+    for keys, url in registry.general_routes:
         if any(k in m for k in keys):
             picked.append(url)
 
     if not picked:
-        picked = ["https://www.siue.edu/", "https://www.siue.edu/about/"]
+        picked = list(registry.general_fallback)
+
+    return picked[:MAX_GENERAL_SOURCES]
+
+
+def _forget_late_fetch(task: asyncio.Task) -> None:
+    _late_fetches.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        print("[FETCH ERROR] (late)", task.exception())
 
-    return picked[:3]  # cap for speed/quality
 
-def retrieve_context(category: str, message: str) -> tuple[str, list[str]]:
-    urls = select_sources(category, message)
+async def _fetch_sources_async(urls: list[str], deadline: float) -> list[tuple[str, str]]:
+    """
+    Fetches the urls concurrently as tasks on the event loop; returns
+    (url, text) for those ready by the deadline, in the given order.
+    """
+    async def _fetch(url: str) -> str:
+        async with _fetch_limit.get():
+            return await fetch_page_text_async(url)
 
-    texts = []
-    fetched_urls = []
-    for url in urls:
+    started = time.monotonic()
+    tasks = [asyncio.ensure_future(_fetch(url)) for url in urls]
+    if tasks:
+        await asyncio.wait(tasks, timeout=deadline)
+
+    pages = []
+    for url, task in zip(urls, tasks):
+        if not task.done():
+            print(f"[FETCH LATE] {url} not ready after {time.monotonic() - started:.1f}s")
+            _late_fetches.add(task)
+            task.add_done_callback(_forget_late_fetch)
+            continue
         try:
-            texts.append(fetch_page_text(url))
-            fetched_urls.append(url)
+            pages.append((url, task.result()))
         except Exception as e:
             print("[FETCH ERROR]", url, e)
 
-    return "\n\n".join(texts), fetched_urls
+    return pages
+
+
+def _top_chunks(message: str, pages: list[tuple[str, str]], top_k: int) -> list[str]:
+    indexed = []
+    for url, text in pages:
+        try:
+            indexed.append(page_chunks(url, text))
+        except Exception as e:
+            print("[INDEX ERROR]", url, e)
+    return rank_chunks(message, indexed, top_k)
+
+
+async def retrieve_chunks_async(
+    category: str, message: str, top_k: int = TOP_K_CHUNKS, deadline: float | None = None
+) -> tuple[list[str], list[str]]:
+    """
+    Fetches the category's sources and returns the top_k indexed chunks most
+    relevant to the message across all of them, plus the fetched urls.
+    """
+    if deadline is None:
+        deadline = RETRIEVAL_DEADLINE_SECONDS
+
+    pages = await _fetch_sources_async(select_sources(category, message), deadline)
+    return _top_chunks(message, pages, top_k), [url for url, _ in pages]
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import math
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from app.services.bm25_index import tokenize
+
+EMBED_DIMENSIONS = 1 << 16
+NGRAM_SIZE = 3
+
+# Words that flip a question's meaning while barely moving its embedding.
+# "t" is what is left of "can't" once punctuation is normalised away.
+NEGATION_WORDS = frozenset(
+    "not no never nor cannot cant dont doesnt didnt isnt arent wasnt werent wont "
+    "wouldnt shouldnt couldnt hasnt havent t".split()
+)
+
+# Question words the embedding drops as stopwords, but which decide what is
+# being asked: "when do I register" is not "how do I register". "what" is
+# left out; it comes and goes without changing the question ("library
+# hours?" / "what are the library hours").
+QUESTION_WORDS = frozenset("when where who whom whose why how which".split())
+
+_GUARD_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def embed_question(text: str) -> dict[int, float]:
+    """
+    Sparse, L2-normalised vector of hashed character trigrams over the
+    question's content words, so "library hours?" and "what are the
+    library hours" land on the same point. Runs on CPU with no model.
+    """
+    counts: dict[int, float] = {}
+    for word in tokenize(text):
+        padded = f" {word} "
+        for i in range(max(1, len(padded) - NGRAM_SIZE + 1)):
+            bucket = zlib.crc32(padded[i:i + NGRAM_SIZE].encode("utf-8")) % EMBED_DIMENSIONS
+            counts[bucket] = counts.get(bucket, 0.0) + 1.0
+
+    norm = math.sqrt(sum(v * v for v in counts.values())) or 1.0
+    return {bucket: v / norm for bucket, v in counts.items()}
+
+
+def question_guard(text: str) -> tuple[tuple[str, ...], tuple[str, ...], tuple[str, ...]]:
+    """
+    The numbers, negations and question words in a question, in order. Two
+    questions can only share an answer if these match exactly: "fall 2025"
+    is not "fall 2026", "can I withdraw" is not "can I not withdraw", and
+    "who is my advisor" is not "where is my advisor".
+    """
+    tokens = _GUARD_TOKEN_RE.findall(text.lower().replace("'", "").replace("\u2019", ""))
+    numbers = tuple(t for t in tokens if any(ch.isdigit() for ch in t))
+    negations = tuple("not" if t != "no" and t != "never" else t for t in tokens if t in NEGATION_WORDS)
+    question_words = tuple(t for t in tokens if t in QUESTION_WORDS)
+    return numbers, negations, question_words
+
+
+def cosine(a: dict[int, float], b: dict[int, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(bucket, 0.0) for bucket, v in a.items())
+
+
+@dataclass
+class _Entry:
+    vector: dict[int, float]
+    guard: tuple[tuple[str, ...], tuple[str, ...], tuple[str, ...]]
+    answer: str
+    sources: str
+    stored_at: float
+
+
+class SemanticCache:
+    """
+    Answers indexed by question embedding, one flat index per category.
+
+    get() returns the answer of the most similar cached question in the
+    category, if it is at least `threshold` similar, has the same numbers,
+    negations and question words (see question_guard) and was answered from the same source
+    content. Each category keeps at most `max_entries`
+    questions (least recently used go first); entries older than
+    `ttl_seconds` are dropped.
+    """
+    def __init__(self, threshold: float = 0.92, max_entries: int = 256, ttl_seconds: float | None = None):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._index: dict[str, OrderedDict[str, _Entry]] = {}
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, category: str, question: str, sources: str) -> str | None:
+        vector = embed_question(question)
+        guard = question_guard(question)
+        now = time.monotonic()
+
+        with self._lock:
+            entries = self._index.get(category, OrderedDict())
+            best_key, best_score = None, self.threshold
+            for key, entry in list(entries.items()):
+                if self.ttl_seconds is not None and now - entry.stored_at > self.ttl_seconds:
+                    del entries[key]
+                    continue
+                if entry.sources != sources or entry.guard != guard:
+                    continue
+                score = cosine(vector, entry.vector)
+                if score >= best_score:
+                    best_key, best_score = key, score
+
+            if best_key is None:
+                self._misses += 1
+                return None
+
+            entries.move_to_end(best_key)
+            self._hits += 1
+            return entries[best_key].answer
+
+    def add(self, category: str, question: str, sources: str, answer: str) -> None:
+        entry = _Entry(
+            vector=embed_question(question),
+            guard=question_guard(question),
+            answer=answer,
+            sources=sources,
+            stored_at=time.monotonic(),
+        )
+
+        with self._lock:
+            entries = self._index.setdefault(category, OrderedDict())
+            entries.pop(question, None)
+            entries[question] = entry
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._index.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "entries": sum(len(entries) for entries in self._index.values()),
+            }
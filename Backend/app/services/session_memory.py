@@ -1,43 +1,117 @@
 from __future__ import annotations
+from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from typing import Deque, Dict, List
-from collections import deque
+from collections import OrderedDict, deque
+import sys
 import time
 
-@dataclass
+@dataclass(slots=True)
 class Message:
-    role: str   # "user" or "assistant"
+    role: str   # "user" or "assistant", interned
     text: str
     ts: float
 
-class SessionMemoryStore:
+class SessionBackend(ABC):
+    """
+    Interface every session history store implements. History is a list of
+    {"role", "text"} dicts, oldest first, capped at max_messages; sessions
+    idle for longer than the TTL are forgotten.
+    """
+    @abstractmethod
+    def get(self, session_id: str) -> List[dict]: ...
+
+    @abstractmethod
+    def add(self, session_id: str, role: str, text: str) -> None: ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Forgets every session."""
+
+    def close(self) -> None:
+        """Flushes pending writes and releases resources."""
+
+
+class SessionMemoryStore(SessionBackend):
     """
     Per-session history in RAM with TTL.
-    Good for dev / single-server hosting.
-    Later: swap to Redis/DynamoDB with same interface.
+    Good for dev / single-server hosting; use SQLiteSessionStore to share
+    sessions between worker processes.
+
+    Memory is bounded twice: each session keeps at most `max_session_bytes`
+    of text (oldest messages go first), and once all sessions together pass
+    `max_total_bytes` the least recently seen sessions are dropped. Sizes
+    are counted in characters, which is close to bytes for chat text.
     """
-    def __init__(self, max_messages: int = 12, ttl_seconds: int = 60 * 60):
+    def __init__(
+        self,
+        max_messages: int = 12,
+        ttl_seconds: int = 60 * 60,
+        max_session_bytes: int = 10_000,
+        max_total_bytes: int = 64 * 1024 * 1024,
+    ):
         self.max_messages = max_messages
         self.ttl_seconds = ttl_seconds
+        self.max_session_bytes = max_session_bytes
+        self.max_total_bytes = max_total_bytes
         self._store: Dict[str, Deque[Message]] = {}
-        self._last_seen: Dict[str, float] = {}
+        # Least recently seen first, so expired sessions are always at the front
+        self._last_seen: OrderedDict[str, float] = OrderedDict()
+        self._bytes: Dict[str, int] = {}
+        self._total_bytes = 0
+
+    def _touch(self, session_id: str) -> None:
+        self._last_seen[session_id] = time.time()
+        self._last_seen.move_to_end(session_id)
+
+    def _drop_session(self, session_id: str) -> None:
+        self._store.pop(session_id, None)
+        self._total_bytes -= self._bytes.pop(session_id, 0)
 
     def _cleanup(self) -> None:
-        now = time.time()
-        expired = [sid for sid, t in self._last_seen.items() if now - t > self.ttl_seconds]
-        for sid in expired:
-            self._store.pop(sid, None)
-            self._last_seen.pop(sid, None)
+        """Pops expired sessions off the front; stops at the first live one."""
+        cutoff = time.time() - self.ttl_seconds
+        while self._last_seen:
+            sid, seen = next(iter(self._last_seen.items()))
+            if seen >= cutoff:
+                break
+            self._last_seen.popitem(last=False)
+            self._drop_session(sid)
 
     def get(self, session_id: str) -> List[dict]:
         self._cleanup()
-        self._last_seen[session_id] = time.time()
-        history = self._store.get(session_id, deque())
+        self._touch(session_id)
+        history = self._store.get(session_id, ())
         return [{"role": m.role, "text": m.text} for m in history]
 
     def add(self, session_id: str, role: str, text: str) -> None:
         self._cleanup()
-        self._last_seen[session_id] = time.time()
-        if session_id not in self._store:
-            self._store[session_id] = deque(maxlen=self.max_messages)
-        self._store[session_id].append(Message(role=role, text=text, ts=time.time()))
+        self._touch(session_id)
+
+        # format_history only ever shows the tail of a long message
+        text = text[-self.max_session_bytes:]
+        history = self._store.get(session_id)
+        if history is None:
+            history = self._store[session_id] = deque()
+        history.append(Message(role=sys.intern(role), text=text, ts=time.time()))
+        self._bytes[session_id] = self._bytes.get(session_id, 0) + len(text)
+        self._total_bytes += len(text)
+
+        while len(history) > self.max_messages or self._bytes[session_id] > self.max_session_bytes:
+            dropped = len(history.popleft().text)
+            self._bytes[session_id] -= dropped
+            self._total_bytes -= dropped
+
+        # The session just added to is the most recent, so it is evicted last
+        while self._total_bytes > self.max_total_bytes and len(self._last_seen) > 1:
+            sid, _ = self._last_seen.popitem(last=False)
+            self._drop_session(sid)
+
+    def clear(self) -> None:
+        self._store.clear()
+        self._last_seen.clear()
+        self._bytes.clear()
+        self._total_bytes = 0
+
+    def stats(self) -> dict:
+        return {"sessions": len(self._last_seen), "bytes": self._total_bytes}
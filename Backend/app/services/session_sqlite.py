@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from typing import List
+
+from app.services.session_memory import SessionBackend
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    role TEXT NOT NULL,
+    text TEXT NOT NULL,
+    ts REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS messages_by_session ON messages (session_id, id);
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    last_seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_by_last_seen ON sessions (last_seen);
+"""
+
+
+class SQLiteSessionStore(SessionBackend):
+    """
+    Session history in one SQLite database (WAL mode) shared by every worker
+    process on the host, so a conversation survives restarts and can move
+    between uvicorn workers.
+
+    Writes are queued and committed together by a background thread every
+    `flush_interval` seconds, or as soon as `batch_size` are queued. This
+    process always sees its own queued writes; other workers see them after
+    the next flush.
+
+    Reads use their own connection. In WAL mode they see the last committed
+    state without waiting for a flush in progress, and the queue lock is
+    only held to swap or copy the queued writes, never across a transaction.
+    """
+    def __init__(
+        self,
+        path: str,
+        max_messages: int = 12,
+        ttl_seconds: int = 60 * 60,
+        flush_interval: float = 0.05,
+        batch_size: int = 256,
+    ):
+        self.path = path
+        self.max_messages = max_messages
+        self.ttl_seconds = ttl_seconds
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Writer connection, used by flush() under _write_lock; autocommit mode with explicit transactions
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(_SCHEMA)
+        self._write_lock = threading.Lock()
+
+        # Reader connection, used by get() under _read_lock
+        self._read_conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._read_conn.execute("PRAGMA query_only=1")
+        self._read_lock = threading.Lock()
+
+        # Queued writes; _inflight holds the batch a flush is committing until it lands
+        self._lock = threading.Lock()
+        self._pending: list[tuple[str, str, str, float]] = []
+        self._touched: dict[str, float] = {}
+        self._inflight: tuple[list[tuple[str, str, str, float]], dict[str, float]] = ([], {})
+
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._flusher = threading.Thread(target=self._run_flusher, name="session-flush", daemon=True)
+        self._flusher.start()
+
+    def get(self, session_id: str) -> List[dict]:
+        now = time.time()
+        # Copy the queue before reading, so a flush landing in between shows
+        # up in both and is dropped from the copy below, never in neither.
+        with self._lock:
+            inflight_pending, inflight_touched = self._inflight
+            queued = [
+                (role, text, ts)
+                for sid, role, text, ts in (*inflight_pending, *self._pending)
+                if sid == session_id
+            ]
+            touched = max(inflight_touched.get(session_id, 0.0), self._touched.get(session_id, 0.0))
+            self._touched[session_id] = now
+
+        with self._read_lock:
+            row = self._read_conn.execute(
+                "SELECT last_seen FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            last_seen = max(row[0] if row else 0.0, touched)
+
+            rows: list[tuple[str, str, float]] = []
+            if now - last_seen <= self.ttl_seconds:
+                rows = self._read_conn.execute(
+                    "SELECT role, text, ts FROM messages WHERE session_id = ? ORDER BY id DESC LIMIT ?",
+                    (session_id, self.max_messages),
+                ).fetchall()[::-1]
+
+        stored = set(rows)
+        rows.extend(message for message in queued if message not in stored)
+        return [{"role": role, "text": text} for role, text, _ in rows[-self.max_messages:]]
+
+    def add(self, session_id: str, role: str, text: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._pending.append((session_id, role, text, now))
+            self._touched[session_id] = now
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self._wake.set()  # flush now, on the flusher thread
+
+    def flush(self) -> None:
+        """Commits queued messages and last-seen times in one transaction."""
+        with self._write_lock:
+            with self._lock:
+                if not self._pending and not self._touched:
+                    return
+                pending, touched = self._pending, self._touched
+                self._pending, self._touched = [], {}
+                self._inflight = (pending, touched)
+
+            try:
+                self._commit(pending, touched)
+            except BaseException:
+                # Requeue the batch ahead of anything added since
+                with self._lock:
+                    self._pending[:0] = pending
+                    for session_id, seen in touched.items():
+                        self._touched[session_id] = max(seen, self._touched.get(session_id, 0.0))
+                raise
+            finally:
+                with self._lock:
+                    self._inflight = ([], {})
+
+    def _commit(self, pending: list[tuple[str, str, str, float]], touched: dict[str, float]) -> None:
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Drop expired sessions first, so a returning session starts clean
+            cutoff = time.time() - self.ttl_seconds
+            conn.execute(
+                "DELETE FROM messages WHERE session_id IN (SELECT session_id FROM sessions WHERE last_seen < ?)",
+                (cutoff,),
+            )
+            conn.execute("DELETE FROM sessions WHERE last_seen < ?", (cutoff,))
+
+            conn.executemany(
+                "INSERT INTO messages (session_id, role, text, ts) VALUES (?, ?, ?, ?)", pending
+            )
+            conn.executemany(
+                "INSERT INTO sessions (session_id, last_seen) VALUES (?, ?) "
+                "ON CONFLICT (session_id) DO UPDATE SET last_seen = MAX(last_seen, excluded.last_seen)",
+                touched.items(),
+            )
+            for session_id in {sid for sid, _, _, _ in pending}:
+                conn.execute(
+                    "DELETE FROM messages WHERE session_id = ? AND id <= "
+                    "(SELECT id FROM messages WHERE session_id = ? ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                    (session_id, session_id, self.max_messages),
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def clear(self) -> None:
+        with self._write_lock:
+            with self._lock:
+                self._pending.clear()
+                self._touched.clear()
+            self._conn.execute("DELETE FROM messages")
+            self._conn.execute("DELETE FROM sessions")
+
+    def close(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        self._flusher.join()
+        self.flush()
+        with self._write_lock:
+            self._conn.close()
+        with self._read_lock:
+            self._read_conn.close()
+
+    def _run_flusher(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print("[SESSION FLUSH ERROR]", e)
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls for the same key into one execution.
+
+    The first coroutine for a key runs the work as its own task; everyone who
+    arrives while it is in flight awaits that result (or exception) instead
+    of repeating it. Callers share one event loop, so the in-flight table
+    needs no lock.
+    """
+    def __init__(self):
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._executed = 0
+        self._deduplicated = 0
+
+    async def do_async(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._inflight.get(key)
+        if task is None:
+            # Run the work as its own task so a cancelled caller (e.g. a
+            # retrieval deadline) doesn't cancel it for every other waiter.
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            self._executed += 1
+            task.add_done_callback(lambda t: self._finish(key, t))
+        else:
+            self._deduplicated += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        return {
+            "executed": self._executed,
+            "deduplicated": self._deduplicated,
+            "in_flight": len(self._inflight),
+        }
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # retrieved here in case every waiter gave up
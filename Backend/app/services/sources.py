@@ -1,72 +1,6 @@
-UNIVERSITY_SOURCES = {
-    "clubs": [
-        "https://www.siue.edu/engineering/students-life/student-organizations.shtml"
-        # "https://getinvolved.siue.edu/organizations" Focuses on non-engineering clubs
-    ],
-    "events": [
-        "https://www.siue.edu/calendar/",
-        "https://www.siue.edu/engineering/students-life/student-competitions.shtml"
-    ],
-    "advising": [
-        "https://www.siue.edu/academic-advising/contact-us/index.shtml",
-        "https://www.siue.edu/academic-advising/resources/index.shtml",
-        "https://www.siue.edu/academic-advising/new-first-year-students/index.shtml",
-        "https://www.siue.edu/retention/first-generation/firstgenglossary.shtml",
-        "https://www.siue.edu/academic-advising/transfer-students/index.shtml",
-        "https://www.siue.edu/academic-advising/current-students/index.shtml"
-    ],
-    "engineering_news": [
-        "https://www.siue.edu/engineering/about/news/index.shtml"
-    ],
-    "tutoring": [
-        "https://www.siue.edu/lss/tutoring-resource-center/",
-        "https://www.siue.edu/lss/supplemental-instruction/index.shtml",
-    ],
-    "counseling": [
-        "https://www.siue.edu/counseling-health/",
-        "https://www.siue.edu/counseling-health/about/index.shtml",
-        "https://www.siue.edu/counseling-health/type-of-visit/index.shtml"
-    ],
-    "financial_aid": [
-        "https://www.siue.edu/financial-aid/",
-        "https://www.siue.edu/financial-aid/scholarships/scholarships-awards-grants/index.shtml",
-        "https://www.siue.edu/bursar/",
-        "https://www.siue.edu/engineering/financial-opportunities/index.shtml"
-    ],
-    "career": [
-        "https://www.siue.edu/career-development-center/",
-        "https://www.siue.edu/career-development-center/coops-internships/index.shtml",
-        "https://www.siue.edu/career-development-center/students/index.shtml"
-    ],
-    "registration": [
-        "https://www.siue.edu/registrar/",
-        "https://www.siue.edu/registrar/calendars/index.shtml",
-        "https://www.siue.edu/registrar/services/registration/index.shtml"
-    ],
-    "graduation": [
-        "https://www.siue.edu/registrar/services/graduation/index.shtml",
-        "https://www.siue.edu/commencement/",
-        "https://www.siue.edu/commencement/events-schedules/index.shtml"
-    ],
-    "engineering_dept": [
-        "https://www.siue.edu/engineering/",
-        "https://www.siue.edu/engineering/programs-departments/index.shtml",
-        "https://www.siue.edu/engineering/about/index.shtml"
-    ],
-    "library": [
-        "https://www.siue.edu/lovejoy-library/index.shtml",
-        "https://www.siue.edu/lovejoy-library/research-support/index.shtml",
-        "https://www.siue.edu/lovejoy-library/services/index.shtml",
-        "https://siue.libcal.com/hours/"
-    ],
-    "general": [
-        "https://www.siue.edu/",
-        "https://www.siue.edu/about/",
-        "https://www.siue.edu/admissions/",
-        "https://www.siue.edu/academics/",
-        "https://www.siue.edu/engineering/",
-        "https://www.siue.edu/campus-recreation/",
-        "https://www.siue.edu/housing/",
-        "https://www.siue.edu/dining/",
-    ]
-}
+from app.services.registry import current_registry
+
+# Category -> source pages, as loaded from registry.json at import time. Kept
+# for scripts and older callers; code that should follow registry edits
+# reads current_registry().sources instead.
+UNIVERSITY_SOURCES = {category: list(urls) for category, urls in current_registry().sources.items()}
@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+
+def chunk_text(text: str, chunk_size: int = 1200, overlap: int = 100) -> list[str]:
+    """Splits text into windows of `chunk_size` words, each overlapping the last by `overlap`."""
+    words = text.split()
+    chunks = []
+    start = 0
+    while start < len(words):
+        end = start + chunk_size
+        chunks.append(" ".join(words[start:end]))
+        start = max(0, end - overlap)
+    return chunks
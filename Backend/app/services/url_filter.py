@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import re
+from collections.abc import AsyncIterable, AsyncIterator
+
+# A URL is "http(s)://" followed by everything up to the next whitespace,
+# with trailing punctuation treated as part of the sentence, not the link.
+_URL_RE = re.compile(r"https?://\S+")
+_URL_START_RE = re.compile(r"https?://")
+_WHITESPACE_RE = re.compile(r"\s")
+_URL_SCHEMES = ("https://", "http://")
+_TRAILING_PUNCTUATION = ".,)>\"'"
+
+
+def _keep_if_allowed(candidate: str, allowed: set[str]) -> str:
+    url = candidate.rstrip(_TRAILING_PUNCTUATION)
+    return candidate if url in allowed else candidate[len(url):]
+
+
+def strip_unauthorized_urls(text: str, allowed_urls: list[str]) -> str:
+    """
+    Post-generation safety net: removes any http/https URL from the response
+    that is not in the allowed_urls list.
+    """
+    allowed = set(allowed_urls)
+    return _URL_RE.sub(lambda m: _keep_if_allowed(m.group(0), allowed), text)
+
+
+def _partial_scheme_length(text: str) -> int:
+    """Length of the longest tail of text that could still grow into "http(s)://"."""
+    for length in range(min(len(text), len(_URL_SCHEMES[0]) - 1), 0, -1):
+        tail = text[-length:]
+        if any(scheme.startswith(tail) for scheme in _URL_SCHEMES):
+            return length
+    return 0
+
+
+class StreamingUrlFilter:
+    """
+    strip_unauthorized_urls for text that arrives in pieces.
+
+    feed() returns everything that is already safe to show and holds back
+    only what might still be part of a URL: an unfinished "http(s)://" at
+    the tail, or a URL that hasn't reached whitespace yet. flush() releases
+    the rest at the end of the stream. The concatenated output always equals
+    strip_unauthorized_urls over the full text.
+    """
+    def __init__(self, allowed_urls: list[str]):
+        self._allowed = set(allowed_urls)
+        self._pending = ""
+
+    def feed(self, text: str) -> str:
+        self._pending += text
+        out = []
+
+        while True:
+            start = _URL_START_RE.search(self._pending)
+            if start is None:
+                split = len(self._pending) - _partial_scheme_length(self._pending)
+                out.append(self._pending[:split])
+                self._pending = self._pending[split:]
+                break
+
+            end = _WHITESPACE_RE.search(self._pending, start.end())
+            if end is None:
+                # The URL may continue in the next piece
+                out.append(self._pending[:start.start()])
+                self._pending = self._pending[start.start():]
+                break
+
+            out.append(self._pending[:start.start()])
+            if end.start() == start.end():
+                out.append(start.group(0))  # a bare scheme is not a URL
+            else:
+                out.append(_keep_if_allowed(self._pending[start.start():end.start()], self._allowed))
+            self._pending = self._pending[end.start():]
+
+        return "".join(out)
+
+    def flush(self) -> str:
+        text, self._pending = self._pending, ""
+        return _URL_RE.sub(lambda m: _keep_if_allowed(m.group(0), self._allowed), text)
+
+
+async def filter_url_stream(tokens: AsyncIterable[str], allowed_urls: list[str]) -> AsyncIterator[str]:
+    """Runs an async token stream through a StreamingUrlFilter, skipping empty pieces."""
+    url_filter = StreamingUrlFilter(allowed_urls)
+    async for token in tokens:
+        safe = url_filter.feed(token)
+        if safe:
+            yield safe
+
+    rest = url_filter.flush()
+    if rest:
+        yield rest
@@ -1,24 +1,66 @@
 from __future__ import annotations
 
-import requests
+import asyncio
+from dataclasses import dataclass
+
+import httpx
 from bs4 import BeautifulSoup
-from playwright.sync_api import sync_playwright
 import re
 import hashlib
 import json
 import os
 import time
 
+from app.services.async_http import SharedAsyncClient
+from app.services.browser_pool import browser_pool
+from app.services.file_utils import write_json_atomic
+from app.services.lru_cache import LRUCache
+from app.services.single_flight import SingleFlight
+
 CACHE_DIR = "cache/pages"
 CACHE_TTL_SECONDS = 60 * 60 * 6  # 6 hours
 
-
-
-def fetch_static_page(url: str) -> str:
-    response = requests.get(url, timeout=10)
-    response.raise_for_status()
-
-    soup = BeautifulSoup(response.text, "html.parser")
+# Per-source TTLs; every other URL uses CACHE_TTL_SECONDS.
+CACHE_TTL_OVERRIDES: dict[str, int] = {
+    "https://www.siue.edu/calendar/": 60 * 30,
+    "https://siue.libcal.com/hours/": 60 * 60,
+    "https://www.siue.edu/about/": 60 * 60 * 24 * 7,
+}
+
+# Stale-while-revalidate: an entry past its TTL is still served immediately
+# while one background refresh per URL runs. Only entries older than
+# TTL * CACHE_MAX_AGE_FACTOR make the caller wait for a fresh fetch.
+CACHE_STALE_WHILE_REVALIDATE = True
+CACHE_MAX_AGE_FACTOR = 4
+
+# Concurrent fetches of the same URL (foreground or background) share one
+# network fetch / Playwright render and one cache write.
+_page_flights = SingleFlight()
+
+# Parsed cache entries keyed by file path, so hot pages aren't re-read and
+# re-parsed from disk on every hit. Each entry remembers the file's mtime and
+# size; a write by another worker process shows up as a changed stat.
+PAGE_LRU_MAX_ENTRIES = 256
+PAGE_LRU_MAX_BYTES = 64 * 1024 * 1024
+_entry_cache = LRUCache(max_entries=PAGE_LRU_MAX_ENTRIES, max_bytes=PAGE_LRU_MAX_BYTES)
+
+# Background refreshes run as tasks on the event loop; the set keeps a
+# strong reference to each until it finishes.
+_refreshing: set[str] = set()
+_refresh_tasks: set[asyncio.Task] = set()
+
+# One keep-alive client for every async fetch on the event loop.
+_async_http = SharedAsyncClient(
+    lambda: httpx.AsyncClient(
+        timeout=10,
+        follow_redirects=True,
+        limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+    )
+)
+
+
+def _html_to_text(html: str) -> str:
+    soup = BeautifulSoup(html, "html.parser")
 
     for tag in soup(["script", "style", "noscript"]):
         tag.decompose()
@@ -26,53 +68,161 @@ def fetch_static_page(url: str) -> str:
     text = soup.get_text(separator=" ", strip=True)
     return clean_text(text)
 
-def fetch_dynamic_page(url: str) -> str:
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
 
-        page.goto(url, timeout=30000)
-        page.wait_for_load_state("networkidle")
+@dataclass
+class StaticPage:
+    text: str = ""
+    etag: str | None = None
+    last_modified: str | None = None
+    not_modified: bool = False  # server answered 304 for the cached copy
+
 
-        # ---- STEP 1: Auto-click "Load More" buttons ----
-        for _ in range(10):  # safety cap
+def _conditional_headers(cached: dict | None) -> dict[str, str]:
+    headers = {}
+    if cached and cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    if cached and cached.get("last_modified"):
+        headers["If-Modified-Since"] = cached["last_modified"]
+    return headers
+
+
+async def _get_static_page_async(url: str, cached: dict | None = None) -> StaticPage:
+    """
+    GETs the page, revalidating the cached copy with its ETag/Last-Modified.
+    On 304 the body is never parsed; otherwise it is parsed in a worker
+    thread, off the event loop.
+    """
+    response = await _async_http.get().get(url, headers=_conditional_headers(cached))
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+
+    if response.status_code == 304:
+        return StaticPage(etag=etag, last_modified=last_modified, not_modified=True)
+
+    response.raise_for_status()
+    text = await asyncio.to_thread(_html_to_text, response.text)
+    return StaticPage(text=text, etag=etag, last_modified=last_modified)
+
+
+async def fetch_static_page_async(url: str) -> str:
+    return (await _get_static_page_async(url)).text
+
+
+@dataclass(frozen=True)
+class RenderProfile:
+    """
+    How much expansion a JS-rendered page needs. Waits are event-driven: after
+    the load event and after each action we wait up to `first_change_ms` for
+    the DOM to react, then for `quiet_ms` without mutations, never longer than
+    `max_settle_ms` in total. A page that is already quiet only pays
+    `first_change_ms`, so keep it short.
+    """
+    load_more: bool = True
+    scroll: bool = True
+    max_load_more: int = 10
+    max_scrolls: int = 10
+    first_change_ms: int = 400
+    quiet_ms: int = 300
+    max_settle_ms: int = 4000
+
+
+DEFAULT_RENDER_PROFILE = RenderProfile()
+
+# Matched by exact URL first, then by longest prefix.
+RENDER_PROFILES: dict[str, RenderProfile] = {
+    # Hours grid renders in one pass; its "Show"/"Next" buttons page through weeks
+    "https://siue.libcal.com/hours/": RenderProfile(load_more=False),
+    # Calendar lazy-loads on scroll only, from a slower backend
+    "https://www.siue.edu/calendar/": RenderProfile(load_more=False, max_scrolls=6, first_change_ms=1000),
+}
+
+LOAD_MORE_SELECTOR = "button:has-text('Load'), button:has-text('More'), button:has-text('Show')"
+
+# Resolves true once the DOM has changed and then stayed quiet, or false if
+# nothing changed within firstMs. Never takes longer than maxMs.
+_SETTLE_JS = """
+([firstMs, quietMs, maxMs]) => new Promise((resolve) => {
+    let changed = false;
+    let timer = null;
+    const finish = () => { observer.disconnect(); clearTimeout(timer); clearTimeout(cap); resolve(changed); };
+    const observer = new MutationObserver(() => {
+        changed = true;
+        clearTimeout(timer);
+        timer = setTimeout(finish, quietMs);
+    });
+    observer.observe(document.documentElement, { childList: true, subtree: true, characterData: true });
+    timer = setTimeout(finish, firstMs);
+    const cap = setTimeout(finish, maxMs);
+})
+"""
+
+
+def render_profile_for(url: str) -> RenderProfile:
+    if url in RENDER_PROFILES:
+        return RENDER_PROFILES[url]
+
+    matches = [prefix for prefix in RENDER_PROFILES if url.startswith(prefix)]
+    if matches:
+        return RENDER_PROFILES[max(matches, key=len)]
+    return DEFAULT_RENDER_PROFILE
+
+
+async def _wait_for_dom_settle(page, profile: RenderProfile) -> bool:
+    return await page.evaluate(_SETTLE_JS, [profile.first_change_ms, profile.quiet_ms, profile.max_settle_ms])
+
+
+async def _render_expanded_html(page, url: str) -> str:
+    """
+    Loads the page on a pooled browser tab, expands "Load More" content and
+    lazy-loaded sections according to the URL's RenderProfile, and returns
+    the final HTML.
+    """
+    profile = render_profile_for(url)
+
+    await page.goto(url, timeout=30000, wait_until="load")
+    await _wait_for_dom_settle(page, profile)
+
+    # ---- STEP 1: Auto-click "Load More" buttons ----
+    if profile.load_more:
+        for _ in range(profile.max_load_more):
             try:
-                load_more = page.locator(
-                    "button:has-text('Load'), button:has-text('More'), button:has-text('Show')"
-                )
+                load_more = page.locator(LOAD_MORE_SELECTOR)
 
-                if load_more.count() == 0:
+                if await load_more.count() == 0:
                     break
 
-                load_more.first.click()
-                page.wait_for_timeout(1500)
+                await load_more.first.click()
+
+                # Button did nothing (or is a dead end): stop clicking
+                if not await _wait_for_dom_settle(page, profile):
+                    break
 
             except Exception:
                 break
 
-        # ---- STEP 2: Auto-scroll to bottom ----
+    # ---- STEP 2: Auto-scroll to bottom ----
+    # A page that fits in the viewport has nothing to lazy-load
+    if profile.scroll and await page.evaluate("document.body.scrollHeight > window.innerHeight"):
         previous_height = None
 
-        for _ in range(10):  # safety cap
-            current_height = page.evaluate("document.body.scrollHeight")
+        for _ in range(profile.max_scrolls):
+            current_height = await page.evaluate("document.body.scrollHeight")
 
             if previous_height == current_height:
                 break
 
             previous_height = current_height
-            page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-            page.wait_for_timeout(1500)
+            await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
 
-        content = page.content()
-        browser.close()
+            if not await _wait_for_dom_settle(page, profile):
+                break
 
-    soup = BeautifulSoup(content, "html.parser")
+    return await page.content()
 
-    for tag in soup(["script", "style", "noscript"]):
-        tag.decompose()
 
-    text = soup.get_text(separator=" ", strip=True)
-    return clean_text(text)
+async def fetch_dynamic_page_async(url: str) -> str:
+    html = await browser_pool.render_async(url, _render_expanded_html)
+    return await asyncio.to_thread(_html_to_text, html)
 
 
 def clean_text(text: str) -> str:
@@ -80,61 +230,182 @@ def clean_text(text: str) -> str:
     text = re.sub(r"©.*", "", text)
     return text.strip()
 
-def fetch_page_text(url: str) -> str:
+async def fetch_page_text_async(url: str) -> str:
     # 1️ Try cache first
     cached = load_from_cache(url)
     if cached:
         print(f"[CACHE HIT] {url}")
         return cached
 
+    # 2️ Serve a stale copy while it refreshes in the background
+    entry = _read_cache_entry(url)
+    if _can_serve_stale(url, entry):
+        print(f"[CACHE STALE] {url}")
+        _schedule_refresh(url)
+        return entry["content"]
+
     print(f"[FETCHING] {url}")
+    return await _page_flights.do_async(url, lambda: _fetch_and_store_async(url, entry))
+
 
+async def _fetch_and_store_async(url: str, entry: dict | None) -> str:
+    """Fetches the page (revalidating `entry` if it has validators) and caches it."""
     try:
-        text = fetch_static_page(url)
+        page = await _get_static_page_async(url, entry)
+    except Exception:
+        page = None
 
-        if len(text) < 500:
-            raise ValueError("Likely JS-rendered page")
+    if page is not None and page.not_modified:
+        return _store_not_modified(url, entry, page)
 
-    except Exception:
-        text = fetch_dynamic_page(url)
+    if page is not None and len(page.text) >= 500:
+        save_to_cache(url, page.text, etag=page.etag, last_modified=page.last_modified)
+        return page.text
 
-    # 2️ Save result to cache
+    # Likely JS-rendered page
+    text = await fetch_dynamic_page_async(url)
     save_to_cache(url, text)
 
     return text
 
 
+def _can_serve_stale(url: str, entry: dict | None) -> bool:
+    if entry is None or not CACHE_STALE_WHILE_REVALIDATE:
+        return False
+    return time.time() - entry["timestamp"] <= cache_max_age_for(url)
+
+
+def _schedule_refresh(url: str) -> bool:
+    """Starts a background refresh unless one is already running for this URL."""
+    if url in _refreshing:
+        return False
+    _refreshing.add(url)
+
+    task = asyncio.ensure_future(_refresh_in_background(url))
+    _refresh_tasks.add(task)
+    task.add_done_callback(_refresh_tasks.discard)
+    return True
+
+
+async def _refresh_in_background(url: str) -> None:
+    try:
+        print(f"[REFRESHING] {url}")
+        await refresh_page_text_async(url)
+    except Exception as e:
+        print("[REFRESH ERROR]", url, e)
+    finally:
+        _refreshing.discard(url)
+
+
+def _store_not_modified(url: str, entry: dict, page: StaticPage) -> str:
+    """A 304 only bumps the cache timestamp; the stored text is reused as-is."""
+    print(f"[NOT MODIFIED] {url}")
+    save_to_cache(
+        url,
+        entry["content"],
+        etag=page.etag or entry.get("etag"),
+        last_modified=page.last_modified or entry.get("last_modified"),
+    )
+    return entry["content"]
+
+
+async def refresh_page_text_async(url: str) -> str:
+    """Fetches (or revalidates) the page now, ignoring cache freshness."""
+    return await _page_flights.do_async(url, lambda: _fetch_and_store_async(url, _read_cache_entry(url)))
+
+
+def fetch_stats() -> dict:
+    return {
+        "page_lru": _entry_cache.stats(),
+        "single_flight": _page_flights.stats(),
+        "browser_pool": browser_pool.stats(),
+    }
+
+
+async def close_async_client() -> None:
+    await _async_http.aclose()
+
+
 # Caching utilities
+def cache_ttl_for(url: str) -> int:
+    return CACHE_TTL_OVERRIDES.get(url, CACHE_TTL_SECONDS)
+
+def cache_max_age_for(url: str) -> int:
+    return cache_ttl_for(url) * CACHE_MAX_AGE_FACTOR
+
 def _cache_path_for_url(url: str) -> str:
     hashed = hashlib.sha256(url.encode()).hexdigest()
     return os.path.join(CACHE_DIR, f"{hashed}.json")
 
-def load_from_cache(url: str) -> str | None:
+def _read_cache_entry(url: str) -> dict | None:
+    """Returns the raw cache entry (timestamp, content, validators) whatever its age."""
     path = _cache_path_for_url(url)
 
-    if not os.path.exists(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        _entry_cache.invalidate(path)
         return None
 
+    version = (st.st_mtime_ns, st.st_size)
+    remembered = _entry_cache.get(path)
+    if remembered is not None and remembered[0] == version:
+        return remembered[1]
+
     with open(path, "r", encoding="utf-8") as f:
-        cached = json.load(f)
+        entry = json.load(f)
 
-    if time.time() - cached["timestamp"] > CACHE_TTL_SECONDS:
+    _entry_cache.set(path, (version, entry), size=len(entry["content"]))
+    return entry
+
+def cache_age(url: str) -> float | None:
+    """Seconds since the page was cached, or None if it isn't cached."""
+    entry = _read_cache_entry(url)
+    if entry is None:
+        return None
+    return time.time() - entry["timestamp"]
+
+def page_fingerprint(url: str) -> str | None:
+    """
+    Hash of the cached page content that a fetch would serve right now, or
+    None if the page isn't cached or is too old to serve without a refetch.
+    """
+    entry = _read_cache_entry(url)
+    if entry is None:
         return None
 
-    return cached["content"]
+    if time.time() - entry["timestamp"] > cache_ttl_for(url) and not _can_serve_stale(url, entry):
+        return None
+
+    return hashlib.sha256(entry["content"].encode("utf-8")).hexdigest()
 
-def save_to_cache(url: str, content: str):
-    os.makedirs(CACHE_DIR, exist_ok=True)
+def load_from_cache(url: str) -> str | None:
+    cached = _read_cache_entry(url)
+
+    if cached is None:
+        return None
+
+    if time.time() - cached["timestamp"] > cache_ttl_for(url):
+        return None
+
+    return cached["content"]
 
+def save_to_cache(url: str, content: str, etag: str | None = None, last_modified: str | None = None):
     path = _cache_path_for_url(url)
 
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(
-            {
-                "timestamp": time.time(),
-                "content": content
-            },
-            f,
-            ensure_ascii=False
-        )
+    entry = {
+        "timestamp": time.time(),
+        "content": content
+    }
+    # HTTP validators let the next refresh send a conditional GET
+    if etag:
+        entry["etag"] = etag
+    if last_modified:
+        entry["last_modified"] = last_modified
+
+    write_json_atomic(path, entry)
+
+    # Replace whatever the in-process LRU held for this page
+    st = os.stat(path)
+    _entry_cache.set(path, ((st.st_mtime_ns, st.st_size), entry), size=len(content))
 
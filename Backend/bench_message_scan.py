@@ -0,0 +1,57 @@
+"""
+Per-message cost of scan_message at several message lengths, next to the
+two separate passes it replaced (substring checks for safety, then a
+word-start regex for the category).
+
+Run from Backend/:  python bench_message_scan.py
+"""
+import re
+import timeit
+
+from app.services.message_scan import BLOCKED_KEYWORDS, CRISIS_KEYWORDS, scan_message
+from app.services.registry import current_registry
+
+LENGTHS = [40, 200, 1000, 4000]
+ROUNDS = 2000
+
+QUESTION = (
+    "Hi, I am a first year student in mechanical engineering and I wanted to know about "
+    "the study rooms in Lovejoy library and whether I can get tutoring for calculus. "
+)
+NO_KEYWORDS = "Hello there, could you tell me a little more about what you are able to do today? "
+
+_REGISTRY = current_registry()
+CATEGORY_KEYWORDS = [(category.name, category.keywords) for category in _REGISTRY.categories]
+WHOLE_WORD_KEYWORDS = _REGISTRY.whole_word_keywords
+
+_CATEGORY_RE = re.compile(r"\b(?=" + "|".join(
+    "(?P<{}>{})".format(category, "|".join(re.escape(k) + (r"\b" if k in WHOLE_WORD_KEYWORDS else "") for k in keywords))
+    for category, keywords in CATEGORY_KEYWORDS
+) + ")")
+_CATEGORY_RANK = {category: rank for rank, (category, _) in enumerate(CATEGORY_KEYWORDS)}
+
+
+def separate_passes(message: str) -> tuple[bool, bool, str | None]:
+    m = message.lower()
+    crisis = any(k in m for k in CRISIS_KEYWORDS)
+    blocked = any(k in m for k in BLOCKED_KEYWORDS)
+    ranks = [_CATEGORY_RANK[match.lastgroup] for match in _CATEGORY_RE.finditer(m)]
+    return crisis, blocked, CATEGORY_KEYWORDS[min(ranks)][0] if ranks else None
+
+
+def per_message_us(fn, message: str) -> float:
+    return timeit.timeit(lambda: fn(message), number=ROUNDS) / ROUNDS * 1e6
+
+
+def main() -> None:
+    for label, base in (("keyword-dense", QUESTION), ("no keywords", NO_KEYWORDS)):
+        print(f"\n{label}")
+        print(f"{'chars':>6}  {'scan_message':>12}  {'separate':>9}")
+        for length in LENGTHS:
+            message = (base * (length // len(base) + 1))[:length]
+            print(f"{length:>6}  {per_message_us(scan_message, message):>10.1f}us  "
+                  f"{per_message_us(separate_passes, message):>7.1f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,17 @@
-from app.services.web_fetcher import fetch_page_text
+import asyncio
+
+from app.services.web_fetcher import close_async_client, fetch_page_text_async
 
 url = "https://getinvolved.siue.edu/organizations"
-text = fetch_page_text(url)
+
+
+async def _fetch() -> str:
+    try:
+        return await fetch_page_text_async(url)
+    finally:
+        await close_async_client()
+
+
+text = asyncio.run(_fetch())
 
 print(text[:5500])
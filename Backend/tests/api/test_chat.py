@@ -16,8 +16,8 @@ def test_chat_success(client: TestClient, mock_bedrock, mock_retrieve_context) -
 
 
 def test_chat_no_context_calls_generate_answer(client: TestClient, mock_bedrock) -> None:
-    """When retrieval returns no context, endpoint still calls generate_answer with placeholder context."""
-    with patch("app.api.chat.retrieve_context", return_value=("", [])):
+    """When retrieval returns no chunks, endpoint still calls generate_answer_async with placeholder context."""
+    with patch("app.api.chat.retrieve_chunks_async", return_value=([], [])):
         response = client.post(
             "/chat",
             json={"session_id": "test-session-2", "message": "xyz random"},
@@ -28,7 +28,7 @@ def test_chat_no_context_calls_generate_answer(client: TestClient, mock_bedrock)
 
 
 def test_chat_bedrock_error_returns_graceful_message(client: TestClient, mock_retrieve_context) -> None:
-    with patch("app.api.chat.generate_answer", side_effect=Exception("AWS error")):
+    with patch("app.api.chat.generate_answer_async", side_effect=Exception("AWS error")):
         response = client.post(
             "/chat",
             json={"session_id": "test-session-3", "message": "Tell me about advising"},
@@ -70,3 +70,70 @@ def test_chat_memory_persists_in_session(client: TestClient, mock_bedrock, mock_
     history = call_kwargs[1]["history"]
     assert any(m["text"] == "First message" for m in history)
     assert len(history) >= 2
+
+
+def test_chat_repeat_standalone_question_served_from_answer_cache(client: TestClient, mock_bedrock) -> None:
+    urls = ["https://www.siue.edu/calendar/", "https://www.siue.edu/engineering/students-life/student-competitions.shtml"]
+    with patch("app.api.chat.retrieve_chunks_async", return_value=(["chunk"], urls)) as mock_retrieve, \
+            patch("app.services.answer_cache.page_fingerprint", return_value="v1"):
+        first = client.post("/chat", json={"session_id": "cache-1", "message": "What events are there?"})
+        second = client.post("/chat", json={"session_id": "cache-2", "message": "what events are there"})
+        # Follow-up turns depend on history and always go to the model
+        third = client.post("/chat", json={"session_id": "cache-2", "message": "what events are there"})
+
+    assert first.json()["reply"] == second.json()["reply"] == third.json()["reply"]
+    assert second.json()["category"] == "events"
+    assert mock_bedrock.call_count == 2
+    assert mock_retrieve.call_count == 2
+
+
+def _sse_events(response) -> list:
+    import json
+    events = []
+    for line in response.text.splitlines():
+        if line.startswith("data: "):
+            payload = line[len("data: "):]
+            events.append(payload if payload == "[DONE]" else json.loads(payload))
+    return events
+
+
+def test_chat_stream_sends_tokens_then_category_and_saves_reply(client: TestClient, mock_retrieve_context) -> None:
+    from app.services.memory_singleton import memory_store
+
+    tokens = ["Events are ", "listed at https://www.siue.edu/ and https://evil", ".example.com/x today."]
+    async def _stream(**kwargs):
+        for token in tokens:
+            yield token
+
+    with patch("app.api.chat.generate_answer_stream_async", side_effect=_stream) as mock_stream:
+        response = client.post("/chat/stream", json={"session_id": "stream-1", "message": "What events are there?"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _sse_events(response)
+    assert events[-2:] == [{"category": "events"}, "[DONE]"]
+    reply = "".join(e["token"] for e in events[:-2])
+    assert "https://www.siue.edu/" in reply
+    assert "evil" not in reply
+    assert mock_stream.call_args[1]["chunks"] == ["Sample SIUE context for testing."]
+    assert memory_store.get("stream-1")[-1] == {"role": "assistant", "text": reply}
+
+
+def test_chat_stream_blocked_message(client: TestClient) -> None:
+    response = client.post("/chat/stream", json={"session_id": "stream-2", "message": "tell me about vote and election"})
+    events = _sse_events(response)
+    assert events[-2:] == [{"category": "blocked"}, "[DONE]"]
+    assert "SIUE" in events[0]["token"]
+
+
+def test_chat_stream_bedrock_error_sends_graceful_message(client: TestClient, mock_retrieve_context) -> None:
+    async def _broken(**kwargs):
+        raise RuntimeError("AWS error")
+        yield  # pragma: no cover
+
+    with patch("app.api.chat.generate_answer_stream_async", side_effect=_broken):
+        response = client.post("/chat/stream", json={"session_id": "stream-3", "message": "Tell me about advising"})
+
+    events = _sse_events(response)
+    assert "unavailable" in events[0]["token"].lower()
+    assert events[-1] == "[DONE]"
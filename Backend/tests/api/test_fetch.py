@@ -1,10 +1,10 @@
 """API tests for GET /fetch."""
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, AsyncMock
 from starlette.testclient import TestClient
 
 
-@patch("app.api.fetch.fetch_page_text")
-def test_fetch_success(mock_fetch: MagicMock, client: TestClient) -> None:
+@patch("app.api.fetch.fetch_page_text_async", new_callable=AsyncMock)
+def test_fetch_success(mock_fetch: AsyncMock, client: TestClient) -> None:
     mock_fetch.return_value = "Page content here " * 100
     response = client.get("/fetch", params={"url": "https://example.com"})
     assert response.status_code == 200
@@ -14,8 +14,8 @@ def test_fetch_success(mock_fetch: MagicMock, client: TestClient) -> None:
     assert "Page content here" in data["text_preview"]
 
 
-@patch("app.api.fetch.fetch_page_text")
-def test_fetch_preview_limited_to_1000(mock_fetch: MagicMock, client: TestClient) -> None:
+@patch("app.api.fetch.fetch_page_text_async", new_callable=AsyncMock)
+def test_fetch_preview_limited_to_1000(mock_fetch: AsyncMock, client: TestClient) -> None:
     mock_fetch.return_value = "x" * 2000
     response = client.get("/fetch", params={"url": "https://long.com"})
     assert response.status_code == 200
@@ -27,8 +27,8 @@ def test_fetch_missing_url_returns_422(client: TestClient) -> None:
     assert response.status_code == 422
 
 
-@patch("app.api.fetch.fetch_page_text")
-def test_fetch_error_returns_500(mock_fetch: MagicMock, client: TestClient) -> None:
+@patch("app.api.fetch.fetch_page_text_async", new_callable=AsyncMock)
+def test_fetch_error_returns_500(mock_fetch: AsyncMock, client: TestClient) -> None:
     mock_fetch.side_effect = Exception("Connection failed")
     response = client.get("/fetch", params={"url": "https://bad.com"})
     assert response.status_code == 500
@@ -7,6 +7,7 @@ from unittest.mock import patch, MagicMock
 from starlette.testclient import TestClient
 
 from app.main import app
+from app.services import answer_cache, extraction_cache
 from app.services.memory_singleton import memory_store
 
 
@@ -18,32 +19,30 @@ def client():
 
 @pytest.fixture(autouse=True)
 def reset_memory_store():
-    """Reset in-memory store between tests to avoid cross-test leakage.
-    Uses internal state; if SessionMemoryStore gains a clear() API, prefer that."""
+    """Reset the session store between tests to avoid cross-test leakage."""
     yield
-    memory_store._store.clear()
-    memory_store._last_seen.clear()
+    memory_store.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_answer_caches():
+    """Keep cached replies and extractions from one test out of the next."""
+    yield
+    answer_cache.clear()
+    extraction_cache.clear()
 
 
 @pytest.fixture
 def mock_bedrock():
-    """Patch generate_answer to avoid real AWS calls."""
-    with patch("app.api.chat.generate_answer") as m:
+    """Patch generate_answer_async to avoid real AWS calls."""
+    with patch("app.api.chat.generate_answer_async") as m:
         m.return_value = "This is a test reply from the assistant."
         yield m
 
 
 @pytest.fixture
 def mock_retrieve_context():
-    """Patch retrieve_context to return controlled context."""
-    with patch("app.api.chat.retrieve_context") as m:
-        m.return_value = ("Sample SIUE context for testing.", ["https://www.siue.edu/"])
-        yield m
-
-
-@pytest.fixture
-def mock_fetch_page_text():
-    """Patch fetch_page_text for retrieval and web_fetcher tests."""
-    with patch("app.services.web_fetcher.fetch_page_text") as m:
-        m.return_value = "Sample page content for tests."
+    """Patch retrieve_chunks_async to return controlled chunks."""
+    with patch("app.api.chat.retrieve_chunks_async") as m:
+        m.return_value = (["Sample SIUE context for testing."], ["https://www.siue.edu/"])
         yield m
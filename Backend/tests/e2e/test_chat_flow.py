@@ -7,8 +7,8 @@ from starlette.testclient import TestClient
 @pytest.fixture
 def mock_external_services():
     """Mock Bedrock and retrieval for E2E so tests don't call AWS or external URLs."""
-    with patch("app.api.chat.retrieve_context", return_value="SIUE is a university in Edwardsville."):
-        with patch("app.api.chat.generate_answer", return_value="SIUE is a great university."):
+    with patch("app.api.chat.retrieve_chunks_async", return_value="SIUE is a university in Edwardsville."):
+        with patch("app.api.chat.generate_answer_async", return_value="SIUE is a great university."):
             yield
 
 
@@ -53,9 +53,9 @@ def test_e2e_chat_blocked_then_allowed(client: TestClient, mock_external_service
 
 
 def test_e2e_chat_no_context_fallback(client: TestClient) -> None:
-    """E2E: when retrieval returns empty, endpoint still returns a reply (via generate_answer)."""
-    with patch("app.api.chat.retrieve_context", return_value=""):
-        with patch("app.api.chat.generate_answer", return_value="No SIUE pages found for that."):
+    """E2E: when retrieval returns empty, endpoint still returns a reply (via generate_answer_async)."""
+    with patch("app.api.chat.retrieve_chunks_async", return_value=""):
+        with patch("app.api.chat.generate_answer_async", return_value="No SIUE pages found for that."):
             r = client.post(
                 "/chat",
                 json={"session_id": "e2e-session-3", "message": "obscure question xyz"},
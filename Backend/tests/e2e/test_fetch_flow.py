@@ -1,10 +1,10 @@
 """End-to-end tests: fetch flow through the API."""
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, AsyncMock
 from starlette.testclient import TestClient
 
 
-@patch("app.api.fetch.fetch_page_text")
-def test_e2e_fetch_returns_preview(mock_fetch: MagicMock, client: TestClient) -> None:
+@patch("app.api.fetch.fetch_page_text_async", new_callable=AsyncMock)
+def test_e2e_fetch_returns_preview(mock_fetch: AsyncMock, client: TestClient) -> None:
     """E2E: GET /fetch returns url and text_preview."""
     mock_fetch.return_value = "Full page content. " * 200
     response = client.get("/fetch", params={"url": "https://www.siue.edu/"})
@@ -15,8 +15,8 @@ def test_e2e_fetch_returns_preview(mock_fetch: MagicMock, client: TestClient) ->
     assert "Full page content" in data["text_preview"]
 
 
-@patch("app.api.fetch.fetch_page_text")
-def test_e2e_fetch_error_propagates(mock_fetch: MagicMock, client: TestClient) -> None:
+@patch("app.api.fetch.fetch_page_text_async", new_callable=AsyncMock)
+def test_e2e_fetch_error_propagates(mock_fetch: AsyncMock, client: TestClient) -> None:
     """E2E: GET /fetch on failure returns 500 with detail."""
     mock_fetch.side_effect = RuntimeError("Network error")
     response = client.get("/fetch", params={"url": "https://invalid.example.com"})
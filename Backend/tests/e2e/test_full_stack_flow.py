@@ -1,10 +1,10 @@
 """End-to-end tests: full stack (root + chat + fetch) in one run."""
-from unittest.mock import patch
+from unittest.mock import patch, AsyncMock
 from starlette.testclient import TestClient
 
 
-@patch("app.api.chat.generate_answer")
-@patch("app.api.chat.retrieve_context")
+@patch("app.api.chat.generate_answer_async")
+@patch("app.api.chat.retrieve_chunks_async")
 def test_e2e_root_then_chat_then_fetch(
     mock_retrieve: patch,
     mock_generate: patch,
@@ -25,7 +25,7 @@ def test_e2e_root_then_chat_then_fetch(
     assert r_chat.status_code == 200
     assert r_chat.json()["reply"] == "Reply"
 
-    with patch("app.api.fetch.fetch_page_text", return_value="Fetched text"):
+    with patch("app.api.fetch.fetch_page_text_async", new_callable=AsyncMock, return_value="Fetched text"):
         r_fetch = client.get("/fetch", params={"url": "https://example.com"})
     assert r_fetch.status_code == 200
     assert "Fetched text" in r_fetch.json()["text_preview"]
@@ -0,0 +1,64 @@
+"""Unit tests for app.services.answer_cache."""
+import json
+import os
+from pathlib import Path
+from unittest.mock import patch
+from app.services import answer_cache
+from app.services.answer_cache import AnswerKey, answer_key, get_answer, is_standalone, normalize_question, store_answer
+from app.services.web_fetcher import _cache_path_for_url, _entry_cache, save_to_cache
+
+
+def test_normalize_question() -> None:
+    assert normalize_question("  What are the Library hours?? ") == "what are the library hours"
+    assert normalize_question("what are the library-hours") == "what are the library hours"
+
+
+def test_is_standalone() -> None:
+    assert is_standalone([{"role": "user", "text": "hi"}])
+    assert not is_standalone([{"role": "user", "text": "hi"}, {"role": "assistant", "text": "hello"}])
+
+
+def test_answer_key_changes_when_page_content_changes(tmp_path: Path) -> None:
+    with patch("app.services.web_fetcher.CACHE_DIR", str(tmp_path)):
+        save_to_cache("https://a.com", "Library open 8-5")
+        key = answer_key("Library hours?", "general", ["https://a.com"])
+        assert key == answer_key("library hours", "general", ["https://a.com"])
+        assert key != answer_key("library hours", "advising", ["https://a.com"])
+
+        save_to_cache("https://a.com", "Library open 8-9")
+        assert answer_key("library hours", "general", ["https://a.com"]) != key
+
+
+def test_answer_key_none_when_a_source_is_not_servable(tmp_path: Path) -> None:
+    with patch("app.services.web_fetcher.CACHE_DIR", str(tmp_path)):
+        save_to_cache("https://a.com", "content")
+        assert answer_key("q", "general", ["https://a.com", "https://missing.com"]) is None
+        assert answer_key("q", "general", []) is None
+
+        # Older than the stale-while-revalidate window: a fetch would refetch it
+        path = _cache_path_for_url("https://a.com")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"timestamp": 0, "content": "content"}, f)
+        _entry_cache.clear()
+        assert os.path.exists(path)
+        assert answer_key("q", "general", ["https://a.com"]) is None
+
+
+def test_store_and_get_answer() -> None:
+    assert get_answer(None) is None
+    store_answer(None, "ignored")
+    assert answer_cache.stats()["exact"]["entries"] == 0
+
+    key = AnswerKey(category="general", question="library hours", sources="v1")
+    store_answer(key, "reply")
+    assert get_answer(key) == "reply"
+
+
+def test_get_answer_falls_back_to_similar_question() -> None:
+    store_answer(AnswerKey("general", "what are the library hours", "v1"), "Open 8-5")
+
+    assert get_answer(AnswerKey("general", "library hours", "v1")) == "Open 8-5"
+    assert get_answer(AnswerKey("general", "what are the gym hours", "v1")) is None
+    # Same question, but the pages changed or it was asked in another category
+    assert get_answer(AnswerKey("general", "library hours", "v2")) is None
+    assert get_answer(AnswerKey("advising", "library hours", "v1")) is None
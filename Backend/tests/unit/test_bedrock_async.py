@@ -0,0 +1,202 @@
+"""Unit tests for app.services.bedrock_async (AsyncBedrockClient)."""
+import asyncio
+import json
+import struct
+import zlib
+import boto3
+import httpx
+import pytest
+from botocore.exceptions import ClientError
+from app.services.bedrock_async import AsyncBedrockClient
+
+
+def _client(handler) -> AsyncBedrockClient:
+    session = boto3.Session(
+        aws_access_key_id="AKIDEXAMPLE",
+        aws_secret_access_key="secret",
+        region_name="us-west-2",
+    )
+    return AsyncBedrockClient(
+        region_name="us-west-2",
+        session=session,
+        transport=httpx.MockTransport(handler),
+        retry_base_delay=0,
+    )
+
+
+def _frame(headers: dict[str, str], payload: dict) -> bytes:
+    """One application/vnd.amazon.eventstream message with string headers."""
+    header_bytes = b"".join(
+        bytes([len(name)]) + name.encode() + b"\x07" + struct.pack(">H", len(value)) + value.encode()
+        for name, value in headers.items()
+    )
+    body = json.dumps(payload).encode()
+    prelude = struct.pack(">II", 16 + len(header_bytes) + len(body), len(header_bytes))
+    message = prelude + struct.pack(">I", zlib.crc32(prelude)) + header_bytes + body
+    return message + struct.pack(">I", zlib.crc32(message))
+
+
+def _event(event_type: str, payload: dict) -> bytes:
+    return _frame({":message-type": "event", ":event-type": event_type, ":content-type": "application/json"}, payload)
+
+
+def test_converse_signs_and_posts_converse_body() -> None:
+    seen = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen["url"] = str(request.url)
+        seen["auth"] = request.headers.get("authorization", "")
+        seen["body"] = json.loads(request.content)
+        return httpx.Response(200, json={"output": {"message": {"content": [{"text": "hi"}]}}})
+
+    client = _client(handler)
+    resp = asyncio.run(client.converse(
+        modelId="arn:aws:bedrock:us-west-2:123:inference-profile/us.amazon.nova-pro-v1:0",
+        messages=[{"role": "user", "content": [{"text": "Q"}]}],
+        inferenceConfig={"maxTokens": 10},
+    ))
+
+    assert resp["output"]["message"]["content"][0]["text"] == "hi"
+    assert seen["url"].startswith("https://bedrock-runtime.us-west-2.amazonaws.com/model/arn%3Aaws%3Abedrock")
+    assert seen["url"].endswith("/converse")
+    assert seen["auth"].startswith("AWS4-HMAC-SHA256 Credential=AKIDEXAMPLE/")
+    assert "modelId" not in seen["body"]
+    assert seen["body"]["inferenceConfig"] == {"maxTokens": 10}
+
+
+def test_converse_error_raises_client_error_after_retries() -> None:
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(
+            429,
+            json={"message": "Too many requests"},
+            headers={"x-amzn-ErrorType": "ThrottlingException:http://internal.amazon.com/"},
+        )
+
+    client = _client(handler)
+    with pytest.raises(ClientError) as exc:
+        asyncio.run(client.converse(modelId="m", messages=[]))
+    assert exc.value.response["Error"]["Code"] == "ThrottlingException"
+    assert exc.value.response["Error"]["Message"] == "Too many requests"
+    assert len(calls) == 5
+
+
+def test_converse_retries_throttling_and_transport_errors() -> None:
+    responses = [
+        httpx.ConnectError("reset"),
+        httpx.Response(503, json={"message": "busy"}),
+        httpx.Response(400, json={"message": "slow down"}, headers={"x-amzn-ErrorType": "ThrottlingException"}),
+        httpx.Response(200, json={"output": {"message": {"content": [{"text": "hi"}]}}}),
+    ]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    client = _client(handler)
+    resp = asyncio.run(client.converse(modelId="m", messages=[]))
+    assert resp["output"]["message"]["content"][0]["text"] == "hi"
+    assert responses == []
+
+
+def test_converse_does_not_retry_validation_errors() -> None:
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(400, json={"message": "bad"}, headers={"x-amzn-ErrorType": "ValidationException"})
+
+    with pytest.raises(ClientError):
+        asyncio.run(_client(handler).converse(modelId="m", messages=[]))
+    assert len(calls) == 1
+
+
+def test_converse_async_posts_cached_system_block() -> None:
+    from unittest.mock import patch
+    from app.services import bedrock_llm
+
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(json.loads(request.content))
+        return httpx.Response(200, json={
+            "output": {"message": {"content": [{"text": " ok "}]}},
+            "usage": {"inputTokens": 12, "outputTokens": 1, "cacheReadInputTokens": 230},
+        })
+
+    with patch.object(bedrock_llm, "bedrock_async", _client(handler)):
+        assert asyncio.run(bedrock_llm._converse_async("prompt", max_tokens=10)) == "ok"
+
+    body = seen[0]
+    assert body["system"] == [{"text": bedrock_llm.prompts.SYSTEM_PROMPT}, {"cachePoint": {"type": "default"}}]
+    assert body["messages"] == [{"role": "user", "content": [{"text": "prompt"}]}]
+
+
+def test_converse_stream_decodes_events_split_across_reads() -> None:
+    seen = {}
+    stream = b"".join([
+        _event("contentBlockDelta", {"contentBlockIndex": 0, "delta": {"text": "hel"}}),
+        _event("contentBlockDelta", {"contentBlockIndex": 0, "delta": {"text": "lo"}}),
+        _event("metadata", {"usage": {"inputTokens": 3, "outputTokens": 2}}),
+    ])
+
+    async def _reads():
+        for i in range(0, len(stream), 7):  # splits every frame's prelude, headers and payload
+            yield stream[i:i + 7]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen["url"] = str(request.url)
+        seen["body"] = json.loads(request.content)
+        return httpx.Response(200, content=_reads())
+
+    async def _collect():
+        return [event async for event in _client(handler).converse_stream(modelId="m", messages=[])]
+
+    events = asyncio.run(_collect())
+    assert seen["url"].endswith("/model/m/converse-stream")
+    assert "modelId" not in seen["body"]
+    assert events == [
+        {"contentBlockDelta": {"contentBlockIndex": 0, "delta": {"text": "hel"}}},
+        {"contentBlockDelta": {"contentBlockIndex": 0, "delta": {"text": "lo"}}},
+        {"metadata": {"usage": {"inputTokens": 3, "outputTokens": 2}}},
+    ]
+
+
+def test_converse_stream_raises_exception_events_after_earlier_tokens() -> None:
+    stream = _event("contentBlockDelta", {"delta": {"text": "par"}}) + _frame(
+        {":message-type": "exception", ":exception-type": "ThrottlingException"}, {"message": "slow"}
+    )
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=stream)
+
+    out = []
+
+    async def _collect():
+        async for event in _client(handler).converse_stream(modelId="m", messages=[]):
+            out.append(event)
+
+    with pytest.raises(ClientError) as exc:
+        asyncio.run(_collect())
+    assert exc.value.response["Error"] == {"Code": "ThrottlingException", "Message": "slow"}
+    assert out == [{"contentBlockDelta": {"delta": {"text": "par"}}}]
+
+
+def test_converse_stream_retries_before_the_first_event() -> None:
+    responses = [
+        httpx.Response(503, json={"message": "busy"}),
+        httpx.Response(200, content=_event("contentBlockDelta", {"delta": {"text": "hi"}})),
+    ]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return responses.pop(0)
+
+    async def _collect():
+        return [event async for event in _client(handler).converse_stream(modelId="m", messages=[])]
+
+    assert asyncio.run(_collect()) == [{"contentBlockDelta": {"delta": {"text": "hi"}}}]
+    assert responses == []
@@ -1,11 +1,12 @@
 """Unit tests for app.services.bedrock_llm."""
+import asyncio
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, AsyncMock, MagicMock
 from app.services.bedrock_llm import (
     format_history,
-    chunk_text,
-    answer_from_chunk,
-    generate_answer,
+    answer_from_chunk_async,
+    extract_partial_answers_async,
+    generate_answer_async,
 )
 
 
@@ -38,104 +39,379 @@ def test_format_history_keeps_last_twelve() -> None:
     assert "msg0" not in out
 
 
-def test_chunk_text_empty() -> None:
-    assert chunk_text("") == []
-
-
-def test_chunk_text_small() -> None:
-    text = "one two three"
-    chunks = chunk_text(text, chunk_size=5, overlap=1)
-    assert len(chunks) >= 1
-    assert "one" in chunks[0]
-
-
-def test_chunk_text_overlap() -> None:
-    words = ["w" + str(i) for i in range(100)]
-    text = " ".join(words)
-    chunks = chunk_text(text, chunk_size=20, overlap=5)
-    assert len(chunks) >= 2
-    for c in chunks:
-        assert len(c.split()) <= 25
-
-
-@patch("app.services.bedrock_llm._converse")
-def test_answer_from_chunk_returns_converse_result(mock_converse: MagicMock) -> None:
+@patch("app.services.bedrock_llm._converse_async", new_callable=AsyncMock)
+def test_answer_from_chunk_async_returns_converse_result(mock_converse: AsyncMock) -> None:
     mock_converse.return_value = "The answer is X."
-    result = answer_from_chunk("Q?", "context", "history")
+    result = asyncio.run(answer_from_chunk_async("Q?", "context", "history"))
     assert result == "The answer is X."
     mock_converse.assert_called_once()
 
 
-@patch("app.services.bedrock_llm._converse")
-def test_generate_answer_returns_synthesis(mock_converse: MagicMock) -> None:
-    # One chunk -> one answer_from_chunk call, then one synthesis call
-    mock_converse.side_effect = ["Partial A", "Final combined answer"]
-    result = generate_answer(
-        question="What is SIUE?",
-        context="SIUE is a university.",
-        category="general",
-        history=[],
-        allowed_urls=[],
-    )
-    assert result == "Final combined answer"
-
-
-@patch("app.services.bedrock_llm._converse")
-def test_generate_answer_all_not_found_returns_synthesis(mock_converse: MagicMock) -> None:
+@patch("app.services.bedrock_llm._converse_async", new_callable=AsyncMock)
+def test_generate_answer_async_all_not_found_returns_synthesis(mock_converse: AsyncMock) -> None:
     """When all chunk answers are NOT_FOUND, synthesis is still called and its result returned."""
     mock_converse.side_effect = ["NOT_FOUND", "No relevant SIUE information found."]
-    result = generate_answer(
+    result = asyncio.run(generate_answer_async(
         question="?",
         context="some context",
         category="general",
         history=[],
         allowed_urls=[],
-    )
+    ))
     assert result == "No relevant SIUE information found."
 
 
-@patch("app.services.bedrock_llm._converse")
-def test_generate_answer_mixed_not_found_uses_partial(mock_converse: MagicMock) -> None:
+@patch("app.services.bedrock_llm._converse_async", new_callable=AsyncMock)
+def test_generate_answer_async_mixed_not_found_uses_partial(mock_converse: AsyncMock) -> None:
     mock_converse.side_effect = ["NOT_FOUND", "Found something.", "Synthesis here"]
-    result = generate_answer(
+    result = asyncio.run(generate_answer_async(
         question="?",
         context="a " * 2000,
         category="general",
         history=[],
         allowed_urls=[],
-    )
-    assert "Synthesis here" in result or "Found something" in result
+    ))
+    assert result == "Synthesis here"
+    assert "Found something." in mock_converse.call_args_list[-1][0][0]
+
+
+@patch("app.services.bedrock_llm.answer_from_chunk_async", new_callable=AsyncMock)
+def test_extract_partial_answers_async_runs_concurrently(mock_answer: AsyncMock) -> None:
+    async def _run() -> list[str]:
+        all_in_flight = asyncio.Event()
+        in_flight = 0
+
+        async def _answer(question, chunk, history_block, allowed_urls=None):
+            nonlocal in_flight
+            in_flight += 1
+            if in_flight == 3:
+                all_in_flight.set()
+            await asyncio.wait_for(all_in_flight.wait(), 5)  # only passes if all three calls are in flight together
+            return f"answer for {chunk}"
+
+        mock_answer.side_effect = _answer
+        return await extract_partial_answers_async("Q?", ["c0", "c1", "c2"], "history")
+
+    assert asyncio.run(_run()) == ["answer for c0", "answer for c1", "answer for c2"]
+
+
+@patch("app.services.bedrock_llm.answer_from_chunk_async", new_callable=AsyncMock)
+def test_extract_partial_answers_async_memoises_results_including_not_found(mock_answer: AsyncMock) -> None:
+    async def _answer(question, chunk, history_block, allowed_urls=None):
+        return "NOT_FOUND" if chunk == "irrelevant" else "useful"
+
+    mock_answer.side_effect = _answer
+
+    def _extract(question, chunks, history_block, category=None):
+        return asyncio.run(extract_partial_answers_async(question, chunks, history_block, category=category))
+
+    first = _extract("Library hours?", ["irrelevant", "ok"], "USER: Library hours?", category="library")
+    again = _extract("library hours", ["irrelevant", "ok"], "USER: library hours", category="library")
+
+    assert first == again == ["useful"]
+    assert mock_answer.call_count == 2
+
+    # Another category, or no category (follow-up turns), goes back to the model
+    _extract("library hours", ["ok"], "history", category="general")
+    _extract("library hours", ["ok"], "history")
+    assert mock_answer.call_count == 4
+
+
+@patch("app.services.bedrock_llm.answer_from_chunk_async", new_callable=AsyncMock)
+def test_extract_partial_answers_async_does_not_memoise_errors(mock_answer: AsyncMock) -> None:
+    mock_answer.side_effect = [RuntimeError("throttled"), "useful"]
+    assert asyncio.run(extract_partial_answers_async("Q?", ["ok"], "history", category="general")) == []
+    assert asyncio.run(extract_partial_answers_async("Q?", ["ok"], "history", category="general")) == ["useful"]
+
+
+@patch("app.services.bedrock_llm.answer_from_chunk_async", new_callable=AsyncMock)
+def test_extract_partial_answers_async_skips_memoised_chunks(mock_answer: AsyncMock) -> None:
+    mock_answer.side_effect = ["NOT_FOUND", "useful", "unused"]
+
+    first = asyncio.run(extract_partial_answers_async("Q?", ["a", "b"], "history", category="general"))
+    again = asyncio.run(extract_partial_answers_async("Q?", ["a", "b"], "history", category="general"))
+
+    assert first == again == ["useful"]
+    assert mock_answer.call_count == 2
 
 
 @pytest.mark.parametrize("category", ["advising", "engineering_news", "events", "clubs", "tutoring", "counseling"])
-@patch("app.services.bedrock_llm._converse")
-def test_generate_answer_style_hints_per_category(mock_converse: MagicMock, category: str) -> None:
+@patch("app.services.bedrock_llm._converse_async", new_callable=AsyncMock)
+def test_generate_answer_async_style_hints_per_category(mock_converse: AsyncMock, category: str) -> None:
     mock_converse.side_effect = ["Partial answer", "Synthesis"]
-    result = generate_answer(
+    result = asyncio.run(generate_answer_async(
         question="Q?",
         context="Context here.",
         category=category,
         history=[],
         allowed_urls=[],
-    )
+    ))
     assert result == "Synthesis"
 
 
-@patch("app.services.bedrock_llm.bedrock")
-def test_converse_success(mock_bedrock: MagicMock) -> None:
-    from app.services.bedrock_llm import _converse
-    mock_bedrock.converse.return_value = {
+@patch("app.services.bedrock_llm.bedrock_async")
+def test_converse_async_success(mock_bedrock: MagicMock) -> None:
+    from app.services.bedrock_llm import _converse_async
+    mock_bedrock.converse = AsyncMock(return_value={
         "output": {"message": {"content": [{"text": "  Model reply  "}]}}
-    }
-    result = _converse("prompt", max_tokens=100)
+    })
+    result = asyncio.run(_converse_async("prompt", max_tokens=100))
     assert result == "Model reply"
     mock_bedrock.converse.assert_called_once()
 
 
-@patch("app.services.bedrock_llm.bedrock")
-def test_converse_client_error_raises(mock_bedrock: MagicMock) -> None:
+@patch("app.services.bedrock_llm.bedrock_async")
+def test_converse_async_client_error_raises(mock_bedrock: MagicMock) -> None:
     from botocore.exceptions import ClientError
-    from app.services.bedrock_llm import _converse
-    mock_bedrock.converse.side_effect = ClientError({"Error": {"Code": "500", "Message": "Error"}}, "converse")
+    from app.services.bedrock_llm import _converse_async
+    mock_bedrock.converse = AsyncMock(
+        side_effect=ClientError({"Error": {"Code": "500", "Message": "Error"}}, "converse")
+    )
     with pytest.raises(ClientError):
-        _converse("prompt", max_tokens=100)
+        asyncio.run(_converse_async("prompt", max_tokens=100))
+
+
+@patch("app.services.bedrock_llm._converse_async", new_callable=AsyncMock)
+def test_generate_answer_async_returns_synthesis(mock_converse: AsyncMock) -> None:
+    mock_converse.side_effect = ["Partial A", "Final combined answer"]
+    result = asyncio.run(generate_answer_async(
+        question="What is SIUE?",
+        context="SIUE is a university.",
+        category="general",
+        history=[],
+        allowed_urls=[],
+    ))
+    assert result == "Final combined answer"
+    assert "Partial A" in mock_converse.call_args_list[-1][0][0]
+
+
+@patch("app.services.bedrock_llm._converse_async", new_callable=AsyncMock)
+def test_generate_answer_async_uses_ranked_chunks(mock_converse: AsyncMock) -> None:
+    mock_converse.side_effect = ["Partial A", "Partial B", "Final combined answer"]
+    result = asyncio.run(generate_answer_async(
+        question="What is SIUE?",
+        context="ignored when chunks are given",
+        category="general",
+        history=[],
+        allowed_urls=[],
+        chunks=["chunk one", "chunk two"],
+    ))
+    assert result == "Final combined answer"
+    extraction_prompts = [call[0][0] for call in mock_converse.call_args_list[:2]]
+    assert any("chunk one" in p for p in extraction_prompts)
+    assert any("chunk two" in p for p in extraction_prompts)
+    assert not any("ignored when chunks" in p for p in extraction_prompts)
+
+
+@patch("app.services.bedrock_llm.answer_from_chunk_async", new_callable=AsyncMock)
+def test_extract_partial_answers_async_drops_not_found_errors_and_timeouts(mock_answer: AsyncMock) -> None:
+    async def _answer(question, chunk, history_block, allowed_urls=None):
+        if chunk == "slow":
+            await asyncio.sleep(0.5)
+            return "too late"
+        if chunk == "boom":
+            raise RuntimeError("throttled")
+        if chunk == "missing":
+            return "NOT_FOUND"
+        return f"useful {chunk}"
+
+    mock_answer.side_effect = _answer
+    result = asyncio.run(extract_partial_answers_async(
+        "Q?", ["slow", "boom", "missing", "a", "b"], "history", timeout=0.1
+    ))
+    assert result == ["useful a", "useful b"]
+
+
+@patch("app.services.bedrock_llm._converse_async", new_callable=AsyncMock)
+def test_generate_answer_async_strips_unallowed_urls(mock_converse: AsyncMock) -> None:
+    mock_converse.side_effect = ["Partial", "See https://www.siue.edu/ or https://made-up.siue.edu/x."]
+    result = asyncio.run(generate_answer_async(
+        question="Q?",
+        context="Some context.",
+        category="general",
+        history=[],
+        allowed_urls=["https://www.siue.edu/"],
+    ))
+    assert result == "See https://www.siue.edu/ or ."
+
+
+class _RecordingBedrock:
+    """Stands in for the bedrock-runtime client and records every request it gets."""
+    def __init__(self, usage: dict):
+        self.requests: list[tuple[str, dict]] = []
+        self.usage = usage
+
+    def converse(self, **kwargs) -> dict:
+        self.requests.append(("converse", kwargs))
+        return {"output": {"message": {"content": [{"text": "reply"}]}}, "usage": self.usage}
+
+    def converse_stream(self, **kwargs) -> list[dict]:
+        self.requests.append(("converse_stream", kwargs))
+        return [
+            {"contentBlockDelta": {"delta": {"text": "re"}}},
+            {"contentBlockDelta": {"delta": {"text": "ply"}}},
+            {"metadata": {"usage": self.usage}},
+        ]
+
+
+_CACHED_USAGE = {"inputTokens": 40, "outputTokens": 5, "cacheReadInputTokens": 230, "cacheWriteInputTokens": 0}
+
+
+def _async_stub(stub: _RecordingBedrock):
+    """The async client interface over the same recording stub."""
+    class _AsyncStub:
+        async def converse(self, **kwargs) -> dict:
+            return stub.converse(**kwargs)
+
+        async def converse_stream(self, **kwargs):
+            for event in stub.converse_stream(**kwargs):
+                yield event
+    return _AsyncStub()
+
+
+def test_converse_sends_policy_as_cached_system_block(capsys) -> None:
+    from app.services import bedrock_llm
+    from app.services.prompts import SYSTEM_PROMPT
+
+    stub = _RecordingBedrock(_CACHED_USAGE)
+    with patch.object(bedrock_llm, "bedrock_async", _async_stub(stub)):
+        asyncio.run(generate_answer_async(
+            question="Q?", context="Context.", category="library", history=[], allowed_urls=[]
+        ))
+
+    assert len(stub.requests) == 2  # one extraction, one synthesis
+    for _, request in stub.requests:
+        assert request["system"] == [{"text": SYSTEM_PROMPT}, {"cachePoint": {"type": "default"}}]
+        assert SYSTEM_PROMPT not in request["messages"][0]["content"][0]["text"]
+    assert "[BEDROCK USAGE] in=40 out=5 cache_read=230 cache_write=0" in capsys.readouterr().out
+
+
+def test_converse_without_cache_support_sends_plain_system_block() -> None:
+    from app.services import bedrock_llm
+
+    stub = _RecordingBedrock({})
+    with patch.object(bedrock_llm, "bedrock_async", _async_stub(stub)), \
+            patch.object(bedrock_llm, "MODEL_ID", "meta.llama3-70b-instruct-v1:0"):
+        asyncio.run(bedrock_llm._converse_async("prompt", max_tokens=10))
+
+    _, request = stub.requests[0]
+    assert request["system"] == [{"text": bedrock_llm.prompts.SYSTEM_PROMPT}]
+
+
+def test_generate_answer_stream_async_uses_same_request_shape_and_logs_usage() -> None:
+    from app.services import bedrock_llm
+    from app.services.bedrock_llm import generate_answer_stream_async
+
+    stub = _RecordingBedrock(_CACHED_USAGE)
+
+    async def _collect():
+        return [token async for token in generate_answer_stream_async("Q?", "Context.", "events", [], [])]
+
+    before = bedrock_llm.usage_stats()
+    with patch.object(bedrock_llm, "bedrock_async", _async_stub(stub)):
+        tokens = asyncio.run(_collect())
+
+    assert "".join(tokens) == "reply"
+    (_, extraction), (kind, synthesis) = stub.requests
+    assert kind == "converse_stream"
+    assert synthesis["system"] == extraction["system"]
+    assert synthesis["inferenceConfig"]["maxTokens"] == 400
+    after = bedrock_llm.usage_stats()
+    assert after["calls"] - before["calls"] == 2
+    assert after["cache_read_tokens"] - before["cache_read_tokens"] == 460
+
+
+def test_converse_stream_async_raises_stream_errors() -> None:
+    from botocore.exceptions import ClientError
+    from app.services import bedrock_llm
+
+    class _Failing:
+        async def converse_stream(self, **kwargs):
+            yield {"contentBlockDelta": {"delta": {"text": "par"}}}
+            raise ClientError({"Error": {"Code": "ThrottlingException", "Message": "slow"}}, "ConverseStream")
+
+    async def _collect(out: list):
+        async for token in bedrock_llm._converse_stream_async("prompt", max_tokens=10):
+            out.append(token)
+
+    out: list[str] = []
+    with patch.object(bedrock_llm, "bedrock_async", _Failing()):
+        with pytest.raises(ClientError):
+            asyncio.run(_collect(out))
+    assert out == ["par"]
+
+
+def test_extraction_limit_is_shared_across_calls() -> None:
+    from app.services import bedrock_llm
+    from app.services.async_http import SharedSemaphore
+
+    running = peak = 0
+
+    async def _answer(question, chunk, history_block, allowed_urls=None):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return "useful"
+
+    async def _two_chats():
+        return await asyncio.gather(
+            extract_partial_answers_async("Q1?", ["a", "b", "c"], "history"),
+            extract_partial_answers_async("Q2?", ["d", "e", "f"], "history"),
+        )
+
+    with patch.object(bedrock_llm, "_extraction_limit", SharedSemaphore(2)), \
+            patch.object(bedrock_llm, "answer_from_chunk_async", side_effect=_answer):
+        results = asyncio.run(_two_chats())
+
+    assert [len(r) for r in results] == [3, 3]
+    assert peak == 2
+
+
+def test_extraction_timeout_includes_waiting_for_a_slot() -> None:
+    import time
+    from app.services import bedrock_llm
+    from app.services.async_http import SharedSemaphore
+
+    async def _answer(question, chunk, history_block, allowed_urls=None):
+        await asyncio.sleep(0.15)
+        return "too late"
+
+    async def _two_chats():
+        return await asyncio.gather(
+            extract_partial_answers_async("Q1?", ["a"], "history", timeout=0.1),
+            extract_partial_answers_async("Q2?", ["b"], "history", timeout=0.1),
+        )
+
+    started = time.monotonic()
+    with patch.object(bedrock_llm, "_extraction_limit", SharedSemaphore(1)), \
+            patch.object(bedrock_llm, "answer_from_chunk_async", side_effect=_answer):
+        results = asyncio.run(_two_chats())
+
+    assert results == [[], []]
+    assert time.monotonic() - started < 0.15  # the queued chat did not get its own 0.1s after the first
+
+
+def test_converse_stream_async_closes_bedrock_stream_when_client_leaves() -> None:
+    from app.services import bedrock_llm
+
+    closed = []
+
+    class _Endless:
+        async def converse_stream(self, **kwargs):
+            try:
+                while True:
+                    yield {"contentBlockDelta": {"delta": {"text": "tok"}}}
+            finally:
+                closed.append(True)
+
+    async def _first_token():
+        tokens = bedrock_llm._converse_stream_async("prompt", max_tokens=10)
+        first = await anext(tokens)
+        await tokens.aclose()
+        return first
+
+    with patch.object(bedrock_llm, "bedrock_async", _Endless()):
+        assert asyncio.run(_first_token()) == "tok"
+    assert closed == [True]
@@ -0,0 +1,58 @@
+"""Unit tests for app.services.bm25_index (BM25Index)."""
+from app.services.bm25_index import BM25Index, tokenize
+
+
+def test_tokenize_drops_stopwords_and_punctuation() -> None:
+    assert tokenize("What are the Library hours?") == ["library", "hours"]
+
+
+def test_search_ranks_matching_chunks_first() -> None:
+    index = BM25Index()
+    index.add_page("https://a.com", "h1", ["Residence halls open in August.", "Dining hours are 7am to 9pm."])
+    index.add_page("https://b.com", "h2", ["Dining dining dining menus change weekly."])
+
+    hits = index.search("dining hours", k=2)
+    assert [(url, position) for url, position, _ in hits] == [("https://a.com", 1), ("https://b.com", 0)]
+    assert hits[0][2] > hits[1][2]
+
+
+def test_search_can_be_limited_to_urls() -> None:
+    index = BM25Index()
+    index.add_page("https://a.com", "h1", ["library hours"])
+    index.add_page("https://b.com", "h2", ["library hours and more"])
+
+    assert [url for url, _, _ in index.search("library", urls=["https://b.com"])] == ["https://b.com"]
+    assert index.search("library", urls=["https://unknown.com"]) == []
+    assert index.search("nothing matches") == []
+
+
+def test_add_page_replaces_previous_version() -> None:
+    index = BM25Index()
+    index.add_page("https://a.com", "old", ["old gym schedule", "more"])
+    index.add_page("https://a.com", "new", ["new pool schedule"])
+
+    assert index.page_hash("https://a.com") == "new"
+    assert index.search("gym") == []
+    assert index.stats() == {"pages": 1, "chunks": 1, "terms": 3}
+
+    index.remove_page("https://a.com")
+    assert index.stats() == {"pages": 0, "chunks": 0, "terms": 0}
+
+
+def test_save_and_load_round_trip(tmp_path) -> None:
+    path = str(tmp_path / "index" / "bm25.json")
+    index = BM25Index()
+    index.add_page("https://a.com", "h1", ["Dining hours are 7am to 9pm.", "Meal plans"])
+    index.save(path)
+
+    loaded = BM25Index.load(path)
+    assert loaded.page_hash("https://a.com") == "h1"
+    assert loaded.stats() == index.stats()
+    assert loaded.search("meal plans") == index.search("meal plans")
+
+    loaded.add_page("https://b.com", "h2", ["Gym"])
+    assert loaded.search("gym")[0][0] == "https://b.com"
+
+
+def test_load_missing_file_returns_empty_index(tmp_path) -> None:
+    assert BM25Index.load(str(tmp_path / "missing.json")).stats() == {"pages": 0, "chunks": 0, "terms": 0}
@@ -0,0 +1,187 @@
+"""Unit tests for app.services.browser_pool (BrowserPool) using a fake Playwright."""
+import asyncio
+from unittest.mock import patch
+import pytest
+from app.services.browser_pool import BrowserPool
+
+
+class FakePage:
+    def __init__(self) -> None:
+        self.visited: list[str] = []
+        self.closed = False
+
+    async def goto(self, url: str, **kwargs) -> None:
+        self.visited.append(url)
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class FakeContext:
+    def __init__(self) -> None:
+        self.pages: list[FakePage] = []
+        self.fail_new_page = False
+
+    async def new_page(self) -> FakePage:
+        if self.fail_new_page:
+            raise RuntimeError("target closed")
+        page = FakePage()
+        self.pages.append(page)
+        return page
+
+
+class FakeBrowser:
+    def __init__(self) -> None:
+        self.connected = True
+        self.closed = False
+        self.context = FakeContext()
+
+    def is_connected(self) -> bool:
+        return self.connected
+
+    async def new_context(self) -> FakeContext:
+        return self.context
+
+    async def close(self) -> None:
+        self.closed = True
+        self.connected = False
+
+
+class FakePlaywright:
+    def __init__(self) -> None:
+        self.browsers: list[FakeBrowser] = []
+        self.chromium = self
+
+    async def launch(self, **kwargs) -> FakeBrowser:
+        browser = FakeBrowser()
+        self.browsers.append(browser)
+        return browser
+
+    async def stop(self) -> None:
+        pass
+
+
+@pytest.fixture
+def fake_playwright():
+    fake = FakePlaywright()
+
+    class _Starter:
+        async def start(self):
+            return fake
+
+    with patch("app.services.browser_pool.async_playwright", return_value=_Starter()):
+        yield fake
+
+
+async def _html_of(page, url: str) -> str:
+    await page.goto(url)
+    return f"<p>{url}</p>"
+
+
+def _render(pool: BrowserPool, url: str, handler) -> str:
+    return asyncio.run(pool.render_async(url, handler))
+
+
+def test_render_reuses_browser_and_page(fake_playwright: FakePlaywright) -> None:
+    pool = BrowserPool(max_pages=2, recycle_after=10)
+    try:
+        assert _render(pool, "https://a.com", _html_of) == "<p>https://a.com</p>"
+        assert _render(pool, "https://b.com", _html_of) == "<p>https://b.com</p>"
+        stats = pool.stats()
+    finally:
+        pool.close()
+
+    assert len(fake_playwright.browsers) == 1
+    assert len(fake_playwright.browsers[0].context.pages) == 1
+    assert stats["cold_renders"] == 1
+    assert stats["warm_renders"] == 1
+
+
+def test_render_recycles_browser_after_limit(fake_playwright: FakePlaywright) -> None:
+    pool = BrowserPool(max_pages=2, recycle_after=2)
+    try:
+        for i in range(5):
+            _render(pool, f"https://{i}.com", _html_of)
+        stats = pool.stats()
+    finally:
+        pool.close()
+
+    assert len(fake_playwright.browsers) == 3
+    assert fake_playwright.browsers[0].closed
+    assert stats["recycles"] == 2
+
+
+def test_render_relaunches_after_crash(fake_playwright: FakePlaywright) -> None:
+    pool = BrowserPool(max_pages=2, recycle_after=10)
+    try:
+        _render(pool, "https://a.com", _html_of)
+        fake_playwright.browsers[0].connected = False
+        assert _render(pool, "https://b.com", _html_of) == "<p>https://b.com</p>"
+        stats = pool.stats()
+    finally:
+        pool.close()
+
+    assert len(fake_playwright.browsers) == 2
+    assert stats["crashes"] == 1
+    assert stats["cold_renders"] == 2
+
+
+def test_handler_error_propagates_and_page_is_discarded(fake_playwright: FakePlaywright) -> None:
+    async def _broken(page, url):
+        raise RuntimeError("navigation failed")
+
+    pool = BrowserPool(max_pages=2, recycle_after=10)
+    try:
+        with pytest.raises(RuntimeError):
+            _render(pool, "https://a.com", _broken)
+        assert pool.stats()["idle_pages"] == 0
+    finally:
+        pool.close()
+
+    assert fake_playwright.browsers[0].context.pages[0].closed
+
+
+def test_failed_page_creation_does_not_pin_a_retired_browser(fake_playwright: FakePlaywright) -> None:
+    async def _broken(page, url):
+        raise RuntimeError("navigation failed")
+
+    pool = BrowserPool(max_pages=2, recycle_after=10)
+    try:
+        with pytest.raises(RuntimeError):
+            _render(pool, "https://a.com", _broken)  # leaves no idle page to reuse
+        fake_playwright.browsers[0].context.fail_new_page = True
+        with pytest.raises(RuntimeError):
+            _render(pool, "https://b.com", _html_of)
+        assert pool.stats()["active_pages"] == 0
+
+        # Once replaced, the first browser has nothing in flight and is closed
+        fake_playwright.browsers[0].connected = False
+        assert _render(pool, "https://c.com", _html_of) == "<p>https://c.com</p>"
+        assert fake_playwright.browsers[0].closed
+    finally:
+        pool.close()
+
+
+def test_render_async_caps_concurrent_pages(fake_playwright: FakePlaywright) -> None:
+    in_flight = 0
+    peak = 0
+
+    async def _slow(page, url):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.02)
+        in_flight -= 1
+        return url
+
+    async def run():
+        return await asyncio.gather(*(pool.render_async(f"https://{i}.com", _slow) for i in range(6)))
+
+    pool = BrowserPool(max_pages=2, recycle_after=100)
+    try:
+        results = asyncio.run(run())
+    finally:
+        pool.close()
+
+    assert results == [f"https://{i}.com" for i in range(6)]
+    assert peak == 2
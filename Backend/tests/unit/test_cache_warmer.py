@@ -0,0 +1,101 @@
+"""Unit tests for app.services.cache_warmer."""
+import asyncio
+from unittest.mock import patch, AsyncMock
+from app.services.cache_warmer import known_source_urls, needs_warming, run_warmer, try_warmer_lock, warm_cache
+from app.services.sources import UNIVERSITY_SOURCES
+
+
+def test_known_source_urls_covers_all_sources_without_duplicates() -> None:
+    urls = known_source_urls()
+    assert len(urls) == len(set(urls))
+    for category_urls in UNIVERSITY_SOURCES.values():
+        assert set(category_urls) <= set(urls)
+    assert "https://www.siue.edu/dining/" in urls
+
+
+@patch("app.services.cache_warmer.cache_age")
+def test_needs_warming(mock_age) -> None:
+    mock_age.return_value = None
+    assert needs_warming("https://www.siue.edu/housing/")
+
+    mock_age.return_value = 60
+    assert not needs_warming("https://www.siue.edu/housing/", interval=600)
+
+    # Calendar has a 30 minute TTL: 25 minutes old would expire before the next pass
+    mock_age.return_value = 60 * 25
+    assert needs_warming("https://www.siue.edu/calendar/", interval=600)
+
+
+@patch("app.services.cache_warmer.page_chunks")
+@patch("app.services.cache_warmer.refresh_page_text_async", new_callable=AsyncMock)
+@patch("app.services.cache_warmer.needs_warming")
+def test_warm_cache_refreshes_only_due_pages(mock_due, mock_refresh: AsyncMock, mock_index) -> None:
+    async def _refresh(url):
+        if url == "https://bad.com":
+            raise RuntimeError("down")
+        return "ok"
+
+    mock_due.side_effect = lambda url: url != "https://fresh.com"
+    mock_refresh.side_effect = _refresh
+
+    summary = asyncio.run(warm_cache(["https://fresh.com", "https://due.com", "https://bad.com"], jitter=0))
+
+    assert summary == {"checked": 3, "refreshed": 1, "failed": 1, "skipped": 1}
+    refreshed = sorted(call[0][0] for call in mock_refresh.call_args_list)
+    assert refreshed == ["https://bad.com", "https://due.com"]
+    mock_index.assert_called_once_with("https://due.com", "ok")
+
+
+@patch("app.services.cache_warmer.page_chunks")
+@patch("app.services.cache_warmer.refresh_page_text_async", new_callable=AsyncMock)
+def test_warm_cache_bounds_concurrency(mock_refresh: AsyncMock, mock_index) -> None:
+    in_flight = 0
+    peak = 0
+
+    async def _refresh(url):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return "ok"
+
+    mock_refresh.side_effect = _refresh
+    urls = [f"https://{i}.com" for i in range(8)]
+    summary = asyncio.run(warm_cache(urls, force=True, concurrency=2, jitter=0))
+    assert summary["refreshed"] == 8
+    assert peak == 2
+
+
+def test_try_warmer_lock_is_held_by_one_holder_at_a_time(tmp_path) -> None:
+    path = str(tmp_path / "cache" / "warmer.lock")
+    first = try_warmer_lock(path)
+    assert first is not None
+    assert try_warmer_lock(path) is None
+    first.close()
+    second = try_warmer_lock(path)
+    assert second is not None
+    second.close()
+
+
+@patch("app.services.cache_warmer.warm_cache", new_callable=AsyncMock)
+def test_run_warmer_warms_in_one_worker_and_hands_over_on_exit(mock_warm: AsyncMock, tmp_path) -> None:
+    path = str(tmp_path / "warmer.lock")
+    warmed_by = []
+    mock_warm.side_effect = lambda: warmed_by.append(asyncio.current_task())
+
+    async def run():
+        first = asyncio.ensure_future(run_warmer(interval=0.01, lock_path=path))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(run_warmer(interval=0.01, lock_path=path))
+        await asyncio.sleep(0.1)
+        assert warmed_by and set(warmed_by) == {first}
+
+        first.cancel()  # that worker exits and releases the lock
+        await asyncio.sleep(0.1)
+        second.cancel()
+        await asyncio.gather(first, second, return_exceptions=True)
+        return second
+
+    second = asyncio.run(run())
+    assert second in warmed_by
@@ -0,0 +1,96 @@
+"""Unit tests for app.services.chunk_index."""
+import os
+from unittest.mock import patch
+import pytest
+from app.services import chunk_index
+from app.services.chunk_index import load_index, page_chunks, rank_chunks
+
+
+@pytest.fixture(autouse=True)
+def index_dir(tmp_path):
+    with patch("app.services.chunk_index.INDEX_DIR", str(tmp_path)), patch("app.services.chunk_index._bm25", None):
+        chunk_index._pages.clear()
+        yield tmp_path
+        chunk_index.flush_index()
+        chunk_index._pages.clear()
+
+
+def _words(word: str, n: int) -> str:
+    return " ".join([word] * n)
+
+
+def test_page_chunks_splits_with_overlap_and_persists(index_dir) -> None:
+    text = _words("alpha", 400) + " " + _words("beta", 400)
+    page = page_chunks("https://a.com", text)
+
+    assert len(page.chunks) == 4  # 800 words, 300-word chunks stepping by 250
+    chunk_index.flush_index()
+    files = os.listdir(index_dir)
+    assert "bm25.json" in files
+    assert len(files) == 2
+    assert load_index().stats() == {"pages": 1, "chunks": 4, "terms": 2}
+
+
+def test_page_chunks_reuses_disk_index_for_same_content() -> None:
+    text = _words("alpha", 50)
+    first = page_chunks("https://a.com", text)
+    chunk_index.flush_index()
+    chunk_index._pages.clear()
+
+    with patch("app.services.chunk_index.chunk_text") as mock_chunk:
+        second = page_chunks("https://a.com", text)
+
+    mock_chunk.assert_not_called()
+    assert second.chunks == first.chunks
+
+
+def test_page_chunks_rebuilds_when_content_changes() -> None:
+    page_chunks("https://a.com", "old library hours")
+    page = page_chunks("https://a.com", "new library hours")
+    assert page.chunks == ["new library hours"]
+    assert load_index().stats()["chunks"] == 1
+
+
+def test_rank_chunks_picks_relevant_chunks_across_pages() -> None:
+    housing = page_chunks("https://housing.com", "Residence halls and dorm move-in dates.")
+    dining = page_chunks(
+        "https://dining.com",
+        _words("menu", 300) + " Dining hours are 7am to 9pm on weekdays.",
+    )
+
+    top = rank_chunks("What are the dining hours?", [housing, dining], k=1)
+    assert len(top) == 1
+    assert "Dining hours" in top[0]
+
+
+def test_rank_chunks_falls_back_to_first_chunks_without_matches() -> None:
+    a = page_chunks("https://a.com", "alpha page")
+    b = page_chunks("https://b.com", "beta page")
+    assert rank_chunks("zzz", [a, b], k=3) == ["alpha page", "beta page"]
+    assert rank_chunks("zzz", [], k=3) == []
+
+
+def test_rank_chunks_only_considers_given_pages() -> None:
+    page_chunks("https://other.com", "Library hours are posted online.")
+    a = page_chunks("https://a.com", "Advising appointments open Monday.")
+    assert rank_chunks("library hours", [a], k=2) == ["Advising appointments open Monday."]
+
+
+def test_index_survives_reload(index_dir) -> None:
+    page_chunks("https://a.com", "Dining hours are 7am to 9pm.")
+    chunk_index.flush_index()
+    with patch("app.services.chunk_index._bm25", None):
+        assert load_index().search("dining", k=1)[0][:2] == ("https://a.com", 0)
+
+
+def test_indexing_defers_disk_writes_and_batches_index_saves(index_dir) -> None:
+    with patch("app.services.chunk_index.BM25_SAVE_DELAY_SECONDS", 60), \
+            patch.object(chunk_index.BM25Index, "save", autospec=True) as mock_save:
+        page_chunks("https://a.com", "Library hours are posted online.")
+        page_chunks("https://b.com", "Advising appointments open Monday.")
+        mock_save.assert_not_called()
+
+        chunk_index.flush_index()
+
+    assert mock_save.call_count == 1
+    assert len([name for name in os.listdir(index_dir) if name.endswith(".chunks.json")]) == 2
@@ -0,0 +1,17 @@
+"""Unit tests for app.services.extraction_cache."""
+from app.services import extraction_cache
+from app.services.extraction_cache import extraction_key, get_extraction, store_extraction
+
+
+def test_extraction_key_normalizes_question() -> None:
+    assert extraction_key("Library hours?", "chunk", "library") == extraction_key("library  hours", "chunk", "library")
+    assert extraction_key("library hours", "chunk", "library") != extraction_key("library hours", "chunk 2", "library")
+    assert extraction_key("library hours", "chunk", "library") != extraction_key("library hours", "chunk", "general")
+
+
+def test_store_and_get_extraction() -> None:
+    key = extraction_key("q", "chunk", "general")
+    assert get_extraction(key) is None
+    store_extraction(key, "NOT_FOUND")
+    assert get_extraction(key) == "NOT_FOUND"
+    assert extraction_cache.stats()["entries"] == 1
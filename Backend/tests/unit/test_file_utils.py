@@ -0,0 +1,29 @@
+"""Unit tests for app.services.file_utils."""
+import json
+import os
+import pytest
+from unittest.mock import patch
+from app.services.file_utils import write_json_atomic
+
+
+def test_write_json_atomic_creates_directory_and_replaces_file(tmp_path) -> None:
+    path = str(tmp_path / "nested" / "entry.json")
+    write_json_atomic(path, {"text": "café"})
+    write_json_atomic(path, {"text": "new"}, separators=(",", ":"))
+
+    with open(path, encoding="utf-8") as f:
+        assert f.read() == '{"text":"new"}'
+    assert os.listdir(tmp_path / "nested") == ["entry.json"]
+
+
+def test_write_json_atomic_keeps_old_file_and_removes_temp_on_failure(tmp_path) -> None:
+    path = str(tmp_path / "entry.json")
+    write_json_atomic(path, {"v": 1})
+
+    with patch("app.services.file_utils.os.replace", side_effect=OSError("disk full")):
+        with pytest.raises(OSError):
+            write_json_atomic(path, {"v": 2})
+
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f) == {"v": 1}
+    assert os.listdir(tmp_path) == ["entry.json"]
@@ -0,0 +1,71 @@
+"""Unit tests for app.services.lru_cache (LRUCache)."""
+from unittest.mock import patch
+from app.services.lru_cache import LRUCache
+
+
+def test_get_set_and_counters() -> None:
+    cache = LRUCache(max_entries=4)
+    assert cache.get("a") is None
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["entries"] == 1
+
+
+def test_evicts_least_recently_used_by_count() -> None:
+    cache = LRUCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "b" is now least recently used
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_evicts_by_total_size() -> None:
+    cache = LRUCache(max_entries=10, max_bytes=100)
+    cache.set("a", "x", size=60)
+    cache.set("b", "y", size=60)
+    assert cache.get("a") is None
+    assert cache.get("b") == "y"
+    assert cache.stats()["bytes"] == 60
+
+
+def test_oversized_value_is_not_cached() -> None:
+    cache = LRUCache(max_entries=10, max_bytes=10)
+    cache.set("big", "x", size=11)
+    assert len(cache) == 0
+
+
+def test_replacing_key_updates_size() -> None:
+    cache = LRUCache(max_entries=10, max_bytes=100)
+    cache.set("a", "x", size=30)
+    cache.set("a", "y", size=50)
+    assert cache.get("a") == "y"
+    assert cache.stats()["bytes"] == 50
+
+
+def test_ttl_expiry_reads_as_miss() -> None:
+    cache = LRUCache(max_entries=10, ttl_seconds=10)
+    with patch("app.services.lru_cache.time.monotonic", return_value=100.0):
+        cache.set("a", 1)
+    with patch("app.services.lru_cache.time.monotonic", return_value=105.0):
+        assert cache.get("a") == 1
+    with patch("app.services.lru_cache.time.monotonic", return_value=111.0):
+        assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_invalidate_and_clear() -> None:
+    cache = LRUCache(max_entries=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.invalidate("a")
+    assert cache.get("a") is None
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.stats()["bytes"] == 0
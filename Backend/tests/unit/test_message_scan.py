@@ -0,0 +1,53 @@
+"""Unit tests for app.services.message_scan."""
+import pytest
+
+from app.services.message_scan import scan_message
+
+
+def test_scan_message_clean() -> None:
+    scan = scan_message("Where can I find tutoring?")
+    assert scan.allowed
+    assert not scan.crisis and not scan.blocked
+    assert scan.categories == ("tutoring",)
+    assert scan.category == "tutoring"
+
+
+def test_scan_message_no_keywords() -> None:
+    scan = scan_message("Hello there")
+    assert scan.allowed
+    assert scan.categories == ()
+    assert scan.category == "general"
+
+
+def test_scan_message_ranks_every_category() -> None:
+    scan = scan_message("Does the library have a scholarship workshop? I have anxiety about it.")
+    assert scan.categories == ("counseling", "financial_aid", "library", "events")
+    assert scan.category == "counseling"
+
+
+def test_scan_message_crisis_and_blocked_together() -> None:
+    scan = scan_message("I want to hurt myself after the election")
+    assert scan.crisis and scan.blocked
+    assert not scan.allowed
+
+
+@pytest.mark.parametrize(
+    "message",
+    ["unvoted", "BOMBastic", "whatever"],  # safety keywords are plain substrings
+)
+def test_scan_message_safety_matches_inside_words(message: str) -> None:
+    assert scan_message(message).blocked
+
+
+def test_scan_message_shorter_keyword_at_same_position() -> None:
+    # "si sessions" and "si" start at the same place; "career center" contains "career"
+    assert scan_message("si sessions").categories == ("tutoring",)
+    assert scan_message("career center hours").category == "career"
+    # "bomb threat" also contains "bomb"; both are blocked either way
+    assert scan_message("bomb").blocked
+
+
+def test_scan_message_word_rules() -> None:
+    assert scan_message("siue capstone").categories == ("graduation",)
+    assert scan_message("reprint").categories == ()
+    assert scan_message("events near the lib").category == "events"
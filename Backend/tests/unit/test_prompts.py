@@ -0,0 +1,80 @@
+"""Unit tests for app.services.prompts."""
+import pytest
+
+from app.services import prompts
+from app.services.prompts import SYSTEM_PROMPT, extraction_prompt, synthesis_prompt
+
+
+@pytest.fixture(autouse=True)
+def _fresh_stats():
+    prompts.reset_stats()
+    yield
+    prompts.reset_stats()
+
+
+def test_extraction_prompt_contains_request_parts() -> None:
+    prompt = extraction_prompt("When is it open?", "Lovejoy is open 24/7.", "USER: hi", ["https://www.siue.edu/"])
+    text = prompt.text
+    assert prompt.system == SYSTEM_PROMPT
+    assert SYSTEM_PROMPT not in text
+    assert "USER: hi" in text
+    assert "https://www.siue.edu/" in text
+    assert "NOT_FOUND" in text
+    assert text.index("Lovejoy is open 24/7.") < text.index("When is it open?")
+
+
+def test_extraction_prompt_without_links_has_no_links_header() -> None:
+    assert "ALLOWED LINKS (only" not in extraction_prompt("Q?", "chunk", "", None).text
+
+
+def test_all_prompts_share_the_system_block() -> None:
+    built = [
+        extraction_prompt("Q?", "chunk", "history"),
+        synthesis_prompt("", "history", [], ["A"]),
+        synthesis_prompt("STYLE", "other history", ["https://www.siue.edu/"], ["B"], streaming=True),
+    ]
+    assert {prompt.system for prompt in built} == {SYSTEM_PROMPT}
+    assert SYSTEM_PROMPT.startswith("You are EddieBot")
+
+
+def test_synthesis_prompt_variants() -> None:
+    urls = [f"https://www.siue.edu/{i}" for i in range(10)]
+    plain = synthesis_prompt("\n    STYLE:\n    - Be brief.\n    ", "history", urls, ["P1", "P2"]).text
+    streamed = synthesis_prompt("", "history", urls, ["P1", "P2"], streaming=True).text
+
+    assert "- Be brief." in plain
+    assert "PARTIAL ANSWERS:\nP1\nP2\n" in plain
+    assert "Always end with a relevant URL" in plain
+    assert "LINK USAGE (important):" in streamed
+    assert "LINK USAGE" not in plain
+    for text in (plain, streamed):
+        assert urls[7] in text and urls[8] not in text
+
+
+def test_sizes_per_section() -> None:
+    prompt = extraction_prompt("Q?", "x" * 400, "history")
+    sizes = prompt.sizes()
+    assert sizes["chunk"]["bytes"] == len("UNIVERSITY INFORMATION:\n" + "x" * 400 + "\n\n")
+    assert sizes["chunk"]["tokens"] == -(-sizes["chunk"]["bytes"] // prompts.BYTES_PER_TOKEN)
+    assert sizes["system"]["bytes"] == len(SYSTEM_PROMPT.encode("utf-8"))
+    assert sizes["total"]["bytes"] == len(prompt.text.encode("utf-8")) + sizes["system"]["bytes"]
+    assert sizes["links"]["bytes"] == 0
+
+
+def test_stats_average_per_kind() -> None:
+    extraction_prompt("Q?", "a" * 100, "h")
+    extraction_prompt("Q?", "a" * 300, "h")
+    synthesis_prompt("", "h", [], ["A"])
+
+    report = prompts.stats()
+    assert report["extraction"]["calls"] == 2
+    assert report["synthesis"]["calls"] == 1
+    chunk_bytes = report["extraction"]["sections"]["chunk"]["bytes"]
+    assert chunk_bytes == len("UNIVERSITY INFORMATION:\n\n\n") + 200
+    assert report["extraction"]["sections"]["system"]["bytes"] == len(SYSTEM_PROMPT.encode("utf-8"))
+
+
+def test_stats_disabled(monkeypatch) -> None:
+    monkeypatch.setattr(prompts, "PROMPT_STATS_ENABLED", False)
+    extraction_prompt("Q?", "chunk", "h")
+    assert prompts.stats() == {}
@@ -1,6 +1,6 @@
 """Unit tests for app.services.query_classifier."""
 import pytest
-from app.services.query_classifier import classify_query
+from app.services.query_classifier import classify_queries, classify_query
 
 
 @pytest.mark.parametrize(
@@ -30,7 +30,7 @@ from app.services.query_classifier import classify_query
         ("get involved", "clubs"),
         ("how do I join?", "clubs"),
         ("hello", "general"),
-        ("what is SIUE?", "tutoring"),
+        ("what is SIUE?", "general"),
         ("random question", "general"),
     ],
 )
@@ -41,3 +41,23 @@ def test_classify_query(message: str, expected: str) -> None:
 def test_classify_query_case_insensitive() -> None:
     assert classify_query("ENGINEERING NEWS") == "engineering_news"
     assert classify_query("Advising") == "advising"
+
+
+@pytest.mark.parametrize(
+    "message,expected",
+    [
+        ("What events are there?", "events"),  # keywords match at word starts
+        ("any tutors for calculus?", "tutoring"),
+        ("when is my capstone due", "graduation"),  # acronyms match whole words only
+        ("SI sessions for chem", "tutoring"),
+        ("an immigrant student question", "general"),  # no match inside words
+        ("club for students with anxiety", "counseling"),  # priority across positions
+        ("tutor for my loan application", "financial_aid"),
+    ],
+)
+def test_classify_query_word_starts_and_priority(message: str, expected: str) -> None:
+    assert classify_query(message) == expected
+
+
+def test_classify_queries_batch() -> None:
+    assert classify_queries(["library hours", "hello", "FAFSA deadline"]) == ["library", "general", "financial_aid"]
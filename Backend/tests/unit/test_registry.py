@@ -0,0 +1,118 @@
+"""Unit tests for app.services.registry."""
+import copy
+import json
+import os
+
+import pytest
+
+from app.services import registry
+from app.services.registry import REGISTRY_PATH, current_registry, load_registry, parse_registry
+
+
+@pytest.fixture
+def registry_file(tmp_path, monkeypatch):
+    """A copy of the shipped registry.json that current_registry() reads, rechecked on every call."""
+    path = tmp_path / "registry.json"
+    path.write_text(open(REGISTRY_PATH, encoding="utf-8").read(), encoding="utf-8")
+    monkeypatch.setattr(registry, "REGISTRY_PATH", str(path))
+    monkeypatch.setattr(registry, "REGISTRY_RELOAD_INTERVAL_SECONDS", 0)
+    registry.reset_registry()
+    yield path
+    registry.reset_registry()
+
+
+def _shipped() -> dict:
+    with open(REGISTRY_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write(path, data: dict, mtime_offset: float) -> None:
+    path.write_text(json.dumps(data), encoding="utf-8")
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + mtime_offset))
+
+
+def test_shipped_registry_is_valid() -> None:
+    loaded = load_registry()
+    names = [category.name for category in loaded.categories]
+    assert names[0] == "counseling"
+    assert "general" in loaded.sources
+    assert set(names) <= set(loaded.sources)
+    assert loaded.style_hints["library"].strip().startswith("STYLE:")
+    assert "general" not in loaded.style_hints
+
+
+def test_registry_is_immutable() -> None:
+    loaded = load_registry()
+    with pytest.raises(TypeError):
+        loaded.sources["new"] = ("https://www.siue.edu/",)
+    with pytest.raises(AttributeError):
+        loaded.categories = ()
+
+
+def test_all_source_urls_has_no_duplicates() -> None:
+    urls = load_registry().all_source_urls()
+    assert len(urls) == len(set(urls))
+    assert "https://www.siue.edu/dining/" in urls
+
+
+@pytest.mark.parametrize(
+    "mutate,problem",
+    [
+        (lambda d: d["categories"][0].update(keywords=[]), "keywords"),
+        (lambda d: d["categories"][0].update(sources=["http://example.com"]), "https://"),
+        (lambda d: d["categories"].append(copy.deepcopy(d["categories"][0])), "listed twice"),
+        (lambda d: d["categories"][0].update(name="general"), "reserved"),
+        (lambda d: d["whole_word_keywords"].append("nope"), "whole_word_keywords"),
+        (lambda d: d.pop("general"), "general"),
+        (lambda d: d["general"]["routes"][0].update(url=None), "url"),
+    ],
+)
+def test_parse_registry_rejects_invalid(mutate, problem: str) -> None:
+    data = _shipped()
+    mutate(data)
+    with pytest.raises(ValueError, match=problem):
+        parse_registry(data)
+
+
+def test_current_registry_reloads_changed_file(registry_file) -> None:
+    first = current_registry()
+    assert current_registry() is first  # unchanged file is not reparsed
+
+    data = _shipped()
+    data["categories"].append({
+        "name": "parking",
+        "keywords": ["parking permit"],
+        "sources": ["https://www.siue.edu/parking/"],
+    })
+    _write(registry_file, data, mtime_offset=10)
+
+    reloaded = current_registry()
+    assert reloaded is not first
+    assert reloaded.sources["parking"] == ("https://www.siue.edu/parking/",)
+
+
+def test_current_registry_keeps_last_good_on_invalid_file(registry_file) -> None:
+    first = current_registry()
+    registry_file.write_text("{not json", encoding="utf-8")
+    os.utime(registry_file, (0, first.mtime + 10))
+    assert current_registry() is first
+
+
+def test_classifier_and_sources_follow_reload(registry_file) -> None:
+    from app.services.query_classifier import classify_query
+    from app.services.retrieval import select_sources
+
+    assert classify_query("where do I get a parking permit") == "general"
+
+    data = _shipped()
+    data["categories"].insert(0, {
+        "name": "parking",
+        "keywords": ["parking permit"],
+        "sources": ["https://www.siue.edu/parking/"],
+        "style": ["Mention permit prices if present."],
+    })
+    _write(registry_file, data, mtime_offset=10)
+
+    assert classify_query("where do I get a parking permit") == "parking"
+    assert select_sources("parking", "parking permit") == ["https://www.siue.edu/parking/"]
@@ -1,6 +1,19 @@
 """Unit tests for app.services.retrieval."""
-from unittest.mock import patch, MagicMock
-from app.services.retrieval import select_sources, retrieve_context
+import asyncio
+from unittest.mock import patch, AsyncMock
+import pytest
+from app.services import chunk_index
+from app.services.retrieval import (
+    select_sources,
+    retrieve_chunks_async,
+)
+
+
+@pytest.fixture
+def index_dir(tmp_path):
+    with patch("app.services.chunk_index.INDEX_DIR", str(tmp_path)), patch("app.services.chunk_index._bm25", None):
+        yield tmp_path
+        chunk_index.flush_index()
 
 
 def test_select_sources_engineering_news() -> None:
@@ -57,23 +70,70 @@ def test_select_sources_general_cap_three() -> None:
     assert len(urls) <= 3
 
 
-@patch("app.services.retrieval.fetch_page_text")
-def test_retrieve_context_success(mock_fetch: MagicMock) -> None:
+@patch("app.services.retrieval.fetch_page_text_async", new_callable=AsyncMock)
+def test_retrieve_chunks_async_success(mock_fetch: AsyncMock, index_dir) -> None:
     mock_fetch.return_value = "Page content here"
-    result = retrieve_context("general", "hello")
-    assert "Page content here" in result
+    chunks, urls = asyncio.run(retrieve_chunks_async("general", "hello"))
+    assert "Page content here" in chunks
+    assert urls
     assert mock_fetch.called
 
 
-@patch("app.services.retrieval.fetch_page_text")
-def test_retrieve_context_fetch_error_continues(mock_fetch: MagicMock) -> None:
-    mock_fetch.side_effect = [Exception("fail"), "Second page ok"]
-    result = retrieve_context("events", "events")
-    assert "Second page ok" in result
+@patch("app.services.retrieval.fetch_page_text_async", new_callable=AsyncMock)
+def test_retrieve_chunks_async_all_fail_returns_empty(mock_fetch: AsyncMock, index_dir) -> None:
+    mock_fetch.side_effect = Exception("fail")
+    assert asyncio.run(retrieve_chunks_async("general", "hello")) == ([], [])
 
 
-@patch("app.services.retrieval.fetch_page_text")
-def test_retrieve_context_all_fail_returns_empty(mock_fetch: MagicMock) -> None:
-    mock_fetch.side_effect = Exception("fail")
-    result = retrieve_context("general", "hello")
-    assert result == ""
+@patch("app.services.retrieval.fetch_page_text_async", new_callable=AsyncMock)
+def test_retrieve_chunks_async_keeps_order_and_skips_failures(mock_fetch: AsyncMock, index_dir) -> None:
+    async def _fetch(url):
+        if url == "https://www.siue.edu/calendar/":
+            await asyncio.sleep(0.05)
+            return "calendar text"
+        raise RuntimeError("fail")
+
+    mock_fetch.side_effect = _fetch
+    chunks, urls = asyncio.run(retrieve_chunks_async("events", "events"))
+    assert urls == ["https://www.siue.edu/calendar/"]
+    assert chunks == ["calendar text"]
+
+
+@patch("app.services.retrieval.fetch_page_text_async", new_callable=AsyncMock)
+def test_retrieve_chunks_async_keeps_source_order(mock_fetch: AsyncMock, index_dir) -> None:
+    async def _fetch(url):
+        # First source finishes last
+        if url == "https://www.siue.edu/":
+            await asyncio.sleep(0.1)
+        return f"text of {url}"
+
+    mock_fetch.side_effect = _fetch
+    _, urls = asyncio.run(retrieve_chunks_async("general", "hello"))
+    assert urls == ["https://www.siue.edu/", "https://www.siue.edu/about/"]
+
+
+@patch("app.services.retrieval.fetch_page_text_async", new_callable=AsyncMock)
+def test_retrieve_chunks_async_skips_pages_past_deadline(mock_fetch: AsyncMock, index_dir) -> None:
+    async def _fetch(url):
+        if url == "https://www.siue.edu/about/":
+            await asyncio.sleep(0.5)
+        return f"text of {url}"
+
+    mock_fetch.side_effect = _fetch
+    chunks, urls = asyncio.run(retrieve_chunks_async("general", "hello", deadline=0.1))
+    assert urls == ["https://www.siue.edu/"]
+    assert not any("about" in chunk for chunk in chunks)
+
+
+@patch("app.services.retrieval.fetch_page_text_async", new_callable=AsyncMock)
+def test_retrieve_chunks_async_returns_top_chunks_across_sources(mock_fetch: AsyncMock, index_dir) -> None:
+    pages = {
+        "https://www.siue.edu/housing/": "Residence halls open in August.",
+        "https://www.siue.edu/dining/": "The dining meal plan covers 14 meals a week.",
+    }
+    mock_fetch.side_effect = lambda url: pages[url]
+
+    chunks, urls = asyncio.run(retrieve_chunks_async("general", "housing dorm and meal plan cost", top_k=1))
+
+    assert urls == ["https://www.siue.edu/housing/", "https://www.siue.edu/dining/"]
+    assert chunks == ["The dining meal plan covers 14 meals a week."]
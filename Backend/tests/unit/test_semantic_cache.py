@@ -0,0 +1,79 @@
+"""Unit tests for app.services.semantic_cache."""
+from unittest.mock import patch
+import pytest
+from app.services.answer_cache import SEMANTIC_CACHE_THRESHOLD
+from app.services.semantic_cache import SemanticCache, cosine, embed_question, question_guard
+
+
+def test_embed_question_ignores_case_punctuation_and_stopwords() -> None:
+    assert cosine(embed_question("What are the Library hours?"), embed_question("library hours")) > 0.99
+    assert cosine(embed_question("library hours"), embed_question("gym hours")) < 0.85
+    assert embed_question("the") == {}
+
+
+def test_get_returns_most_similar_answer_above_threshold() -> None:
+    cache = SemanticCache(threshold=0.8)
+    cache.add("general", "what are the library hours", "v1", "library answer")
+    cache.add("general", "what are the gym hours", "v1", "gym answer")
+
+    assert cache.get("general", "library hours today", "v1") == "library answer"
+    assert cache.get("general", "parking permits", "v1") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_get_requires_same_category_and_sources() -> None:
+    cache = SemanticCache(threshold=0.8)
+    cache.add("general", "library hours", "v1", "answer")
+    assert cache.get("advising", "library hours", "v1") is None
+    assert cache.get("general", "library hours", "v2") is None
+
+
+def test_add_evicts_least_recently_used_per_category() -> None:
+    cache = SemanticCache(threshold=0.8, max_entries=2)
+    cache.add("general", "library hours", "v1", "a")
+    cache.add("general", "gym hours", "v1", "b")
+    cache.get("general", "library hours", "v1")
+    cache.add("general", "parking permits", "v1", "c")
+
+    assert cache.get("general", "gym hours", "v1") is None
+    assert cache.get("general", "library hours", "v1") == "a"
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["entries"] == 2
+
+
+def test_entries_expire_after_ttl() -> None:
+    cache = SemanticCache(threshold=0.8, ttl_seconds=10)
+    with patch("app.services.semantic_cache.time.monotonic", return_value=100.0):
+        cache.add("general", "library hours", "v1", "a")
+    with patch("app.services.semantic_cache.time.monotonic", return_value=111.0):
+        assert cache.get("general", "library hours", "v1") is None
+    assert cache.stats()["entries"] == 0
+
+
+@pytest.mark.parametrize(
+    "cached,asked",
+    [
+        ("when is the fall 2025 deadline", "when is the fall 2026 deadline"),
+        ("where is engineering building room 2001", "where is engineering building room 2010"),
+        ("can I withdraw from a class", "can I not withdraw from a class"),
+        ("can I withdraw from a class", "can't I withdraw from a class"),
+        ("is there a fee", "is there no fee"),
+        ("how do I register", "when do I register"),
+        ("who is my advisor", "where is my advisor"),
+        ("can I drop a class", "why can I drop a class"),
+    ],
+)
+def test_get_misses_when_numbers_negations_or_question_words_differ(cached: str, asked: str) -> None:
+    cache = SemanticCache(threshold=SEMANTIC_CACHE_THRESHOLD)
+    cache.add("general", cached, "v1", "cached answer")
+    assert cache.get("general", asked, "v1") is None
+
+
+def test_question_guard() -> None:
+    assert question_guard("Room 2001, fall 2025?") == (("2001", "2025"), (), ())
+    assert question_guard("I can't and cannot") == ((), ("not", "not"), ())
+    assert question_guard("can t go") == question_guard("can't go")
+    assert question_guard("no classes never") == ((), ("no", "never"), ())
+    assert question_guard("How and when do I register?") == ((), (), ("how", "when"))
+    assert question_guard("What are the library hours?") == question_guard("library hours")
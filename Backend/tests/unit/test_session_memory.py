@@ -1,4 +1,5 @@
 """Unit tests for app.services.session_memory (SessionMemoryStore)."""
+import sys
 import time
 from unittest.mock import patch
 import pytest
@@ -53,3 +54,71 @@ def test_store_ttl_cleanup() -> None:
 def test_get_nonexistent_session_returns_empty_list() -> None:
     store = SessionMemoryStore(max_messages=5, ttl_seconds=3600)
     assert store.get("nonexistent") == []
+
+
+def test_store_clear() -> None:
+    store = SessionMemoryStore(max_messages=5, ttl_seconds=3600)
+    store.add("s1", "user", "hi")
+    store.clear()
+    assert store.get("s1") == []
+
+
+def test_cleanup_expires_least_recently_seen_sessions_only() -> None:
+    store = SessionMemoryStore(max_messages=5, ttl_seconds=60)
+    now = time.time()
+    with patch("time.time", return_value=now):
+        store.add("old", "user", "a")
+        store.add("revisited", "user", "b")
+    with patch("time.time", return_value=now + 50):
+        store.add("fresh", "user", "c")
+        store.get("revisited")
+
+    assert list(store._last_seen) == ["old", "fresh", "revisited"]
+    with patch("time.time", return_value=now + 90):
+        store._cleanup()
+
+    assert list(store._last_seen) == ["fresh", "revisited"]
+    assert "old" not in store._store
+
+
+def test_cleanup_stops_at_first_live_session() -> None:
+    store = SessionMemoryStore(max_messages=5, ttl_seconds=60)
+    for i in range(1000):
+        store.add(f"s{i}", "user", "hi")
+
+    with patch.object(store._last_seen, "popitem", wraps=store._last_seen.popitem) as popitem:
+        store.add("s0", "user", "again")
+    popitem.assert_not_called()
+
+
+def test_message_is_slotted_and_roles_are_interned() -> None:
+    store = SessionMemoryStore(max_messages=5, ttl_seconds=3600)
+    store.add("s1", "".join(["us", "er"]), "hi")
+    message = store._store["s1"][0]
+    assert not hasattr(message, "__dict__")
+    assert message.role is sys.intern("user")
+
+
+def test_per_session_byte_cap_drops_oldest_messages() -> None:
+    store = SessionMemoryStore(max_messages=10, ttl_seconds=3600, max_session_bytes=10)
+    store.add("s1", "user", "aaaa")
+    store.add("s1", "assistant", "bbbb")
+    store.add("s1", "user", "cccc")
+    assert [m["text"] for m in store.get("s1")] == ["bbbb", "cccc"]
+
+    store.add("s1", "assistant", "x" * 25)
+    assert store.get("s1") == [{"role": "assistant", "text": "x" * 10}]
+    assert store.stats()["bytes"] == 10
+
+
+def test_total_byte_ceiling_evicts_least_recently_seen_sessions() -> None:
+    store = SessionMemoryStore(max_messages=10, ttl_seconds=3600, max_session_bytes=100, max_total_bytes=20)
+    store.add("a", "user", "x" * 8)
+    store.add("b", "user", "x" * 8)
+    store.get("a")
+    store.add("c", "user", "x" * 8)
+
+    assert store.get("b") == []
+    assert len(store.get("a")) == 1
+    assert len(store.get("c")) == 1
+    assert store.stats() == {"sessions": 3, "bytes": 16}
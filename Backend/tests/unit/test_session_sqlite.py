@@ -0,0 +1,177 @@
+"""Unit tests for app.services.session_sqlite (SQLiteSessionStore)."""
+import threading
+import time
+from unittest.mock import patch
+import pytest
+from app.services.session_sqlite import SQLiteSessionStore
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "sessions.db")
+
+
+@pytest.fixture
+def open_store(db_path):
+    stores = []
+
+    def _open(**kwargs):
+        kwargs.setdefault("flush_interval", 60)  # flush explicitly in tests
+        store = SQLiteSessionStore(db_path, **kwargs)
+        stores.append(store)
+        return store
+
+    yield _open
+    for store in stores:
+        store.close()
+
+
+def test_add_and_get_before_and_after_flush(open_store) -> None:
+    store = open_store()
+    store.add("s1", "user", "Hello")
+    store.add("s1", "assistant", "Hi there")
+    expected = [{"role": "user", "text": "Hello"}, {"role": "assistant", "text": "Hi there"}]
+
+    assert store.get("s1") == expected
+    store.flush()
+    assert store.get("s1") == expected
+    assert store.get("other") == []
+
+
+def test_sessions_are_shared_between_workers_after_flush(open_store) -> None:
+    worker_a = open_store()
+    worker_b = open_store()
+
+    worker_a.add("s1", "user", "from a")
+    assert worker_b.get("s1") == []
+
+    worker_a.flush()
+    worker_b.add("s1", "assistant", "from b")
+    worker_b.flush()
+    assert worker_a.get("s1") == [{"role": "user", "text": "from a"}, {"role": "assistant", "text": "from b"}]
+
+
+def test_history_survives_restart(db_path) -> None:
+    store = SQLiteSessionStore(db_path, flush_interval=60)
+    store.add("s1", "user", "remember me")
+    store.close()
+
+    reopened = SQLiteSessionStore(db_path, flush_interval=60)
+    try:
+        assert reopened.get("s1") == [{"role": "user", "text": "remember me"}]
+    finally:
+        reopened.close()
+
+
+def test_max_messages_applied_on_read_and_flush(open_store) -> None:
+    store = open_store(max_messages=3)
+    for i in range(5):
+        store.add("s1", "user", f"msg{i}")
+    assert [m["text"] for m in store.get("s1")] == ["msg2", "msg3", "msg4"]
+
+    store.flush()
+    rows = store._conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+    assert rows == 3
+
+
+def test_expired_session_starts_empty(open_store) -> None:
+    store = open_store(ttl_seconds=60)
+    store.add("s1", "user", "old")
+    store.flush()
+
+    with patch("app.services.session_sqlite.time.time", return_value=time.time() + 120):
+        assert store.get("s1") == []
+        store.add("s1", "user", "new")
+        store.flush()
+        assert store.get("s1") == [{"role": "user", "text": "new"}]
+
+
+def test_background_flusher_and_batch_size(open_store) -> None:
+    store = open_store(flush_interval=0.01)
+    reader = open_store()
+    store.add("s1", "user", "hi")
+    deadline = time.time() + 2
+    while reader.get("s1") == [] and time.time() < deadline:
+        time.sleep(0.01)
+    assert reader.get("s1") == [{"role": "user", "text": "hi"}]
+
+    # A full batch wakes the flusher long before flush_interval
+    batched = open_store(batch_size=2)
+    batched.add("s2", "user", "a")
+    batched.add("s2", "user", "b")
+    deadline = time.time() + 2
+    while reader.get("s2") == [] and time.time() < deadline:
+        time.sleep(0.01)
+    assert len(reader.get("s2")) == 2
+
+
+def test_add_never_commits_on_the_calling_thread(open_store) -> None:
+    store = open_store(batch_size=1)
+    committed_on = []
+    commit = store._commit
+
+    def _recording_commit(pending, touched):
+        committed_on.append(threading.get_ident())
+        commit(pending, touched)
+
+    with patch.object(store, "_commit", _recording_commit):
+        store.add("s1", "user", "hi")
+        deadline = time.time() + 2
+        while not committed_on and time.time() < deadline:
+            time.sleep(0.01)
+
+    assert committed_on and threading.get_ident() not in committed_on
+
+
+def test_get_does_not_wait_for_a_flush_in_progress(open_store) -> None:
+    store = open_store()
+    store.add("s1", "user", "committed")
+    store.flush()
+    store.add("s1", "assistant", "in flight")
+
+    in_commit = threading.Event()
+    release = threading.Event()
+    commit = store._commit
+
+    def _slow_commit(pending, touched):
+        in_commit.set()
+        release.wait(timeout=5)
+        commit(pending, touched)
+
+    with patch.object(store, "_commit", _slow_commit):
+        flusher = threading.Thread(target=store.flush)
+        flusher.start()
+        assert in_commit.wait(timeout=5)
+
+        started = time.monotonic()
+        during = store.get("s1")
+        assert time.monotonic() - started < 1
+
+        release.set()
+        flusher.join(timeout=5)
+
+    expected = [{"role": "user", "text": "committed"}, {"role": "assistant", "text": "in flight"}]
+    assert during == expected
+    assert store.get("s1") == expected
+
+
+def test_clear(open_store) -> None:
+    store = open_store()
+    store.add("s1", "user", "hi")
+    store.flush()
+    store.add("s1", "user", "pending")
+    store.clear()
+    assert store.get("s1") == []
+
+
+def test_failed_flush_requeues_the_batch(open_store) -> None:
+    store = open_store()
+    store.add("s1", "user", "hi")
+
+    with patch.object(store, "_commit", side_effect=RuntimeError("disk full")):
+        with pytest.raises(RuntimeError):
+            store.flush()
+    assert store.get("s1") == [{"role": "user", "text": "hi"}]
+
+    store.flush()
+    assert store._conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0] == 1
@@ -0,0 +1,50 @@
+"""Unit tests for app.services.single_flight (SingleFlight)."""
+import asyncio
+from app.services.single_flight import SingleFlight
+
+
+def test_do_async_coalesces_and_survives_cancelled_waiter() -> None:
+    flights = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "page"
+
+    async def run():
+        impatient = asyncio.ensure_future(flights.do_async("url", work))
+        others = [asyncio.ensure_future(flights.do_async("url", work)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        impatient.cancel()
+        return await asyncio.gather(*others)
+
+    assert asyncio.run(run()) == ["page"] * 3
+    assert calls == [1]
+
+
+def test_do_async_propagates_error() -> None:
+    flights = SingleFlight()
+
+    async def work():
+        raise ValueError("boom")
+
+    async def run():
+        return await asyncio.gather(
+            flights.do_async("url", work), flights.do_async("url", work), return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, ValueError) for r in results)
+
+
+def test_do_async_runs_again_after_completion() -> None:
+    flights = SingleFlight()
+
+    async def run():
+        first = await flights.do_async("url", lambda: asyncio.sleep(0, result=1))
+        second = await flights.do_async("url", lambda: asyncio.sleep(0, result=2))
+        return first, second
+
+    assert asyncio.run(run()) == (1, 2)
+    assert flights.stats() == {"executed": 2, "deduplicated": 0, "in_flight": 0}
@@ -0,0 +1,22 @@
+"""Unit tests for app.services.text_utils."""
+from app.services.text_utils import chunk_text
+
+
+def test_chunk_text_empty() -> None:
+    assert chunk_text("") == []
+
+
+def test_chunk_text_small() -> None:
+    text = "one two three"
+    chunks = chunk_text(text, chunk_size=5, overlap=1)
+    assert len(chunks) >= 1
+    assert "one" in chunks[0]
+
+
+def test_chunk_text_overlap() -> None:
+    words = ["w" + str(i) for i in range(100)]
+    text = " ".join(words)
+    chunks = chunk_text(text, chunk_size=20, overlap=5)
+    assert len(chunks) >= 2
+    for c in chunks:
+        assert len(c.split()) <= 25
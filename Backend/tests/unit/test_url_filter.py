@@ -0,0 +1,59 @@
+"""Unit tests for app.services.url_filter."""
+import asyncio
+
+import pytest
+from app.services.url_filter import StreamingUrlFilter, filter_url_stream, strip_unauthorized_urls
+
+ALLOWED = ["https://www.siue.edu/", "https://www.siue.edu/library/"]
+
+SAMPLES = [
+    "See https://www.siue.edu/library/ for hours.",
+    "Bad link https://evil.example.com/x. Good link https://www.siue.edu/.",
+    "Visit (https://www.siue.edu/) or http://siue.edu/made-up today\nthanks",
+    "No links here, just http talk and https:// alone.",
+    "Ends with a link https://www.siue.edu/",
+    "Ends with a bad link https://bad.example.com",
+]
+
+
+def test_strip_unauthorized_urls_keeps_sentence_punctuation() -> None:
+    assert strip_unauthorized_urls("Go to https://bad.com/x.", ALLOWED) == "Go to ."
+    assert strip_unauthorized_urls("Go to https://www.siue.edu/.", ALLOWED) == "Go to https://www.siue.edu/."
+
+
+@pytest.mark.parametrize("text", SAMPLES)
+@pytest.mark.parametrize("piece", [1, 2, 3, 7, 1000])
+def test_stream_matches_whole_text_filter_for_any_split(text: str, piece: int) -> None:
+    url_filter = StreamingUrlFilter(ALLOWED)
+    out = "".join(url_filter.feed(text[i:i + piece]) for i in range(0, len(text), piece)) + url_filter.flush()
+    assert out == strip_unauthorized_urls(text, ALLOWED)
+
+
+def test_feed_emits_safe_text_immediately_and_holds_only_url_tail() -> None:
+    url_filter = StreamingUrlFilter(ALLOWED)
+    assert url_filter.feed("Hours are 8-5. Details: ht") == "Hours are 8-5. Details: "
+    assert url_filter.feed("tps://www.si") == ""
+    assert url_filter.feed("ue.edu/library/ and more") == "https://www.siue.edu/library/ and more"
+    assert url_filter.feed(" https://bad") == " "
+    assert url_filter.flush() == ""
+
+
+def test_feed_releases_text_that_stops_looking_like_a_url() -> None:
+    url_filter = StreamingUrlFilter(ALLOWED)
+    assert url_filter.feed("a path") == "a pat"
+    assert url_filter.feed("way") == "hway"
+
+
+def test_filter_url_stream_skips_empty_pieces() -> None:
+    tokens = ["See https://www.si", "ue.edu/ and https://bad", ".com/x now.\n", "Done"]
+
+    async def _tokens():
+        for token in tokens:
+            yield token
+
+    async def _collect():
+        return [piece async for piece in filter_url_stream(_tokens(), ALLOWED)]
+
+    out = asyncio.run(_collect())
+    assert "".join(out) == "See https://www.siue.edu/ and  now.\nDone"
+    assert "" not in out
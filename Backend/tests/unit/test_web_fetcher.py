@@ -1,17 +1,21 @@
 """Unit tests for app.services.web_fetcher."""
+import asyncio
 import hashlib
 import json
 import time
 from pathlib import Path
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, AsyncMock, MagicMock
+import httpx
 import pytest
 from app.services.web_fetcher import (
     clean_text,
-    fetch_static_page,
-    fetch_page_text,
+    fetch_static_page_async,
+    fetch_page_text_async,
     _cache_path_for_url,
     load_from_cache,
     save_to_cache,
+    StaticPage,
+    _entry_cache,
 )
 
 
@@ -21,51 +25,42 @@ def test_clean_text() -> None:
     assert clean_text("") == ""
 
 
-@patch("app.services.web_fetcher.requests.get")
-def test_fetch_static_page_success(mock_get: MagicMock) -> None:
-    mock_resp = MagicMock()
-    mock_resp.text = "<html><body><p>Hello</p></body></html>"
-    mock_resp.raise_for_status = MagicMock()
-    mock_get.return_value = mock_resp
+def _fetch_static(html: str) -> tuple[str, AsyncMock]:
+    """Runs fetch_static_page_async against a canned 200 response."""
+    from app.services import web_fetcher
 
-    result = fetch_static_page("https://example.com")
-    assert "Hello" in result
-    mock_get.assert_called_once_with("https://example.com", timeout=10)
+    async def run():
+        client = web_fetcher._async_http.get()
+        with patch.object(client, "get", new_callable=AsyncMock) as mock_get:
+            mock_get.return_value = httpx.Response(200, text=html, request=httpx.Request("GET", "https://example.com"))
+            text = await fetch_static_page_async("https://example.com")
+        await web_fetcher.close_async_client()
+        return text, mock_get
+
+    return asyncio.run(run())
 
 
-@patch("app.services.web_fetcher.requests.get")
-def test_fetch_static_page_decomposes_script_style(mock_get: MagicMock) -> None:
-    mock_resp = MagicMock()
-    mock_resp.text = "<html><body><script>x=1</script><style>.x{}</style><p>Body</p></body></html>"
-    mock_resp.raise_for_status = MagicMock()
-    mock_get.return_value = mock_resp
+def test_fetch_static_page_async_success() -> None:
+    result, mock_get = _fetch_static("<html><body><p>Hello</p></body></html>")
+    assert "Hello" in result
+    mock_get.assert_called_once_with("https://example.com", headers={})
+
 
-    result = fetch_static_page("https://example.com")
+def test_fetch_static_page_async_decomposes_script_style() -> None:
+    result, _ = _fetch_static("<html><body><script>x=1</script><style>.x{}</style><p>Body</p></body></html>")
     assert "Body" in result
     assert "x=1" not in result
     assert ".x" not in result
 
 
-@patch("app.services.web_fetcher.clean_text")
-@patch("app.services.web_fetcher.sync_playwright")
-def test_fetch_dynamic_page_success(mock_playwright: MagicMock, mock_clean: MagicMock) -> None:
-    mock_clean.return_value = "Cleaned dynamic content"
-    mock_browser = MagicMock()
-    mock_page = MagicMock()
-    mock_page.content.return_value = "<html><body><p>Dynamic</p></body></html>"
-    mock_browser.new_page.return_value = mock_page
-    mock_p = MagicMock()
-    mock_p.chromium.launch.return_value = mock_browser
-    mock_cm = MagicMock()
-    mock_cm.__enter__.return_value = mock_p
-    mock_cm.__exit__.return_value = None
-    mock_playwright.return_value = mock_cm
-
-    from app.services.web_fetcher import fetch_dynamic_page
-    result = fetch_dynamic_page("https://example.com")
-    assert result == "Cleaned dynamic content"
-    mock_page.goto.assert_called_once()
-    mock_browser.close.assert_called_once()
+@patch("app.services.web_fetcher.browser_pool")
+def test_fetch_dynamic_page_async_uses_browser_pool(mock_pool: MagicMock) -> None:
+    mock_pool.render_async = AsyncMock(return_value="<html><body><script>x=1</script><p>Dynamic</p></body></html>")
+
+    from app.services.web_fetcher import fetch_dynamic_page_async, _render_expanded_html
+    result = asyncio.run(fetch_dynamic_page_async("https://example.com"))
+    assert result == "Dynamic"
+    mock_pool.render_async.assert_called_once_with("https://example.com", _render_expanded_html)
 
 
 def test_cache_path_for_url() -> None:
@@ -82,6 +77,48 @@ def test_save_and_load_from_cache(tmp_path: Path) -> None:
         assert loaded == "Cached content"
 
 
+def test_save_to_cache_stores_validators(tmp_path: Path) -> None:
+    with patch("app.services.web_fetcher.CACHE_DIR", str(tmp_path)):
+        save_to_cache("https://test.com", "Body", etag='"abc"', last_modified="Tue, 01 Sep 2026 00:00:00 GMT")
+        path = _cache_path_for_url("https://test.com")
+    with open(path) as f:
+        entry = json.load(f)
+    assert entry["etag"] == '"abc"'
+    assert entry["last_modified"] == "Tue, 01 Sep 2026 00:00:00 GMT"
+
+
+@patch("app.services.web_fetcher._html_to_text")
+def test_fetch_page_text_async_revalidates_expired_entry_with_304(mock_parse: MagicMock, tmp_path: Path) -> None:
+    from app.services import web_fetcher
+
+    async def fetch():
+        client = web_fetcher._async_http.get()
+        with patch.object(client, "get", new_callable=AsyncMock) as mock_get:
+            mock_get.return_value = httpx.Response(304, request=httpx.Request("GET", "https://etag.com"))
+            result = await fetch_page_text_async("https://etag.com")
+        await web_fetcher.close_async_client()
+        return result, mock_get
+
+    with patch("app.services.web_fetcher.CACHE_DIR", str(tmp_path)):
+        save_to_cache("https://etag.com", "Old body", etag='"v1"', last_modified="Mon, 31 Aug 2026 00:00:00 GMT")
+        path = _cache_path_for_url("https://etag.com")
+        with open(path) as f:
+            entry = json.load(f)
+        entry["timestamp"] = time.time() - 60 * 60 * 48  # past the stale-while-revalidate window
+        with open(path, "w") as f:
+            json.dump(entry, f)
+        _entry_cache.clear()  # edited on disk directly; mtime may not have ticked
+
+        result, mock_get = asyncio.run(fetch())
+        refreshed = load_from_cache("https://etag.com")
+
+    assert result == "Old body"
+    assert refreshed == "Old body"
+    mock_parse.assert_not_called()
+    headers = mock_get.call_args[1]["headers"]
+    assert headers == {"If-None-Match": '"v1"', "If-Modified-Since": "Mon, 31 Aug 2026 00:00:00 GMT"}
+
+
 def test_load_from_cache_missing_returns_none() -> None:
     assert load_from_cache("https://nonexistent-cache-url-12345.com") is None
 
@@ -96,53 +133,323 @@ def test_load_from_cache_expired_returns_none(tmp_path: Path) -> None:
     data["timestamp"] = time.time() - 60 * 60 * 24
     with open(path, "w") as f:
         json.dump(data, f)
+    _entry_cache.clear()  # edited on disk directly; mtime may not have ticked
     with patch("app.services.web_fetcher.CACHE_DIR", str(tmp_path)):
         assert load_from_cache("https://expired.com") is None
 
 
 @patch("app.services.web_fetcher.load_from_cache")
-@patch("app.services.web_fetcher.fetch_static_page")
+@patch("app.services.web_fetcher._get_static_page_async", new_callable=AsyncMock)
 @patch("app.services.web_fetcher.save_to_cache")
-def test_fetch_page_text_cache_hit(
+def test_fetch_page_text_async_cache_hit(
     mock_save: MagicMock,
-    mock_static: MagicMock,
+    mock_static: AsyncMock,
     mock_load: MagicMock,
 ) -> None:
     mock_load.return_value = "From cache"
-    result = fetch_page_text("https://cached.com")
+    result = asyncio.run(fetch_page_text_async("https://cached.com"))
     assert result == "From cache"
     mock_static.assert_not_called()
     mock_save.assert_not_called()
 
 
 @patch("app.services.web_fetcher.load_from_cache")
-@patch("app.services.web_fetcher.fetch_static_page")
+@patch("app.services.web_fetcher._get_static_page_async", new_callable=AsyncMock)
 @patch("app.services.web_fetcher.save_to_cache")
-def test_fetch_page_text_static_success(
+def test_fetch_page_text_async_static_success(
     mock_save: MagicMock,
-    mock_static: MagicMock,
+    mock_static: AsyncMock,
     mock_load: MagicMock,
 ) -> None:
     mock_load.return_value = None
-    mock_static.return_value = "Static content " * 100
-    result = fetch_page_text("https://static.com")
+    mock_static.return_value = StaticPage(text="Static content " * 100, etag='"v1"')
+    result = asyncio.run(fetch_page_text_async("https://static.com"))
     assert "Static content" in result
-    mock_save.assert_called_once()
+    mock_save.assert_called_once_with("https://static.com", result, etag='"v1"', last_modified=None)
 
 
 @patch("app.services.web_fetcher.load_from_cache")
-@patch("app.services.web_fetcher.fetch_static_page")
-@patch("app.services.web_fetcher.fetch_dynamic_page")
+@patch("app.services.web_fetcher._get_static_page_async", new_callable=AsyncMock)
+@patch("app.services.web_fetcher.fetch_dynamic_page_async", new_callable=AsyncMock)
 @patch("app.services.web_fetcher.save_to_cache")
-def test_fetch_page_text_falls_back_to_dynamic(
+def test_fetch_page_text_async_falls_back_to_dynamic_on_static_error(
     mock_save: MagicMock,
-    mock_dynamic: MagicMock,
-    mock_static: MagicMock,
+    mock_dynamic: AsyncMock,
+    mock_static: AsyncMock,
     mock_load: MagicMock,
 ) -> None:
     mock_load.return_value = None
     mock_static.side_effect = ValueError("Likely JS-rendered")
     mock_dynamic.return_value = "Dynamic content " * 100
-    result = fetch_page_text("https://spa.com")
+    result = asyncio.run(fetch_page_text_async("https://spa.com"))
     assert "Dynamic content" in result
     mock_dynamic.assert_called_once_with("https://spa.com")
+
+
+@patch("app.services.web_fetcher.load_from_cache")
+@patch("app.services.web_fetcher._get_static_page_async", new_callable=AsyncMock)
+@patch("app.services.web_fetcher.fetch_dynamic_page_async", new_callable=AsyncMock)
+@patch("app.services.web_fetcher.save_to_cache")
+def test_fetch_page_text_async_falls_back_to_dynamic(
+    mock_save: MagicMock,
+    mock_dynamic: AsyncMock,
+    mock_static: AsyncMock,
+    mock_load: MagicMock,
+) -> None:
+    mock_load.return_value = None
+    mock_static.return_value = StaticPage(text="short")
+    mock_dynamic.return_value = "Dynamic content " * 100
+    result = asyncio.run(fetch_page_text_async("https://spa.com"))
+    assert "Dynamic content" in result
+    mock_dynamic.assert_awaited_once_with("https://spa.com")
+    mock_save.assert_called_once()
+
+
+def test_fetch_static_page_async_uses_shared_client() -> None:
+    from app.services import web_fetcher
+
+    async def run():
+        client = web_fetcher._async_http.get()
+        assert web_fetcher._async_http.get() is client
+        with patch.object(client, "get", new_callable=AsyncMock) as mock_get:
+            mock_get.return_value = httpx.Response(
+                200,
+                text="<html><body><script>x=1</script><p>Hello async</p></body></html>",
+                request=httpx.Request("GET", "https://example.com"),
+            )
+            text = await fetch_static_page_async("https://example.com")
+        await web_fetcher.close_async_client()
+        return text
+
+    assert asyncio.run(run()) == "Hello async"
+
+
+def test_fetch_static_page_async_parses_html_off_the_event_loop() -> None:
+    import threading
+    from app.services import web_fetcher
+
+    parse_threads = []
+    real_html_to_text = web_fetcher._html_to_text
+
+    def _recording_html_to_text(html: str) -> str:
+        parse_threads.append(threading.get_ident())
+        return real_html_to_text(html)
+
+    async def run():
+        client = web_fetcher._async_http.get()
+        with patch.object(client, "get", new_callable=AsyncMock) as mock_get, \
+                patch.object(web_fetcher, "_html_to_text", _recording_html_to_text):
+            mock_get.return_value = httpx.Response(
+                200, text="<p>Parsed</p>", request=httpx.Request("GET", "https://example.com")
+            )
+            text = await fetch_static_page_async("https://example.com")
+        await web_fetcher.close_async_client()
+        return text
+
+    assert asyncio.run(run()) == "Parsed"
+    assert parse_threads and parse_threads[0] != threading.get_ident()
+
+
+class _FakeLocator:
+    def __init__(self, page) -> None:
+        self.page = page
+        self.first = self
+
+    async def count(self) -> int:
+        return 1 if self.page.buttons_left else 0
+
+    async def click(self) -> None:
+        self.page.clicks += 1
+        self.page.buttons_left -= 1
+        self.page.pending_change = True
+
+
+class _FakeRenderPage:
+    """Fake Playwright page: each click or scroll grows the page once."""
+    def __init__(self, buttons: int = 0, scroll_growth: int = 0, height: int = 1000) -> None:
+        self.buttons_left = buttons
+        self.scroll_growth = scroll_growth
+        self.height = height
+        self.viewport_height = 800
+        self.clicks = 0
+        self.scrolls = 0
+        self.settles = 0
+        self.settle_windows: list[int] = []
+        self.pending_change = False
+
+    async def goto(self, url, **kwargs) -> None:
+        self.url = url
+
+    def locator(self, selector):
+        return _FakeLocator(self)
+
+    async def evaluate(self, script, arg=None):
+        if "MutationObserver" in script:
+            self.settles += 1
+            self.settle_windows.append(arg[0])
+            changed, self.pending_change = self.pending_change, False
+            return changed
+        if "window.innerHeight" in script:
+            return self.height > self.viewport_height
+        if script.startswith("window.scrollTo"):
+            self.scrolls += 1
+            if self.scroll_growth:
+                self.scroll_growth -= 1
+                self.height += 500
+                self.pending_change = True
+            return None
+        return self.height
+
+    async def content(self) -> str:
+        return "<html><body><p>rendered</p></body></html>"
+
+
+def test_render_profile_for_exact_prefix_and_default() -> None:
+    from app.services.web_fetcher import render_profile_for, RENDER_PROFILES, DEFAULT_RENDER_PROFILE
+
+    assert render_profile_for("https://siue.libcal.com/hours/") is RENDER_PROFILES["https://siue.libcal.com/hours/"]
+    assert render_profile_for("https://www.siue.edu/calendar/?week=2") is RENDER_PROFILES["https://www.siue.edu/calendar/"]
+    assert render_profile_for("https://www.siue.edu/") is DEFAULT_RENDER_PROFILE
+
+
+def test_render_expanded_html_stops_when_dom_stops_changing() -> None:
+    from app.services.web_fetcher import _render_expanded_html
+
+    page = _FakeRenderPage(buttons=3, scroll_growth=2)
+    html = asyncio.run(_render_expanded_html(page, "https://www.siue.edu/events/"))
+    assert "rendered" in html
+    assert page.clicks == 3
+    # two growing scrolls, then one that changes nothing
+    assert page.scrolls == 3
+
+
+def test_render_expanded_html_static_page_settles_once_briefly() -> None:
+    from app.services.web_fetcher import _render_expanded_html
+
+    page = _FakeRenderPage(height=600)  # fits the viewport, no buttons
+    asyncio.run(_render_expanded_html(page, "https://www.siue.edu/events/"))
+    assert page.settles == 1
+    assert page.scrolls == 0
+    assert page.settle_windows[0] <= 500
+
+
+def test_render_expanded_html_tall_static_page_pays_one_scroll_check() -> None:
+    from app.services.web_fetcher import _render_expanded_html
+
+    page = _FakeRenderPage()
+    asyncio.run(_render_expanded_html(page, "https://www.siue.edu/events/"))
+    assert page.settles == 2  # after load, after the one scroll that changed nothing
+    assert page.scrolls == 1
+    assert sum(page.settle_windows) <= 1000
+
+
+def test_render_expanded_html_skips_load_more_for_profile() -> None:
+    from app.services.web_fetcher import _render_expanded_html
+
+    page = _FakeRenderPage(buttons=3)
+    asyncio.run(_render_expanded_html(page, "https://siue.libcal.com/hours/"))
+    assert page.clicks == 0
+
+
+def _age_cache_entry(url: str, seconds: float) -> None:
+    path = _cache_path_for_url(url)
+    with open(path) as f:
+        entry = json.load(f)
+    entry["timestamp"] = time.time() - seconds
+    with open(path, "w") as f:
+        json.dump(entry, f)
+    _entry_cache.clear()  # edited on disk directly; mtime may not have ticked
+
+
+def test_cache_ttl_overrides() -> None:
+    from app.services.web_fetcher import cache_ttl_for, cache_max_age_for, CACHE_TTL_SECONDS
+
+    assert cache_ttl_for("https://www.siue.edu/calendar/") < CACHE_TTL_SECONDS
+    assert cache_ttl_for("https://www.siue.edu/about/") > CACHE_TTL_SECONDS
+    assert cache_ttl_for("https://www.siue.edu/housing/") == CACHE_TTL_SECONDS
+    assert cache_max_age_for("https://www.siue.edu/housing/") > CACHE_TTL_SECONDS
+
+
+@patch("app.services.web_fetcher._fetch_and_store_async", new_callable=AsyncMock)
+def test_fetch_page_text_async_serves_stale_and_refreshes_once(mock_fetch: AsyncMock, tmp_path: Path) -> None:
+    from app.services import web_fetcher
+
+    async def run():
+        release = asyncio.Event()
+
+        async def _slow_refresh(url, entry):
+            await release.wait()
+            return "New body"
+
+        mock_fetch.side_effect = _slow_refresh
+        first = await fetch_page_text_async("https://stale.com")
+        second = await fetch_page_text_async("https://stale.com")
+        release.set()
+        await asyncio.wait_for(asyncio.gather(*web_fetcher._refresh_tasks), 5)
+        return first, second
+
+    with patch("app.services.web_fetcher.CACHE_DIR", str(tmp_path)):
+        save_to_cache("https://stale.com", "Stale body")
+        _age_cache_entry("https://stale.com", 60 * 60 * 7)  # past TTL, inside max-age
+        assert asyncio.run(run()) == ("Stale body", "Stale body")
+
+    assert mock_fetch.call_count == 1
+    assert "https://stale.com" not in web_fetcher._refreshing
+
+
+@patch("app.services.web_fetcher._fetch_and_store_async", new_callable=AsyncMock)
+def test_fetch_page_text_async_blocks_past_max_age(mock_fetch: AsyncMock, tmp_path: Path) -> None:
+    mock_fetch.return_value = "Fresh body"
+
+    with patch("app.services.web_fetcher.CACHE_DIR", str(tmp_path)):
+        save_to_cache("https://ancient.com", "Ancient body")
+        _age_cache_entry("https://ancient.com", 60 * 60 * 48)
+        assert asyncio.run(fetch_page_text_async("https://ancient.com")) == "Fresh body"
+
+    mock_fetch.assert_called_once()
+
+
+@patch("app.services.web_fetcher._fetch_and_store_async", new_callable=AsyncMock)
+def test_fetch_page_text_async_without_swr_blocks_on_stale(mock_fetch: AsyncMock, tmp_path: Path) -> None:
+    mock_fetch.return_value = "Fresh body"
+
+    with patch("app.services.web_fetcher.CACHE_DIR", str(tmp_path)), \
+            patch("app.services.web_fetcher.CACHE_STALE_WHILE_REVALIDATE", False):
+        save_to_cache("https://stale2.com", "Stale body")
+        _age_cache_entry("https://stale2.com", 60 * 60 * 7)
+        assert asyncio.run(fetch_page_text_async("https://stale2.com")) == "Fresh body"
+
+
+@patch("app.services.web_fetcher._fetch_and_store_async", new_callable=AsyncMock)
+def test_fetch_page_text_async_coalesces_concurrent_misses(mock_fetch: AsyncMock, tmp_path: Path) -> None:
+    async def _slow_fetch(url, entry):
+        await asyncio.sleep(0.1)
+        return "Fetched once"
+
+    mock_fetch.side_effect = _slow_fetch
+
+    async def run():
+        return await asyncio.gather(*(fetch_page_text_async("https://same.com") for _ in range(4)))
+
+    with patch("app.services.web_fetcher.CACHE_DIR", str(tmp_path)):
+        results = asyncio.run(run())
+
+    assert results == ["Fetched once"] * 4
+    assert mock_fetch.call_count == 1
+
+
+def test_read_cache_entry_served_from_memory_until_file_changes(tmp_path: Path) -> None:
+    from app.services.web_fetcher import _read_cache_entry
+
+    with patch("app.services.web_fetcher.CACHE_DIR", str(tmp_path)):
+        save_to_cache("https://lru.com", "Body one")
+        with patch("app.services.web_fetcher.json.load") as mock_json_load:
+            assert load_from_cache("https://lru.com") == "Body one"
+            assert load_from_cache("https://lru.com") == "Body one"
+            mock_json_load.assert_not_called()
+
+        # Another worker rewrites the file with a different size
+        path = _cache_path_for_url("https://lru.com")
+        with open(path, "w") as f:
+            json.dump({"timestamp": time.time(), "content": "Body two, longer"}, f)
+        assert _read_cache_entry("https://lru.com")["content"] == "Body two, longer"
@@ -1,9 +1,13 @@
 import { MessageContent } from "./MessageContent";
 
 export function ChatArea({ messages, loading, bottomRef }) {
+  // A streamed reply starts empty; show the typing indicator until its first token
+  const visibleMessages = messages.filter((message) => message.text);
+  const waitingForFirstToken = loading && !messages[messages.length - 1]?.text;
+
   return (
     <div className="chat-area">
-      {messages.map((message, index) => (
+      {visibleMessages.map((message, index) => (
         <div key={index} className="message-row">
           <div
             className={`chat-message chat-message--${
@@ -18,7 +22,7 @@ export function ChatArea({ messages, loading, bottomRef }) {
         </div>
       ))}
 
-      {loading && (
+      {waitingForFirstToken && (
         <div className="message-row">
           <div className="chat-message chat-message--assistant chat-message--loading">
             <span className="typing-dots">
@@ -1,5 +1,5 @@
 import { useState } from "react";
-import { sendChatMessage } from "../services/chatApi";
+import { streamChatMessage } from "../services/chatApi";
 
 export function useChat() {
   const [messages, setMessages] = useState([
@@ -17,19 +17,22 @@ export function useChat() {
     setInput("");
     setLoading(true);
 
-    try {
-      const data = await sendChatMessage(text);
+    // Tokens are appended to this assistant message as they arrive
+    setMessages((prev) => [...prev, { role: "assistant", text: "" }]);
 
-      if (!data) return;
+    const appendToReply = (token) => {
+      setMessages((prev) => {
+        const last = prev[prev.length - 1];
+        return [...prev.slice(0, -1), { ...last, text: last.text + token }];
+      });
+    };
 
-      setMessages((prev) => [
-        ...prev,
-        { role: "assistant", text: data.reply },
-      ]);
+    try {
+      await streamChatMessage(text, appendToReply);
     } catch (error) {
       console.error(error);
       setMessages((prev) => [
-        ...prev,
+        ...prev.slice(0, -1),
         {
           role: "assistant",
           text:
@@ -22,9 +22,6 @@ export async function sendChatMessage(text) {
   return res.json();
 }
 
-// Kept for reference — streaming version, not currently used
-// export async function streamChatMessage(text, onToken, onDone) { ... }
-
 /**
  * Streams a chat response token-by-token.
  * @param {string} text - The user's message.